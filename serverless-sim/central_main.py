@@ -4,6 +4,10 @@ Central Node Entry Point
 Runs the central node with control layer, API layer, and resource layer
 """
 
+import time
+
+_BOOT_STARTED = time.perf_counter()
+
 import sys
 import argparse
 import logging
@@ -70,6 +74,7 @@ def main():
     
     # Create central node app
     app = create_central_node_app()
+    logger.info(f"Central node initialized in {time.perf_counter() - _BOOT_STARTED:.3f}s (including imports)")
     
     logger.info("Central Node components:")
     logger.info("  OK Control Layer (Scheduler, Prediction, Migration, Metrics, Graph, UI, Data)")
@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from central_node.control_layer.scheduler_module.scheduler import Scheduler
+from central_node.control_layer.helper_module.data_manager import DataManager
+from central_node.control_layer.helper_module.trace_stream import TraceNotReady
+
+from config import Config
+
+class PlaybackAgent:
+    """
+    Dataset playback clock. While the simulation runs a sample dataset, virtual
+    dataset time advances at `steps_per_second` on this agent's own thread and the
+    step reached on each tick is applied to the scheduler as one batch, so
+    playback speed no longer depends on how often the UI polls and GET endpoints
+    only read snapshots. Position lives in scheduler.current_dataset /
+    current_step_id, which the sample start/reset controllers set while holding
+    `lock`, so a tick never applies a step of a dataset that was just replaced.
+    """
+
+    def __init__(self, scheduler: Scheduler, data_manager: DataManager):
+        self.logger = logging.getLogger(__name__)
+        self.scheduler = scheduler
+        self.data_manager = data_manager
+
+        # Virtual-time rate: dataset steps per wall-clock second (0 pauses playback)
+        self.steps_per_second: float = getattr(Config, 'PLAYBACK_STEPS_PER_SECOND', 8.0)
+        self.tick_seconds: float = getattr(Config, 'PLAYBACK_TICK_SECONDS', 1.0)
+
+        self.playback_thread = None
+        self.is_playing = False
+        # Held by each tick and by sample start/reset while they change users and position
+        self.lock = threading.RLock()
+        # Fractional steps owed by the clock, and where the current run started (wrap target)
+        self._pending_steps = 0.0
+        self._last_tick: Optional[float] = None
+        self._published_step = None
+        self._first_step = None
+        self.stats: Dict[str, Any] = {
+            'ticks': 0,
+            'applied_steps': 0,
+            'wraps': 0,
+            'last_step_id': None,
+            'last_users': 0,
+            'last_apply_ms': 0.0,
+            'trace_ready': True,
+        }
+
+        self.logger.info("Playback Agent initialized")
+
+    def set_config(self, steps_per_second: Optional[float] = None, tick_seconds: Optional[float] = None):
+        if steps_per_second is not None:
+            self.steps_per_second = max(0.0, float(steps_per_second))
+        if tick_seconds is not None:
+            self.tick_seconds = max(0.05, float(tick_seconds))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'running': bool(self.scheduler.simulation and self.scheduler.current_dataset),
+            'dataset': self.scheduler.current_dataset,
+            'step_id': self.scheduler.current_step_id,
+            'steps_per_second': self.steps_per_second,
+            'tick_seconds': self.tick_seconds,
+            **self.stats,
+            'trace_streams': self.data_manager.stream_status(),
+        }
+
+    def _step_arrays(self, dataset: str, step_id):
+        if dataset == "dact":
+            return self.data_manager.get_dact_arrays_by_step(step_id)
+        if dataset == "vehicles":
+            return self.data_manager.get_vehicle_arrays_by_timestep(step_id)
+        return None
+
+    def apply_step(self, arrays: Dict[str, np.ndarray]) -> int:
+        """Move existing users and create new ones for one dataset step, in one scheduler pass."""
+        count = len(arrays['id'])
+        self.scheduler.upsert_users_bulk(
+            [f"user_{item_id}" for item_id in arrays['id'].tolist()],
+            arrays['x'],
+            arrays['y'],
+            speeds=arrays['speed'],
+            sizes=np.full(count, 8.0),  # dataset items' default size
+        )
+        return count
+
+    def _tick(self, now: float):
+        with self.lock:
+            self._advance(now)
+
+    def _advance(self, now: float):
+        scheduler = self.scheduler
+        dataset, step_id = scheduler.current_dataset, scheduler.current_step_id
+        if not scheduler.simulation or dataset not in ("dact", "vehicles") or step_id is None:
+            self._last_tick = None
+            return
+        if step_id != self._published_step:
+            # Position set elsewhere: a (re)started sample, which already applied this step
+            self._published_step = self._first_step = step_id
+            self._pending_steps = 0.0
+            self._last_tick = None
+        elapsed = 0.0 if self._last_tick is None else now - self._last_tick
+        self._last_tick = now
+        self._pending_steps += elapsed * self.steps_per_second
+        due = int(self._pending_steps)
+        if due <= 0:
+            return
+        self._pending_steps -= due
+        # Intermediate steps are skipped: each tick applies the step the clock has reached
+        target = step_id + due
+        started = time.perf_counter()
+        try:
+            arrays = self._step_arrays(dataset, target)
+            if arrays is None:
+                # End of dataset: wrap to where this run started for continuous playback
+                target = self._first_step
+                arrays = self._step_arrays(dataset, target)
+                self.stats['wraps'] += 1
+        except TraceNotReady:
+            # Streamed trace still being prepared: retry on a later tick rather than blocking
+            self.stats['trace_ready'] = False
+            return
+        self.stats['trace_ready'] = True
+        if arrays is None:
+            return
+        users = self.apply_step(arrays)
+        scheduler.current_step_id = self._published_step = target
+        self.stats['ticks'] += 1
+        self.stats['applied_steps'] += due
+        self.stats['last_step_id'] = target
+        self.stats['last_users'] = users
+        self.stats['last_apply_ms'] = (time.perf_counter() - started) * 1000.0
+
+    def playback_loop(self):
+        while self.is_playing:
+            try:
+                self._tick(time.monotonic())
+            except Exception as e:
+                self.logger.error(f"Error in dataset playback loop: {e}")
+            time.sleep(self.tick_seconds)
+
+    def start_playback(self):
+        if self.is_playing:
+            return
+        self.is_playing = True
+        self.playback_thread = threading.Thread(target=self.playback_loop, name='dataset-playback')
+        self.playback_thread.daemon = True
+        self.playback_thread.start()
+        self.logger.info("Dataset playback thread started")
+
+    def stop_playback(self):
+        self.is_playing = False
+        if self.playback_thread:
+            self.playback_thread.join()
+        self.logger.info("Dataset playback thread stopped")
+
+    def start_all_tasks(self):
+        self.start_playback()
+
+    def stop_all_tasks(self):
+        self.stop_playback()
@@ -24,7 +24,7 @@ class SchedulerAgent:
         current_time = time.time()
         dead_nodes = []
         
-        for node_id, node in self.scheduler.edge_nodes.items():
+        for node_id, node in list(self.scheduler.edge_nodes.items()):
             for attempt in range(1, self.max_attempts_call + 1):
                 try:
                     result = requests.get(f"http://{node.endpoint}/api/v1/edge/health")
@@ -38,8 +38,11 @@ class SchedulerAgent:
             #     dead_nodes.append(node_id)
 
         for node_id in dead_nodes:
-            self.logger.warning(f"Removing dead node: {node_id} (last seen: {current_time - self.scheduler.edge_nodes[node_id].last_heartbeat:.1f}s ago)")
-            del self.scheduler.edge_nodes[node_id]
+            node = self.scheduler.edge_nodes.get(node_id)
+            if node is None:
+                continue
+            self.logger.warning(f"Removing dead node: {node_id} (last seen: {current_time - node.last_heartbeat:.1f}s ago)")
+            self.scheduler.unregister_edge_node(node_id)
         
     def cleanup_dead_nodes_loop(self):
         while True:
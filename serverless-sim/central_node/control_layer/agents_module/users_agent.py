@@ -10,7 +10,6 @@ class UsersAgent:
     def __init__(self, scheduler: Scheduler):
         self.logger = logging.getLogger(__name__)
         self.scheduler = scheduler
-        self.edge_nodes = self.scheduler.edge_nodes
         self.central_node = self.scheduler.central_node
         self.user_nodes = self.scheduler.user_nodes
 
@@ -28,9 +27,15 @@ class UsersAgent:
 
         self.logger.info("Users Agent initialized")
 
+    @property
+    def edge_nodes(self):
+        # The scheduler swaps in a new dict on every edge node change
+        return self.scheduler.edge_nodes
+
     def _excute_function(self):
-        # Snapshot to avoid concurrent modification errors during cleanup
-        for user_node in list(self.user_nodes.values()):
+        # Detached snapshot: users deleted during this (slow) pass stay readable, and
+        # results for them are dropped by record_execution
+        for user_node in self.scheduler.get_snapshot().users:
             # Execute the function for each user node
             assigned_node = user_node.assigned_node_id
             if not assigned_node:
@@ -42,9 +47,7 @@ class UsersAgent:
                     result = requests.post(f"http://{self.central_node['endpoint']}/api/v1/central/execute", json={"user_id": user_node.user_id})
                     end = time.time()
                     container_status = result.json().get("container_status", "unknown")
-                    user_node.latency.computation_delay = (end - start) * 1000 # in ms
-                    user_node.latency.container_status = container_status
-                    user_node.last_executed = time.time()
+                    self.user_nodes.record_execution(user_node.user_id, (end - start) * 1000, container_status, time.time())  # delay in ms
                     if result.status_code == 200:
                         self.logger.info(f"Function executed successfully for user node: {user_node.user_id} (central node)")
                     else:
@@ -62,9 +65,7 @@ class UsersAgent:
                     end = time.time()
                     computation_delay = (end - start) * 1000  # in ms
                     container_status = result.json().get("container_status", "unknown")
-                    user_node.latency.computation_delay = computation_delay
-                    user_node.latency.container_status = container_status
-                    user_node.last_executed = time.time()
+                    self.user_nodes.record_execution(user_node.user_id, computation_delay, container_status, time.time())
                     if result.status_code == 200:
                         self.logger.info(f"Function executed successfully for user node: {user_node.user_id}")
                     else:
@@ -109,7 +110,9 @@ class UsersAgent:
                 pass
             now = time.time()
             stale_ids = []
-            for user_id, user_node in list(self.scheduler.user_nodes.items()):
+            # Detached snapshot: concurrent deletes cannot break the scan
+            for user_node in self.scheduler.get_snapshot().users:
+                user_id = user_node.user_id
                 last_updated = getattr(user_node, 'last_updated', None)
                 if last_updated is None:
                     continue
@@ -120,6 +123,8 @@ class UsersAgent:
                 try:
                     del self.scheduler.user_nodes[uid]
                     self.logger.info(f"Cleaned up inactive user: {uid}")
+                except KeyError:
+                    continue  # already removed elsewhere
                 except Exception as e:
                     self.logger.error(f"Failed to clean inactive user {uid}: {e}")
         except Exception as e:
@@ -153,6 +158,13 @@ class UsersAgent:
     # --- Online reassignment loop ---
     def _assignment_scan_once(self):
         try:
+            if self.scheduler.uses_global_gap():
+                # GAP_BASELINE re-solves the whole population once per period instead
+                self.scheduler.reoptimize_gap_if_due()
+                return
+            if self.scheduler.supports_batch_scan():
+                self.scheduler.run_assignment_scan()
+                return
             for user in list(self.scheduler.user_nodes.values()):
                 self.scheduler.maybe_reassign_user(user)
         except Exception as e:
@@ -14,3 +14,5 @@ from .start_simulation_controller import StartSimulationController
 from .stop_simulation_controller import StopSimulationController
 from .execute_function_controller import ExecuteFunctionController
 from .reset_simulation_controller import ResetSimulationController
+from .bulk_upsert_users_controller import BulkUpsertUsersController
+from .bulk_delete_users_controller import BulkDeleteUsersController
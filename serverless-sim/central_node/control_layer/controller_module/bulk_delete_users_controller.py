@@ -0,0 +1,23 @@
+from central_node.control_layer.scheduler_module.scheduler import Scheduler
+
+from shared import InvalidDataException
+
+class BulkDeleteUsersController:
+    """Removes many users per request. Body: {"user_ids": [...]}; unknown ids are ignored."""
+
+    def __init__(self, scheduler: Scheduler, request_data: dict):
+        self.scheduler = scheduler
+        self.request_data = request_data or {}
+        self._validate_request_data()
+
+    def _validate_request_data(self):
+        user_ids = self.request_data.get("user_ids")
+        if not isinstance(user_ids, list) or not all(isinstance(user_id, str) for user_id in user_ids):
+            raise InvalidDataException("user_ids must be a list of strings")
+        self.user_ids = user_ids
+
+    def _bulk_delete_users(self):
+        return {"deleted": self.scheduler.delete_users_bulk(self.user_ids)}
+
+    def execute(self):
+        return self._bulk_delete_users()
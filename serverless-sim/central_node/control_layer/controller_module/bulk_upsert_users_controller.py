@@ -0,0 +1,50 @@
+import numpy as np
+
+from central_node.control_layer.scheduler_module.scheduler import Scheduler
+
+from shared import InvalidDataException
+
+class BulkUpsertUsersController:
+    """
+    Creates or moves many users per request. Body: parallel arrays
+    {"user_ids": [...], "x": [...], "y": [...], "speed": [...]?, "size": [...]?}.
+    """
+
+    def __init__(self, scheduler: Scheduler, request_data: dict):
+        self.scheduler = scheduler
+        self.request_data = request_data or {}
+        self._validate_request_data()
+
+    def _validate_request_data(self):
+        user_ids = self.request_data.get("user_ids")
+        if not isinstance(user_ids, list) or not all(isinstance(user_id, str) and user_id for user_id in user_ids):
+            raise InvalidDataException("user_ids must be a list of non-empty strings")
+        self.arrays = {}
+        for name in ("x", "y", "speed", "size"):
+            values = self.request_data.get(name)
+            if values is None:
+                if name in ("x", "y"):
+                    raise InvalidDataException(f"{name} is required")
+                continue
+            try:
+                array = np.asarray(values, dtype=float)
+            except (TypeError, ValueError):
+                raise InvalidDataException(f"{name} must be a list of numbers")
+            if array.ndim != 1 or len(array) != len(user_ids):
+                raise InvalidDataException(f"{name} must have one value per user id")
+            if not np.isfinite(array).all():
+                raise InvalidDataException(f"{name} must be finite")
+            self.arrays[name] = array
+        self.user_ids = user_ids
+
+    def _bulk_upsert_users(self):
+        return self.scheduler.upsert_users_bulk(
+            self.user_ids,
+            self.arrays["x"],
+            self.arrays["y"],
+            speeds=self.arrays.get("speed"),
+            sizes=self.arrays.get("size"),
+        )
+
+    def execute(self):
+        return self._bulk_upsert_users()
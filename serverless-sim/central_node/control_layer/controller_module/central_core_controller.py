@@ -1,18 +1,60 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+from config import Config
 from central_node.api_layer import CentralNodeAPIController, CentralNodeAPIAgent
 
 from central_node.control_layer.controller_module import *
 from central_node.control_layer.scheduler_module.scheduler import Scheduler
 from central_node.control_layer.agents_module.scheduler_agent import SchedulerAgent
 from central_node.control_layer.agents_module.users_agent import UsersAgent
+from central_node.control_layer.agents_module.playback_agent import PlaybackAgent
 from central_node.control_layer.prediction_module.prediction import WorkloadPredictor
 from central_node.control_layer.prediction_module.trajectory_predictor import TrajectoryPredictor
+from central_node.control_layer.prediction_module.kalman_predictor import KalmanTrajectoryPredictor
 from central_node.control_layer.helper_module.data_manager import DataManager
 
 class CentralCoreController:
     def __init__(self):
-        self.scheduler = Scheduler()
-        self.predictor = WorkloadPredictor()
-        # Attach trajectory predictor (optional GNN)
+        self.logger = logging.getLogger(__name__)
+        self.startup_timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        with self._timed('scheduler'):
+            self.scheduler = Scheduler()
+        with self._timed('workload_predictor'):
+            self.predictor = WorkloadPredictor()
+        # Attach trajectory predictor: Kalman filter backend, or the optional GNN model that
+        # loads in the background while linear extrapolation serves predictions
+        with self._timed('trajectory_predictor'):
+            if getattr(Config, 'TRAJECTORY_PREDICTOR_BACKEND', 'model') == 'kalman':
+                self.trajectory_predictor = KalmanTrajectoryPredictor(
+                    motion_model=getattr(Config, 'KALMAN_MOTION_MODEL', 'cv'),
+                    process_noise=getattr(Config, 'KALMAN_PROCESS_NOISE', 25.0),
+                    measurement_noise=getattr(Config, 'KALMAN_MEASUREMENT_NOISE', 4.0),
+                    step_seconds=getattr(Config, 'TRAJECTORY_STEP_SECONDS', 1.0),
+                )
+            else:
+                self.trajectory_predictor = self._model_trajectory_predictor()
+        # Share with scheduler
+        self.scheduler.trajectory_predictor = self.trajectory_predictor
+        with self._timed('data_manager'):
+            self.data_manager = DataManager()
+        with self._timed('api_controller'):
+            self.central_node_api_controller = CentralNodeAPIController()
+
+        with self._timed('agents'):
+            CentralNodeAPIAgent(self.central_node_api_controller).start_all_tasks()
+            SchedulerAgent(self.scheduler).start_all_tasks()
+            UsersAgent(self.scheduler).start_all_tasks()
+            self.playback_agent = PlaybackAgent(self.scheduler, self.data_manager)
+            self.playback_agent.start_all_tasks()
+        self.startup_timings['total'] = time.perf_counter() - started
+        self.logger.info("Central core started in %.3fs (%s)", self.startup_timings['total'], ', '.join(
+            f"{stage} {seconds * 1000:.1f}ms" for stage, seconds in self.startup_timings.items() if stage != 'total'))
+
+    def _model_trajectory_predictor(self) -> TrajectoryPredictor:
         try:
             import os
             base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -23,17 +65,30 @@ class CentralCoreController:
                 'spatial_temporal_gnn',
                 'st-gnn_small_9_nodes_model.keras'
             )
-            self.trajectory_predictor = TrajectoryPredictor(model_path=model_path, sequence_length=5)
+            return TrajectoryPredictor(
+                model_path=model_path,
+                sequence_length=5,
+                background=getattr(Config, 'TRAJECTORY_MODEL_BACKGROUND_LOAD', True),
+                step_seconds=getattr(Config, 'TRAJECTORY_STEP_SECONDS', 1.0),
+                auto_export=getattr(Config, 'TRAJECTORY_MODEL_AUTO_EXPORT', True),
+            )
         except Exception:
-            self.trajectory_predictor = TrajectoryPredictor(model_path=None)
-        # Share with scheduler
-        self.scheduler.trajectory_predictor = self.trajectory_predictor
-        self.data_manager = DataManager()
-        self.central_node_api_controller = CentralNodeAPIController()
-        
-        CentralNodeAPIAgent(self.central_node_api_controller).start_all_tasks()
-        SchedulerAgent(self.scheduler).start_all_tasks()
-        UsersAgent(self.scheduler).start_all_tasks()
+            return TrajectoryPredictor(model_path=None)
+
+    @contextmanager
+    def _timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[stage] = time.perf_counter() - started
+
+    def startup_report(self) -> Dict[str, Any]:
+        """Startup stage timings (seconds) and trajectory model readiness."""
+        return {
+            'timings': dict(self.startup_timings),
+            'trajectory_model': self.trajectory_predictor.status(),
+        }
 
     def register_edge_node(self, request_data):
         controller = RegisterEdgeNodeController(self.scheduler, request_data)
@@ -60,7 +115,7 @@ class CentralCoreController:
         return "Simulation stopped successfully"
     
     def reset_simulation(self):
-        controller = ResetSimulationController(self.scheduler)
+        controller = ResetSimulationController(self.scheduler, self.playback_agent)
         controller.execute()
         return "Simulation reset successfully"
             
@@ -83,8 +138,16 @@ class CentralCoreController:
         controller.execute()
         return f"User node {request_data.get('user_id')} updated successfully"
 
+    def bulk_upsert_users(self, request_data):
+        controller = BulkUpsertUsersController(self.scheduler, request_data)
+        return controller.execute()
+
+    def bulk_delete_users(self, request_data):
+        controller = BulkDeleteUsersController(self.scheduler, request_data)
+        return controller.execute()
+
     def get_all_users(self):
-        controller = GetAllUsersController(self.scheduler, self.data_manager)
+        controller = GetAllUsersController(self.scheduler)
         return controller.execute()
 
     def delete_all_users(self):
@@ -110,7 +173,9 @@ class CentralCoreController:
 
     def update_assignment_config(self, request_data):
         cfg = {}
-        for key in ['handoff_min_dwell_seconds', 'handoff_improvement_threshold', 'assignment_scan_interval', 'load_aware_alpha']:
+        for key in ['handoff_min_dwell_seconds', 'handoff_improvement_threshold', 'assignment_scan_interval', 'load_aware_alpha', 'batch_assignment_scan', 'incremental_assignment_scan',
+                    'gap_global_reoptimization', 'gap_reoptimize_interval',
+                    'handoff_stats_window_seconds', 'ping_pong_window_seconds', 'prediction_cache_enabled']:
             if key in request_data:
                 cfg[key] = request_data[key]
         self.scheduler.set_assignment_config(**cfg)
@@ -119,12 +184,28 @@ class CentralCoreController:
     def get_assignment_status(self):
         return self.scheduler.get_assignment_status()
 
+    def get_coverage_forecast(self, user_ids=None, horizon=None, steps=None):
+        return self.scheduler.forecast_coverage_entry(user_ids=user_ids, horizon_seconds=horizon, steps=steps)
+
+    # Dataset playback clock APIs
+    def update_playback_config(self, request_data):
+        self.playback_agent.set_config(
+            steps_per_second=request_data.get('steps_per_second'),
+            tick_seconds=request_data.get('tick_seconds'),
+        )
+        return self.playback_agent.status()
+
+    def get_playback_status(self):
+        return self.playback_agent.status()
+
     def start_dact_sample(self):
-        controller = StartDactSampleController(self.data_manager, self.scheduler)
-        controller.execute()
+        controller = StartDactSampleController(self.data_manager, self.scheduler, self.playback_agent)
+        if not controller.execute():
+            return "Start using dact sample (trace still loading, playback starts when ready)"
         return "Start using dact sample"
     
     def start_vehicles_sample(self):
-        controller = StartVehiclesSampleController(self.data_manager, self.scheduler)
-        controller.execute()
+        controller = StartVehiclesSampleController(self.data_manager, self.scheduler, self.playback_agent)
+        if not controller.execute():
+            return "Start using vehicles sample (trace still loading, playback starts when ready)"
         return "Start using vehicles sample"
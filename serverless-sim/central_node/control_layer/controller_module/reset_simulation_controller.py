@@ -1,8 +1,10 @@
+from central_node.control_layer.agents_module.playback_agent import PlaybackAgent
 from central_node.control_layer.scheduler_module.scheduler import Scheduler
 
 class ResetSimulationController:
-    def __init__(self, scheduler: Scheduler):
+    def __init__(self, scheduler: Scheduler, playback_agent: PlaybackAgent):
         self.scheduler = scheduler
+        self.playback_agent = playback_agent
 
     def _reset_simulation(self):
         self.scheduler.simulation = False
@@ -11,4 +13,5 @@ class ResetSimulationController:
         self.scheduler.user_nodes.clear()
 
     def execute(self):
-        self._reset_simulation()
\ No newline at end of file
+        with self.playback_agent.lock:
+            self._reset_simulation()
\ No newline at end of file
@@ -1,62 +1,34 @@
-import random
-import time
-
-from central_node.control_layer.scheduler_module.scheduler import Scheduler, Latency, UserNodeInfo
+from central_node.control_layer.agents_module.playback_agent import PlaybackAgent
+from central_node.control_layer.scheduler_module.scheduler import Scheduler
 from central_node.control_layer.helper_module.data_manager import DataManager
-
-from config import Config
+from central_node.control_layer.helper_module.trace_stream import TraceNotReady
 
 class StartVehiclesSampleController:
-    def __init__(self, data_manager: DataManager, scheduler: Scheduler):
+    def __init__(self, data_manager: DataManager, scheduler: Scheduler, playback_agent: PlaybackAgent):
         self.data_manager = data_manager
         self.scheduler = scheduler
+        self.playback_agent = playback_agent
         self.current_step_id = 28800.00
         self.current_dataset = "vehicles"
-        self.scheduler.user_nodes.clear()
-        
+
     def _update_scheduler(self):
         self.scheduler.current_dataset = self.current_dataset
         self.scheduler.current_step_id = self.current_step_id
 
-    def _get_vehicles_sample(self):
-        sample = self.data_manager.get_vehicle_data_by_timestep(self.current_step_id)
-
-        for item in sample.get("items", []):
-            user_node = None
-            if item.get(f"user_{item.get('id', 0)}") in self.scheduler.user_nodes:
-                user_node = self.scheduler.user_nodes[item.get(f"user_{item.get('id', 0)}")]
-            else:
-                location = {'x': item.get('x', 0), 'y': item.get('y', 0)}
-                nearest_node_id, nearest_distance = self.scheduler._node_assignment(location)
-                data_size = random.randint(*Config.DEFAULT_RANDOM_DATA_SIZE_RANGE_IN_BYTES)
-                bandwidth = random.randint(*Config.DEFAULT_RANDOM_BANDWIDTH_RANGE_IN_BYTES_PER_MILLISECOND)
-                propagation_delay = nearest_distance / Config.DEFAULT_PROPAGATION_SPEED_IN_METERS * 1000  # Convert to ms
-                transmission_delay = data_size / bandwidth
-                total_turnaround_time = propagation_delay + transmission_delay
-                latency = Latency(
-                    distance=nearest_distance,
-                    data_size=data_size,
-                    bandwidth=bandwidth,
-                    propagation_delay=propagation_delay,
-                    transmission_delay=transmission_delay,
-                    computation_delay=0.0,
-                    container_status="unknown",
-                    total_turnaround_time=total_turnaround_time
-                )
-                user_node = UserNodeInfo(
-                    user_id=f"user_{item.get('id', 0)}",
-                    assigned_node_id=nearest_node_id,
-                    location=location,
-                    last_executed=0,
-                    size=item.get("size", 10),
-                    speed=item.get("speed", 5),
-                    latency=latency,
-                    created_at=time.time(),
-                    last_updated=time.time()
-                )
-                self.scheduler.create_user_node(user_node)
+    def _get_vehicles_sample(self) -> bool:
+        """Apply the first step; False if a streamed trace is still being prepared."""
+        try:
+            arrays = self.data_manager.get_vehicle_arrays_by_timestep(self.current_step_id)
+        except TraceNotReady:
+            return False  # playback applies steps once the trace is ready
+        if arrays is not None:
+            self.playback_agent.apply_step(arrays)
+        return True
 
     def execute(self):
-        self._update_scheduler()
-        self._get_vehicles_sample()
+        # Under the playback lock, so a running tick cannot re-add the previous dataset's users
+        with self.playback_agent.lock:
+            self.scheduler.user_nodes.clear()
+            self._update_scheduler()
+            return self._get_vehicles_sample()
 
@@ -25,15 +25,17 @@ class UpdateCentralNodeController:
     def _apply(self):
         # Update scheduler's central node dict
         try:
-            self.scheduler.central_node['location'] = {
+            location = {
                 'x': float(self.data['location']['x']),
                 'y': float(self.data['location']['y'])
             }
         except Exception:
             # Fallback: assign raw
-            self.scheduler.central_node['location'] = self.data['location']
+            location = self.data['location']
+        coverage = None
         if 'coverage' in self.data and self.data['coverage'] is not None:
-            self.scheduler.central_node['coverage'] = float(self.data['coverage'])
+            coverage = float(self.data['coverage'])
+        self.scheduler.update_central_node(location, coverage)
 
     def execute(self):
         self._apply()
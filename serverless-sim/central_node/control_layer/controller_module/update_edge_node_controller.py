@@ -1,3 +1,5 @@
+import dataclasses
+
 from central_node.control_layer.scheduler_module.scheduler import Scheduler
 from shared import InvalidDataException, NotFoundException
 
@@ -23,9 +25,13 @@ class UpdateEdgeNodeController:
         if not current_edge_node:
             raise NotFoundException("Edge node not found")
 
-        current_edge_node.location = self.node_data.get("location", current_edge_node.location)
-        current_edge_node.coverage = self.node_data.get("coverage", current_edge_node.coverage)
-        self.scheduler.update_edge_node(current_edge_node)
+        # Published EdgeNodeInfo objects are shared with snapshots, so replace rather than mutate
+        updated_edge_node = dataclasses.replace(
+            current_edge_node,
+            location=self.node_data.get("location", current_edge_node.location),
+            coverage=self.node_data.get("coverage", current_edge_node.coverage),
+        )
+        self.scheduler.update_edge_node(updated_edge_node)
         
 
     def execute(self):
@@ -6,8 +6,16 @@ Handles data loading and simulation data management for the UI
 import os
 import csv
 import logging
+import threading
+from array import array
 from collections import defaultdict
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from central_node.control_layer.helper_module.trace_cache import load_columns, save_columns
+from central_node.control_layer.helper_module.trace_stream import TraceNotReady, TracePlaybackStream
 
 class DataManager:
     """
@@ -17,8 +25,16 @@ class DataManager:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.dact_loader = DactDataLoader()
-        self.vehicle_loader = VehicleDataLoader()
+        # Streaming replays time-ordered traces chunk by chunk at constant memory
+        if getattr(Config, 'TRACE_STREAMING', False):
+            self.dact_loader = StreamingDactDataLoader()
+            self.vehicle_loader = StreamingVehicleDataLoader()
+            # Prepasses run in the background from boot, so step requests never wait for a full pass
+            self.dact_loader.prepare()
+            self.vehicle_loader.prepare()
+        else:
+            self.dact_loader = DactDataLoader()
+            self.vehicle_loader = VehicleDataLoader()
         
     def get_vehicle_data_by_timestep(self, timestep: float) -> Optional[Dict[str, Any]]:
         """Get vehicle data for a specific timestep"""
@@ -28,30 +44,185 @@ class DataManager:
         """Get DACT data for a specific step"""
         return self.dact_loader.get_data_by_step(step_id)
 
+    def get_vehicle_arrays_by_timestep(self, timestep: float) -> Optional[Dict[str, np.ndarray]]:
+        """Vehicle timestep as parallel arrays (see STEP_FIELDS); raises TraceNotReady while a streamed trace is prepared"""
+        return self.vehicle_loader.get_timestep_arrays(timestep)
 
-class DactDataLoader:
-    """Loads and manages DACT dataset for simulation"""
-    
-    def __init__(self, data_path: str = None):
+    def get_dact_arrays_by_step(self, step_id: int) -> Optional[Dict[str, np.ndarray]]:
+        """DACT step as parallel arrays (see STEP_FIELDS); raises TraceNotReady while a streamed trace is prepared"""
+        return self.dact_loader.get_step_arrays(step_id)
+
+    def stream_status(self) -> Optional[Dict[str, Any]]:
+        """Streaming prepass results per dataset (ordering, dropped/skipped rows), None if not streaming"""
+        if not getattr(Config, 'TRACE_STREAMING', False):
+            return None
+        return {'dact': self.dact_loader.stream_status(), 'vehicles': self.vehicle_loader.stream_status()}
+
+
+# Fields of one playback step, as parallel arrays (see get_step_arrays / get_timestep_arrays)
+STEP_FIELDS = ('id', 'x', 'y', 'speed', 'acceleration', 'heading', 'heading_change')
+
+
+def coordinate_bounds(lats: np.ndarray, lons: np.ndarray) -> Dict[str, float]:
+    """Dataset-wide lat/lon min/max, the reference frame for UI coordinates."""
+    if not len(lats):
+        return {'min_lat': 0.0, 'max_lat': 1.0, 'min_lon': 0.0, 'max_lon': 1.0}
+    return {
+        'min_lat': float(np.min(lats)),
+        'max_lat': float(np.max(lats)),
+        'min_lon': float(np.min(lons)),
+        'max_lon': float(np.max(lons)),
+    }
+
+
+def normalize_to_ui(lats: np.ndarray, lons: np.ndarray, bounds: Dict[str, float],
+                    scale: Tuple[float, float] = (2000, 1500),
+                    offset: Tuple[float, float] = (200, 200)) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scale coordinates for UI visibility while preserving relative positioning:
+    lat maps to x and lon to y within the global bounds, so movement stays
+    continuous across timesteps. A degenerate axis is centred.
+    """
+    lats, lons = np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+    lat_range = bounds['max_lat'] - bounds['min_lat']
+    lon_range = bounds['max_lon'] - bounds['min_lon']
+    normalized_lat = (lats - bounds['min_lat']) / lat_range if lat_range > 0 else np.full(len(lats), 0.5)
+    normalized_lon = (lons - bounds['min_lon']) / lon_range if lon_range > 0 else np.full(len(lons), 0.5)
+    return normalized_lat * scale[0] + offset[0], normalized_lon * scale[1] + offset[1]
+
+
+class _ColumnarTraceLoader:
+    """
+    Lazy, cached loading shared by the dataset loaders. The trace is read on first
+    access rather than at construction: from the binary trace cache (memory-mapped
+    columns) when a valid entry exists, otherwise by parsing the CSV once and
+    writing the entry for the next boot.
+    """
+
+    DATASET_NAME = 'Trace'
+    CACHE_NAME = 'trace'
+    CACHE_VERSION = 1  # bump when parsing or the column layout changes
+    # Scale factor and offset of UI coordinates (see normalize_to_ui)
+    UI_SCALE = (2000, 1500)
+    UI_OFFSET = (200, 200)
+
+    def __init__(self, data_path: str):
         self.logger = logging.getLogger(__name__)
+        self._data_path = data_path
+        self._columns: Dict[str, np.ndarray] = {}
+        self._global_bounds: Optional[Dict[str, float]] = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+    def _load(self):
+        if not os.path.isfile(self._data_path):
+            self.logger.warning(f"{self.DATASET_NAME} data file not found: {self._data_path}")
+            return
+        use_cache = getattr(Config, 'TRACE_CACHE_ENABLED', True)
+        cached = load_columns(self._data_path, self.CACHE_NAME, self.CACHE_VERSION) if use_cache else None
+        if cached is not None:
+            meta, columns = cached
+            self._use_columns(columns, meta)
+            self.logger.info(f"Opened {self.DATASET_NAME} trace cache for {os.path.basename(self._data_path)}")
+            return
+        parsed = self._parse_source()
+        if parsed is None:
+            return
+        columns, meta = parsed
+        if use_cache:
+            save_columns(self._data_path, self.CACHE_NAME, self.CACHE_VERSION, columns, meta)
+        self._use_columns(columns, meta)
+
+    def _parse_source(self) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        """Parse the CSV into (columns, JSON-serializable meta), or None if nothing was loaded."""
+        raise NotImplementedError
+
+    def _use_columns(self, columns: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        raise NotImplementedError
+
+    def _normalize_columns(self, lats: np.ndarray, lons: np.ndarray,
+                           bounds: Optional[Dict[str, float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        UI coordinates for whole columns in one vectorized pass. The bounds are
+        computed from the given columns unless the dataset's bounds are passed in,
+        and kept as the dataset's reference frame.
+        """
+        if bounds is None:
+            bounds = coordinate_bounds(lats, lons)
+        self._global_bounds = bounds
+        return normalize_to_ui(lats, lons, bounds, self.UI_SCALE, self.UI_OFFSET)
+
+    @staticmethod
+    def _items_from_arrays(arrays: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Per-item dicts of the JSON step format, built from step arrays."""
+        return [
+            {
+                "id": item_id,
+                "x": x,
+                "y": y,
+                "speed": speed,
+                "acceleration": acceleration,
+                "heading": heading,
+                "heading_change": heading_change,
+                "size": 8,  # Default size
+            }
+            for item_id, x, y, speed, acceleration, heading, heading_change in zip(
+                *(np.asarray(arrays[name]).tolist() for name in STEP_FIELDS))
+        ]
+
+
+class DactDataLoader(_ColumnarTraceLoader):
+    """
+    Loads and manages DACT dataset for simulation.
+    Steps are stored as columns sorted by (timestep, item_id) with UI coordinates
+    precomputed; step_values/step_offsets index each timestep's row range.
+    """
+
+    DATASET_NAME = 'DACT'
+    CACHE_NAME = 'dact'
+    CACHE_VERSION = 1
+    UI_OFFSET = (200, 150)
+
+    def __init__(self, data_path: str = None):
         # Look for data in the project data directory
         if data_path is None:
             project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
             data_path = os.path.join(project_root, 'mock_data', 'DACT-Easy-Dataset.csv')
-        
-        self._data_path = data_path
-        self._data = None
+        super().__init__(data_path)
+        # Trips as nested dicts; only built when parsing or when get_all_data asks for them
+        self._data: Optional[List[Dict[str, Any]]] = None
+        self._trip_ids: List[str] = []
+        self._step_values = np.empty(0, dtype=np.int64)
+        self._step_offsets = np.zeros(1, dtype=np.int64)
+
+    def _parse_source(self):
         self._load_data()
+        if not self._data:
+            return None
+        columns = self._build_step_index()
+        meta = {'trip_ids': [trip['trip_id'] for trip in self._data], 'bounds': self._global_bounds}
+        return columns, meta
+
+    def _use_columns(self, columns: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        columns = dict(columns)
+        self._step_values = columns.pop('step_values')
+        self._step_offsets = columns.pop('step_offsets')
+        self._columns = columns
+        self._trip_ids = list(meta['trip_ids'])
+        self._global_bounds = meta.get('bounds')
 
     def _load_data(self):
         """
         Load data from the specified CSV file and organize it by trip_id.
         """
-        if not os.path.isfile(self._data_path):
-            self.logger.warning(f"DACT data file not found: {self._data_path}")
-            self._data = []
-            return
-
         trip_dict = defaultdict(list)
         try:
             with open(self._data_path, 'r') as file:
@@ -90,192 +261,212 @@ class DactDataLoader:
             self.logger.error(f"Failed to load DACT data: {e}")
             self._data = []
 
-    def _normalize_coordinates(self, items: List[Dict]) -> List[Dict]:
+    def _build_step_index(self) -> Dict[str, np.ndarray]:
         """
-        Scale coordinates for UI visibility while preserving relative positioning.
-        Uses global min/max from entire dataset to maintain consistency across timesteps.
+        Lay every step of every trip out as columns grouped by timestep, with UI
+        coordinates precomputed, so a step lookup only touches that step's rows.
         """
-        if not items or not self._data:
-            return items
-
-        # Get global min/max from entire dataset to preserve movement continuity
-        if not hasattr(self, '_global_bounds'):
-            all_lats = []
-            all_lons = []
-            for trip in self._data:
-                for step in trip['steps']:
-                    all_lats.append(step['location']['lat'])
-                    all_lons.append(step['location']['lon'])
-            
-            self._global_bounds = {
-                'min_lat': min(all_lats) if all_lats else 0,
-                'max_lat': max(all_lats) if all_lats else 1,
-                'min_lon': min(all_lons) if all_lons else 0,
-                'max_lon': max(all_lons) if all_lons else 1
-            }
+        trips = self._data or []
+        rows = [
+            (trip['item_id'], step['timestep'], step['location']['lat'], step['location']['lon'], step['speed'],
+             step['acceleration'], step['heading'], step['heading_change'])
+            for trip in trips for step in trip['steps']
+        ]
+        table = np.array(rows, dtype=np.float64).reshape(-1, 8)
+        item_id, timestep = table[:, 0].astype(np.int64), table[:, 1].astype(np.int64)
+        # Group by timestep, trips in dataset order; a trip repeating a timestep keeps its first row
+        order = np.lexsort((np.arange(len(table)), item_id, timestep))
+        item_id, timestep, table = item_id[order], timestep[order], table[order]
+        first = np.ones(len(table), dtype=bool)
+        first[1:] = (timestep[1:] != timestep[:-1]) | (item_id[1:] != item_id[:-1])
+        item_id, timestep, table = item_id[first], timestep[first], table[first]
 
-        # Scale factor for UI visibility with larger distances between items
-        scale_x = 2000  # Much larger scale for better separation
-        scale_y = 1500  # Much larger scale for better separation
-        offset_x = 200  # Larger offset from edge
-        offset_y = 150  # Larger offset from edge
+        x, y = self._normalize_columns(table[:, 2], table[:, 3])
+        steps, starts = np.unique(timestep, return_index=True)
+        return {
+            'item_id': item_id,
+            'timestep': timestep,
+            'lat': table[:, 2],
+            'lon': table[:, 3],
+            'x': x,
+            'y': y,
+            'speed': table[:, 4],
+            'acceleration': table[:, 5],
+            'heading': table[:, 6],
+            'heading_change': table[:, 7],
+            'step_values': steps,
+            'step_offsets': np.append(starts, len(timestep)).astype(np.int64),
+        }
 
-        for item in items:
-            # Normalize using global bounds to preserve relative positioning
-            lat_range = self._global_bounds['max_lat'] - self._global_bounds['min_lat']
-            lon_range = self._global_bounds['max_lon'] - self._global_bounds['min_lon']
-            
-            if lat_range > 0:
-                normalized_lat = (item['x'] - self._global_bounds['min_lat']) / lat_range
-            else:
-                normalized_lat = 0.5
-                
-            if lon_range > 0:
-                normalized_lon = (item['y'] - self._global_bounds['min_lon']) / lon_range
-            else:
-                normalized_lon = 0.5
-            
-            # Apply scaling and offset for UI
-            item['x'] = normalized_lat * scale_x + offset_x
-            item['y'] = normalized_lon * scale_y + offset_y
+    def _step_range(self, step_id) -> Tuple[int, int]:
+        k = int(np.searchsorted(self._step_values, step_id))
+        if k < len(self._step_values) and self._step_values[k] == step_id:
+            return int(self._step_offsets[k]), int(self._step_offsets[k + 1])
+        return 0, 0
 
-        return items
+    def get_step_arrays(self, step_id: int) -> Optional[Dict[str, np.ndarray]]:
+        """
+        One timestep as parallel arrays keyed by STEP_FIELDS (ids are the integer
+        item ids, x/y are UI coordinates), sliced straight from the step index.
+        None past the last timestep, like the end of a streamed trace.
+        """
+        self._ensure_loaded()
+        if not self._trip_ids or step_id > self._step_values[-1]:
+            return None
+        start, stop = self._step_range(step_id)
+        columns = self._columns
+        arrays = {name: columns[name][start:stop] for name in STEP_FIELDS if name != 'id'}
+        arrays['id'] = columns['item_id'][start:stop]
+        return arrays
 
     def get_data_by_step(self, step_id: int) -> Optional[Dict[str, Any]]:
         """
         Retrieve data by step_id (timestep) from the DACT dataset.
         """
-        if not self._data:
+        arrays = self.get_step_arrays(step_id)
+        if arrays is None:
             return None
-        items = []
-        for item in self._data:
-            for step in item['steps']:
-                if step['timestep'] == step_id:
-                    items.append({
-                        "id": item['item_id'],
-                        "x": step['location']['lat'],
-                        "y": step['location']['lon'],
-                        "speed": step['speed'],
-                        "acceleration": step['acceleration'],
-                        "heading": step['heading'],
-                        "heading_change": step['heading_change'],
-                        "size": 8,  # Default size
-                    })
-                    break
-        
-        items = self._normalize_coordinates(items)
         return {
             "step_id": step_id,
-            "items": items
+            "items": self._items_from_arrays(arrays)
         }
 
     def get_all_data(self) -> List[Dict[str, Any]]:
         """Get the full dataset."""
+        self._ensure_loaded()
+        if self._data is None and self._trip_ids:
+            self._data = self._trips_from_columns()
         return self._data or []
 
+    def _trips_from_columns(self) -> List[Dict[str, Any]]:
+        """Rebuild the nested trip list from cached columns (steps in timestep order)."""
+        columns = {name: np.asarray(column) for name, column in self._columns.items()}
+        order = np.lexsort((columns['timestep'], columns['item_id']))
+        trips = [{"item_id": idx, "trip_id": trip_id, "steps": []}
+                 for idx, trip_id in enumerate(self._trip_ids, start=1)]
+        for row in order.tolist():
+            trips[int(columns['item_id'][row]) - 1]['steps'].append({
+                "timestep": int(columns['timestep'][row]),
+                "location": {"lat": float(columns['lat'][row]), "lon": float(columns['lon'][row])},
+                "speed": float(columns['speed'][row]),
+                "acceleration": float(columns['acceleration'][row]),
+                "heading": float(columns['heading'][row]),
+                "heading_change": float(columns['heading_change'][row]),
+            })
+        return trips
+
     def __len__(self) -> int:
         """Get the number of trip items loaded."""
-        return len(self._data or [])
+        self._ensure_loaded()
+        return len(self._trip_ids)
 
 
-class VehicleDataLoader:
-    """Loads and manages vehicle dataset for simulation"""
-    
+class VehicleDataLoader(_ColumnarTraceLoader):
+    """
+    Loads and manages vehicle dataset for simulation.
+    Records are held as typed columns sorted by time (vehicle ids interned to
+    integer codes), so a timestep lookup is a binary search plus one slice.
+    """
+
+    DATASET_NAME = 'Vehicle'
+    CACHE_NAME = 'vehicles'
+    CACHE_VERSION = 1
+
+    # Numeric CSV fields, stored as float64 columns
+    FLOAT_FIELDS = ('time', 'x', 'y', 'lon', 'lat', 'speed', 'angle')
+
     def __init__(self, data_path: str = None):
-        self.logger = logging.getLogger(__name__)
         # Look for data in the project data directory
         if data_path is None:
             project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
             data_path = os.path.join(project_root, 'mock_data', 'vehicles_data_5min.csv')
-        
-        self._data_path = data_path
-        self._data = None
-        self._load_data()
-    
-    def _load_data(self):
+        super().__init__(data_path)
+        self._vehicle_ids: List[str] = []
+        self._vehicle_id_array = np.empty(0, dtype=object)
+
+    def __len__(self) -> int:
+        """Get the number of vehicle records loaded."""
+        self._ensure_loaded()
+        return len(self._columns.get('time', ()))
+
+    def _use_columns(self, columns: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self._columns = dict(columns)
+        self._vehicle_ids = list(meta['vehicle_ids'])
+        # Object array so a timestep's ids are one fancy-indexing take
+        self._vehicle_id_array = np.array(self._vehicle_ids, dtype=object)
+        self._global_bounds = meta.get('bounds')
+
+    def _parse_source(self):
         """
-        Load and preprocess vehicle data from the specified CSV file.
-        Converts fields to appropriate types for later use.
+        Load vehicle records from the CSV file into time-sorted columns and
+        precompute UI coordinates.
         """
-        if not os.path.isfile(self._data_path):
-            self.logger.warning(f"Vehicle data file not found: {self._data_path}")
-            self._data = []
-            return
-
-        self._data = []
+        # Compact typed buffers while parsing: no per-row dicts or boxed floats
+        values = {name: array('d') for name in self.FLOAT_FIELDS}
+        codes = array('i')
+        code_of: Dict[str, int] = {}
+        vehicle_ids: List[str] = []
         try:
             with open(self._data_path, 'r', newline='') as file:
                 reader = csv.DictReader(file)
                 for row in reader:
                     try:
-                        self._data.append({
-                            "time": float(row["time"]),
-                            "vehicle_id": row["vehicle_id"].strip(),
-                            "x": float(row["x"]),
-                            "y": float(row["y"]),
-                            "lon": float(row["lon"]),
-                            "lat": float(row["lat"]),
-                            "speed": float(row["speed"]),
-                            "angle": float(row["angle"])
-                        })
-                    except (ValueError, KeyError) as e:
+                        parsed = [float(row[name]) for name in self.FLOAT_FIELDS]
+                        vehicle_id = row["vehicle_id"].strip()
+                    except (ValueError, KeyError, TypeError, AttributeError) as e:
                         self.logger.warning(f"Skipping malformed row: {row} - Error: {e}")
-                        
-            if not self._data:
-                self.logger.warning(f"Loaded file but found no valid vehicle data in: {self._data_path}")
-            else:
-                self.logger.info(f"Loaded {len(self._data)} vehicle records")
-                
+                        continue
+                    for name, value in zip(self.FLOAT_FIELDS, parsed):
+                        values[name].append(value)
+                    code = code_of.get(vehicle_id)
+                    if code is None:
+                        code = code_of[vehicle_id] = len(vehicle_ids)
+                        vehicle_ids.append(vehicle_id)
+                    codes.append(code)
         except Exception as e:
             self.logger.error(f"Failed to read vehicle data file {self._data_path}: {e}")
-            self._data = []
-            
-    def _normalize_coordinates(self, items: List[Dict]) -> List[Dict]:
-        """
-        Scale coordinates for UI visibility while preserving relative positioning.
-        Uses global min/max from entire dataset to maintain consistency across timesteps.
-        """
-        if not items or not self._data:
-            return items
-
-        # Get global min/max from entire dataset to preserve movement continuity
-        if not hasattr(self, '_global_bounds'):
-            all_lats = [row['lat'] for row in self._data]
-            all_lons = [row['lon'] for row in self._data]
-            self._global_bounds = {
-                'min_lat': min(all_lats),
-                'max_lat': max(all_lats),
-                'min_lon': min(all_lons),
-                'max_lon': max(all_lons)
-            }
+            return None
 
-        # Scale factor for UI visibility with larger distances between items
-        scale_x = 2000  # Much larger scale for better separation
-        scale_y = 1500  # Much larger scale for better separation
-        offset_x = 200  # Larger offset from edge
-        offset_y = 200  # Larger offset from edge
+        if not codes:
+            self.logger.warning(f"Loaded file but found no valid vehicle data in: {self._data_path}")
+            return None
 
-        for item in items:
-            # Normalize using global bounds to preserve relative positioning
-            lat_range = self._global_bounds['max_lat'] - self._global_bounds['min_lat']
-            lon_range = self._global_bounds['max_lon'] - self._global_bounds['min_lon']
-            
-            if lat_range > 0:
-                normalized_lat = (item['x'] - self._global_bounds['min_lat']) / lat_range
-            else:
-                normalized_lat = 0.5
-                
-            if lon_range > 0:
-                normalized_lon = (item['y'] - self._global_bounds['min_lon']) / lon_range
-            else:
-                normalized_lon = 0.5
-            
-            # Apply scaling and offset for UI
-            item['x'] = normalized_lat * scale_x + offset_x
-            item['y'] = normalized_lon * scale_y + offset_y
+        columns = {name: np.frombuffer(buffer, dtype=np.float64) for name, buffer in values.items()}
+        columns['vehicle_code'] = np.frombuffer(codes, dtype=np.int32)
+        # Stable sort keeps file order among records of the same timestep
+        order = np.argsort(columns['time'], kind='stable')
+        columns = {name: column[order] for name, column in columns.items()}
+        columns['ui_x'], columns['ui_y'] = self._normalize_columns(columns['lat'], columns['lon'])
+        self.logger.info(f"Loaded {len(order)} vehicle records")
+        return columns, {'vehicle_ids': vehicle_ids, 'bounds': self._global_bounds}
+
+    def _timestep_range(self, timestep: float) -> Tuple[int, int]:
+        times = self._columns['time']
+        timestep = float(timestep)
+        return int(np.searchsorted(times, timestep, side='left')), int(np.searchsorted(times, timestep, side='right'))
+
+    def get_timestep_arrays(self, timestep: float) -> Optional[Dict[str, np.ndarray]]:
+        """
+        One timestep as parallel arrays keyed by STEP_FIELDS (ids are vehicle id
+        strings, x/y are UI coordinates, heading is the recorded angle).
+        None past the last timestep, like the end of a streamed trace.
+        """
+        self._ensure_loaded()
+        if not self._columns or float(timestep) > self._columns['time'][-1]:
+            return None
+        start, stop = self._timestep_range(timestep)
+        columns = self._columns
+        count = stop - start
+        return {
+            'id': self._vehicle_id_array[columns['vehicle_code'][start:stop]],
+            'x': columns['ui_x'][start:stop],
+            'y': columns['ui_y'][start:stop],
+            'speed': columns['speed'][start:stop],
+            'acceleration': np.zeros(count),
+            'heading': columns['angle'][start:stop],
+            'heading_change': np.zeros(count),
+        }
 
-        return items
-            
     def get_data_by_timestep(self, timestep: float) -> Optional[Dict[str, Any]]:
         """
         Retrieve vehicle data by timestep and normalize coordinates.
@@ -297,26 +488,143 @@ class VehicleDataLoader:
             ]
         }
         """
-        if not self._data:
+        arrays = self.get_timestep_arrays(timestep)
+        if arrays is None:
             return None
-            
-        items = []
-        for row in self._data:
-            if float(row["time"]) == float(timestep):
-                items.append({
-                    "id": row["vehicle_id"],
-                    "x": float(row["lat"]),
-                    "y": float(row["lon"]),
-                    "speed": float(row["speed"]),
-                    "acceleration": 0.0,
-                    "heading": float(row["angle"]),
-                    "heading_change": 0.0,
-                    "size": 8
-                })
-
-        items = self._normalize_coordinates(items)
 
         return {
             "step_id": timestep,
-            "items": items
+            "items": self._items_from_arrays(arrays)
         }
+
+
+class _StreamingTraceMixin:
+    """
+    Readiness shared by the streaming loaders. The stream's prepass runs on its own
+    thread (from boot, see prepare()); step requests wait at most
+    TRACE_STREAM_READY_TIMEOUT for it and raise TraceNotReady instead of blocking.
+    A trace the stream refuses (not time-ordered) is indexed in the background the
+    same way and then served by the indexed loader.
+    """
+
+    def _init_streaming(self, stream: TracePlaybackStream):
+        self._stream = stream
+        self._ready_timeout: float = getattr(Config, 'TRACE_STREAM_READY_TIMEOUT', 0.25)
+        self._index_thread: Optional[threading.Thread] = None
+
+    def prepare(self):
+        """Start the prepass in the background."""
+        if os.path.isfile(self._data_path):
+            self._stream.start()
+
+    def _streamable(self) -> bool:
+        """True to serve steps from the stream, False to use the indexed loader."""
+        name = os.path.basename(self._data_path)
+        if not self._stream.wait_ready(self._ready_timeout):
+            raise TraceNotReady(f"{name}: streaming prepass still running")
+        if self._stream.ordered is not False:
+            return True
+        if not self._loaded:
+            if self._index_thread is None:
+                self._index_thread = threading.Thread(target=self._ensure_loaded, name='trace-index-load', daemon=True)
+                self._index_thread.start()
+            self._index_thread.join(self._ready_timeout)
+            if not self._loaded:
+                raise TraceNotReady(f"{name}: not time-ordered, indexing it instead")
+        return False
+
+    def stream_status(self) -> Dict[str, Any]:
+        return dict(self._stream.status(), fallback='indexed' if self._stream.ordered is False else None)
+
+
+class StreamingDactDataLoader(_StreamingTraceMixin, DactDataLoader):
+    """
+    DACT playback streamed from a CSV ordered by TimeStep (see TracePlaybackStream)
+    instead of loading the whole trace. Item ids are assigned in the order trips
+    are first seen and stay stable across playback restarts.
+    """
+
+    def __init__(self, data_path: str = None, chunk_rows: Optional[int] = None, buffer_chunks: Optional[int] = None):
+        super().__init__(data_path)
+        self._init_streaming(TracePlaybackStream(
+            self._data_path, 'TimeStep',
+            float_fields={'lat': 'Latitude', 'lon': 'Longitude', 'speed': 'Speed', 'acceleration': 'Acceleration',
+                          'heading': 'Heading', 'heading_change': 'HeadingChange'},
+            text_fields={'trip_id': 'TripID'},
+            chunk_rows=chunk_rows or getattr(Config, 'TRACE_STREAM_CHUNK_ROWS', 50000),
+            buffer_chunks=buffer_chunks or getattr(Config, 'TRACE_STREAM_BUFFER_CHUNKS', 4),
+            bounds_fields=('lat', 'lon'),
+            cache_name=self.CACHE_NAME,
+        ))
+        self._item_ids: Dict[str, int] = {}
+
+    def get_step_arrays(self, step_id: int) -> Optional[Dict[str, np.ndarray]]:
+        if not os.path.isfile(self._data_path):
+            return None
+        if not self._streamable():
+            # Refused for streaming (error logged by the stream): serve it from the indexed loader
+            return super().get_step_arrays(step_id)
+        bounds = self._stream.bounds
+        rows = self._stream.rows_at(step_id) if bounds else None
+        if rows is None:
+            return None
+        item_ids = np.fromiter((self._item_ids.setdefault(trip_id, len(self._item_ids) + 1) for trip_id in rows['trip_id']),
+                               dtype=np.int64, count=len(rows['trip_id']))
+        # Same item order as the indexed loader; a trip repeating the step keeps its first row
+        order = np.argsort(item_ids, kind='stable')
+        order = order[np.r_[True, item_ids[order][1:] != item_ids[order][:-1]]] if len(order) else order
+        arrays = {name: rows[name][order] for name in ('speed', 'acceleration', 'heading', 'heading_change')}
+        arrays['id'] = item_ids[order]
+        arrays['x'], arrays['y'] = self._normalize_columns(rows['lat'][order], rows['lon'][order], bounds)
+        return arrays
+
+    def get_all_data(self) -> List[Dict[str, Any]]:
+        """Not available while streaming: the trace is never held in memory."""
+        return []
+
+    def __len__(self) -> int:
+        """Number of trips seen so far."""
+        return len(self._item_ids)
+
+
+class StreamingVehicleDataLoader(_StreamingTraceMixin, VehicleDataLoader):
+    """Vehicle playback streamed from a CSV ordered by time (see TracePlaybackStream)."""
+
+    def __init__(self, data_path: str = None, chunk_rows: Optional[int] = None, buffer_chunks: Optional[int] = None):
+        super().__init__(data_path)
+        self._init_streaming(TracePlaybackStream(
+            self._data_path, 'time',
+            # Every field the indexed loader parses, so both skip the same malformed rows
+            float_fields={name: name for name in self.FLOAT_FIELDS},
+            text_fields={'vehicle_id': 'vehicle_id'},
+            chunk_rows=chunk_rows or getattr(Config, 'TRACE_STREAM_CHUNK_ROWS', 50000),
+            buffer_chunks=buffer_chunks or getattr(Config, 'TRACE_STREAM_BUFFER_CHUNKS', 4),
+            bounds_fields=('lat', 'lon'),
+            cache_name=self.CACHE_NAME,
+        ))
+
+    def get_timestep_arrays(self, timestep: float) -> Optional[Dict[str, np.ndarray]]:
+        if not os.path.isfile(self._data_path):
+            return None
+        if not self._streamable():
+            # Refused for streaming (error logged by the stream): serve it from the indexed loader
+            return super().get_timestep_arrays(timestep)
+        bounds = self._stream.bounds
+        rows = self._stream.rows_at(timestep) if bounds else None
+        if rows is None:
+            return None
+        count = len(rows['time'])
+        x, y = self._normalize_columns(rows['lat'], rows['lon'], bounds)
+        return {
+            'id': np.array(rows['vehicle_id'], dtype=object),
+            'x': x,
+            'y': y,
+            'speed': rows['speed'],
+            'acceleration': np.zeros(count),
+            'heading': rows['angle'],
+            'heading_change': np.zeros(count),
+        }
+
+    def __len__(self) -> int:
+        """Unknown while streaming; the trace is never held in memory."""
+        return 0
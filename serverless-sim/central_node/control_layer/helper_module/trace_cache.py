@@ -0,0 +1,96 @@
+"""
+Binary columnar cache for mobility traces.
+A parsed trace is written once as a directory holding meta.json and one .npy
+file per column; later boots memory-map the columns instead of re-parsing the
+CSV, so only the pages touched during playback become resident. Entries are
+keyed by source path, size, mtime and loader version, and a source edit or
+loader change simply produces a new entry (stale ones are removed on save).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+
+TRACE_CACHE_SUFFIX = '.trace'
+
+logger = logging.getLogger(__name__)
+
+
+def cache_dir_for(source_path: str) -> str:
+    """Configured cache directory, or .trace_cache next to the source file."""
+    configured = getattr(Config, 'TRACE_CACHE_DIR', None)
+    if configured:
+        return configured
+    return os.path.join(os.path.dirname(os.path.abspath(source_path)), '.trace_cache')
+
+
+def _entry_prefix(source_path: str, loader: str) -> str:
+    return f"{os.path.basename(source_path)}-{loader}-"
+
+
+def cache_entry_path(source_path: str, loader: str, version: int) -> str:
+    stat = os.stat(source_path)
+    key = f"{os.path.abspath(source_path)}|{stat.st_size}|{stat.st_mtime_ns}|{loader}|{version}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir_for(source_path), _entry_prefix(source_path, loader) + digest + TRACE_CACHE_SUFFIX)
+
+
+def load_columns(source_path: str, loader: str, version: int,
+                 mmap: bool = True) -> Optional[Tuple[Dict[str, Any], Dict[str, np.ndarray]]]:
+    """(meta, columns) of a valid cache entry for the source, or None."""
+    try:
+        path = cache_entry_path(source_path, loader, version)
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        mode = 'r' if mmap else None
+        columns = {
+            name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mode)
+            for name in meta['columns']
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+    return meta, columns
+
+
+def save_columns(source_path: str, loader: str, version: int, columns: Dict[str, np.ndarray],
+                 meta: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Write a cache entry for the source (atomically, via a temporary directory) and
+    drop older entries of the same source and loader. Returns the entry path, or
+    None if the cache directory is not writable.
+    """
+    try:
+        path = cache_entry_path(source_path, loader, version)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=directory)
+        try:
+            for name, column in columns.items():
+                np.save(os.path.join(staging, name + '.npy'), np.ascontiguousarray(column))
+            with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(dict(meta or {}, columns=list(columns), loader=loader, version=version,
+                               source=os.path.abspath(source_path)), f)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            os.replace(staging, path)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+    except OSError as e:
+        logger.warning(f"Could not write trace cache for {source_path}: {e}")
+        return None
+
+    prefix = _entry_prefix(source_path, loader)
+    for name in os.listdir(directory):
+        stale = os.path.join(directory, name)
+        if name.startswith(prefix) and name.endswith(TRACE_CACHE_SUFFIX) and stale != path:
+            shutil.rmtree(stale, ignore_errors=True)
+    return path
@@ -0,0 +1,306 @@
+"""
+Chunked streaming playback for time-ordered CSV traces.
+A prefetch thread parses fixed-size row chunks into typed columns and hands
+them over through a bounded queue, so a trace of any size is replayed with at
+most `buffer_chunks + 1` chunks in memory. Playback is forward-only; asking for
+an earlier timestep restarts the stream from the top of the file. A prepass
+over the file checks that chunked playback would not drop rows; traces that are
+not ordered by time are refused (see TracePlaybackStream.ordered).
+"""
+
+import csv
+import logging
+import queue
+import threading
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from central_node.control_layer.helper_module.trace_cache import load_columns, save_columns
+
+_END = object()  # end-of-file sentinel in the chunk queue
+
+
+class TraceNotReady(RuntimeError):
+    """The stream's prepass has not finished yet; ask again later instead of blocking."""
+
+PREPASS_CACHE_VERSION = 1
+
+
+class TracePlaybackStream:
+    """
+    Serves whole timesteps from a CSV whose rows are ordered by `time_field`.
+    float_fields / text_fields map column names to CSV headers; rows that fail to
+    parse are skipped and counted in `skipped_rows`. Before playback, one streamed
+    prepass (cached next to the trace) computes the min/max of bounds_fields and
+    counts the rows that would arrive behind an earlier chunk (`out_of_order`).
+    Such a trace is not time-ordered: `ordered` becomes False, an error is logged
+    and nothing is streamed, so callers can fall back to an indexed loader.
+    """
+
+    def __init__(self, path: str, time_field: str, float_fields: Dict[str, str],
+                 text_fields: Optional[Dict[str, str]] = None, chunk_rows: int = 50000, buffer_chunks: int = 4,
+                 bounds_fields: Tuple[str, ...] = (), cache_name: str = 'stream'):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.time_field = time_field
+        self.float_fields = dict(float_fields)
+        self.float_fields.setdefault('time', time_field)
+        self.text_fields = dict(text_fields or {})
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.buffer_chunks = max(1, int(buffer_chunks))
+        self.bounds_fields = tuple(bounds_fields)
+        self.cache_name = cache_name
+        self.bounds: Optional[Dict[str, float]] = None
+        # File-level prepass results (None/0 until the prepass has finished)
+        self.ordered: Optional[bool] = None
+        self.rows = 0
+        self.out_of_order = 0
+        self.skipped_rows = 0
+        self.error: Optional[str] = None
+        self._pass_skipped = 0
+        self._reported_drops = False
+
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._consume_lock = threading.Lock()
+        self._prepared = threading.Event()  # prepass finished (or failed)
+        self._chunk: Optional[Dict[str, Any]] = None
+        self._position = 0
+        self._exhausted = False
+        self._last_time: Optional[float] = None
+
+    # --- Producer ---
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._queue = queue.Queue(maxsize=self.buffer_chunks)
+        if self.ordered is None:
+            self._prepared.clear()  # an earlier prepass was interrupted or failed: run it again
+        self._chunk, self._position, self._exhausted, self._last_time = None, 0, False, None
+        self._thread = threading.Thread(target=self._run, name='trace-prefetch', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        # Unblock a producer waiting on a full queue
+        while thread.is_alive():
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            thread.join(timeout=0.05)
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            if self.ordered is None and not self._apply_prepass():
+                return  # interrupted; the next producer runs the prepass again
+            self._prepared.set()
+            if not self.ordered:
+                return  # refused (logged by the prepass): playback would drop rows
+            previous_max = None
+            for chunk in self._read_chunks():
+                # Sort within the chunk; rows older than the previous chunk cannot be replayed
+                times = chunk['time']
+                order = np.argsort(times, kind='stable')
+                if previous_max is not None:
+                    order = order[times[order] >= previous_max]
+                    dropped = len(times) - len(order)
+                    if dropped:
+                        # Only possible if the file changed after the prepass
+                        self.out_of_order += dropped
+                        if not self._reported_drops:
+                            self._reported_drops = True
+                            self.logger.error(f"Trace {self.path} dropped {dropped} out-of-order rows during playback")
+                if not len(order):
+                    continue
+                chunk = {name: (column[order] if isinstance(column, np.ndarray) else [column[i] for i in order.tolist()])
+                         for name, column in chunk.items()}
+                previous_max = chunk['time'][-1]
+                if not self._put(chunk):
+                    return
+        except Exception as e:
+            self.error = str(e)
+            self.logger.error(f"Trace prefetch failed for {self.path}: {e}")
+        finally:
+            self._prepared.set()
+            self._put(_END)
+
+    def _read_rows(self) -> Iterator[Tuple[List[float], List[str]]]:
+        with open(self.path, 'r', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, None) or []
+            column_of = {name: i for i, name in enumerate(header)}
+            float_idx = [column_of[field] for field in self.float_fields.values()]
+            text_idx = [column_of[field] for field in self.text_fields.values()]
+            for row in reader:
+                if self._stop.is_set():
+                    return
+                try:
+                    yield [float(row[i]) for i in float_idx], [row[i].strip() for i in text_idx]
+                except (ValueError, IndexError):
+                    self._pass_skipped += 1
+
+    def _read_chunks(self) -> Iterator[Dict[str, Any]]:
+        float_names, text_names = list(self.float_fields), list(self.text_fields)
+        self._pass_skipped = 0
+
+        def empty():
+            return [array('d') for _ in float_names], [[] for _ in text_names]
+
+        def emit(floats, texts):
+            chunk: Dict[str, Any] = {name: np.frombuffer(buffer, dtype=np.float64) for name, buffer in zip(float_names, floats)}
+            chunk.update(zip(text_names, texts))
+            return chunk
+
+        floats, texts = empty()
+        count = 0
+        for values, strings in self._read_rows():
+            for buffer, value in zip(floats, values):
+                buffer.append(value)
+            for column, value in zip(texts, strings):
+                column.append(value)
+            count += 1
+            if count == self.chunk_rows:
+                yield emit(floats, texts)
+                floats, texts = empty()
+                count = 0
+        if count:
+            yield emit(floats, texts)
+
+    def _prepass(self) -> Optional[Dict[str, Any]]:
+        """
+        One streamed pass over the file (cached per file version and chunk size):
+        min/max of bounds_fields, valid and malformed row counts, and the rows chunked
+        playback would drop as out of order. None if interrupted.
+        """
+        cache_name = f"prepass-{self.cache_name}"  # own prefix: not evicted by the full-trace entry
+        cached = load_columns(self.path, cache_name, PREPASS_CACHE_VERSION)
+        if cached is not None and cached[0].get('chunk_rows') == self.chunk_rows:
+            return cached[0]
+        bounds: Dict[str, float] = {}
+        rows = out_of_order = 0
+        previous_max = None
+        for chunk in self._read_chunks():
+            times = chunk['time']
+            rows += len(times)
+            for name in self.bounds_fields:
+                column = chunk[name]
+                bounds[f"min_{name}"] = min(bounds.get(f"min_{name}", np.inf), float(column.min()))
+                bounds[f"max_{name}"] = max(bounds.get(f"max_{name}", -np.inf), float(column.max()))
+            # Same rule as playback in _run: rows behind the previous chunk's newest row are lost
+            if previous_max is not None:
+                kept = times[times >= previous_max]
+                out_of_order += len(times) - len(kept)
+            else:
+                kept = times
+            if len(kept):
+                previous_max = float(kept.max())
+        if self._stop.is_set():
+            return None  # interrupted; recomputed by the next producer
+        result = {'bounds': bounds, 'rows': rows, 'out_of_order': out_of_order,
+                  'skipped_rows': self._pass_skipped, 'chunk_rows': self.chunk_rows}
+        save_columns(self.path, cache_name, PREPASS_CACHE_VERSION, {}, result)
+        return result
+
+    def _apply_prepass(self) -> bool:
+        result = self._prepass()
+        if result is None:
+            return False
+        self.bounds = result['bounds']
+        self.rows = result['rows']
+        self.out_of_order = result['out_of_order']
+        self.skipped_rows = result['skipped_rows']
+        self.ordered = not self.out_of_order
+        if not self.ordered:
+            self.logger.error(
+                f"Trace {self.path} is not ordered by {self.time_field}: streaming it in chunks of "
+                f"{self.chunk_rows} rows would drop {self.out_of_order} of {self.rows} rows; not streaming it"
+            )
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        """Prepass results and errors for health/status reporting."""
+        return {
+            'ready': self._prepared.is_set(),
+            'ordered': self.ordered,
+            'rows': self.rows,
+            'out_of_order': self.out_of_order,
+            'skipped_rows': self.skipped_rows,
+            'error': self.error,
+        }
+
+    # --- Consumer ---
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Start the producer (prepass first) and wait up to `timeout` for the prepass to finish."""
+        self.start()
+        return self._prepared.wait(timeout)
+
+    def _next_chunk(self) -> bool:
+        item = self._queue.get()
+        if item is _END:
+            self._exhausted = True
+            self._chunk = None
+            return False
+        self._chunk, self._position = item, 0
+        return True
+
+    def rows_at(self, timestep: float) -> Optional[Dict[str, Any]]:
+        """
+        Columns of every row at `timestep`, or None once the trace is exhausted.
+        Rows before `timestep` are skipped; an earlier timestep than the last
+        request restarts playback from the beginning.
+        """
+        with self._consume_lock:
+            return self._rows_at(float(timestep))
+
+    def _rows_at(self, timestep: float) -> Optional[Dict[str, Any]]:
+        self.start()
+        if self._last_time is not None and timestep < self._last_time:
+            self.restart()
+        self._last_time = timestep
+        parts: List[Dict[str, Any]] = []
+        while not self._exhausted:
+            if self._chunk is None and not self._next_chunk():
+                break
+            times = self._chunk['time']
+            start = self._position + int(np.searchsorted(times[self._position:], timestep, side='left'))
+            stop = start + int(np.searchsorted(times[start:], timestep, side='right'))
+            if stop > start:
+                parts.append({name: column[start:stop] for name, column in self._chunk.items()})
+            self._position = stop
+            if stop < len(times):
+                break  # the next row is past `timestep`
+            self._chunk = None  # chunk consumed; the step may continue in the next one
+        if not parts:
+            if self._exhausted:
+                return None
+            empty: Dict[str, Any] = {name: np.empty(0) for name in self.float_fields}
+            empty.update((name, []) for name in self.text_fields)
+            return empty
+        if len(parts) == 1:
+            return parts[0]
+        return {
+            name: (np.concatenate([part[name] for part in parts]) if isinstance(parts[0][name], np.ndarray)
+                   else [value for part in parts for value in part[name]])
+            for name in parts[0]
+        }
@@ -0,0 +1,210 @@
+"""
+Export the shipped .keras trajectory models for the NumPy runtime.
+Reads config.json and model.weights.h5 straight from the .keras archive (needs
+h5py, not TensorFlow) and writes <model>.npmodel/ next to it. With --verify the
+exported forward pass is compared against Keras on random inputs.
+
+Usage (from serverless-sim/):
+    python -m central_node.control_layer.prediction_module.export_numpy_models [--verify] [model.keras ...]
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import sys
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from central_node.control_layer.prediction_module.numpy_runtime import (
+    NumpyModel,
+    load_numpy_model,
+    numpy_model_path,
+    save_numpy_model,
+    source_stamp,
+)
+
+PREDICTION_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Keras class name -> runtime layer type
+LAYER_TYPES = {
+    'InputLayer': 'input',
+    'Dropout': 'dropout',
+    'Dense': 'dense',
+    'BatchNormalization': 'batch_normalization',
+    'GlobalAveragePooling1D': 'global_average_pooling_1d',
+    'GRU': 'gru',
+    'LSTM': 'lstm',
+    'Bidirectional': 'bidirectional',
+}
+
+# Keras config keys kept per layer type
+LAYER_KEYS = {
+    'dense': ('units', 'activation', 'use_bias'),
+    'batch_normalization': ('axis', 'epsilon', 'center', 'scale'),
+    'gru': ('units', 'activation', 'recurrent_activation', 'use_bias', 'return_sequences', 'go_backwards', 'reset_after'),
+    'lstm': ('units', 'activation', 'recurrent_activation', 'use_bias', 'return_sequences', 'go_backwards'),
+    'bidirectional': ('merge_mode',),
+}
+
+
+class UnsupportedModelError(ValueError):
+    pass
+
+
+def _layer_spec(layer: Dict[str, Any]) -> Dict[str, Any]:
+    class_name = layer['class_name']
+    kind = LAYER_TYPES.get(class_name)
+    if kind is None:
+        raise UnsupportedModelError(f"layer {layer['config'].get('name')} ({class_name}) is not supported")
+    config = layer['config']
+    spec = {'type': kind, 'name': config['name']}
+    spec.update({key: config[key] for key in LAYER_KEYS.get(kind, ()) if key in config})
+    if kind in ('gru', 'lstm') and (config.get('return_state') or config.get('stateful')):
+        raise UnsupportedModelError(f"layer {config['name']}: return_state/stateful RNNs are not supported")
+    if kind == 'bidirectional':
+        spec['forward'] = _layer_spec(config['layer'])
+        backward = config.get('backward_layer')
+        if backward is None:
+            backward = json.loads(json.dumps(config['layer']))
+            backward['config']['go_backwards'] = not backward['config'].get('go_backwards', False)
+        spec['backward'] = _layer_spec(backward)
+        if spec['forward']['type'] not in ('gru', 'lstm'):
+            raise UnsupportedModelError(f"layer {config['name']}: only GRU/LSTM can be wrapped in Bidirectional")
+    return spec
+
+
+def _check_linear(layers: List[Dict[str, Any]]):
+    """The runtime only runs plain stacks: every layer must consume the previous one."""
+    for previous, layer in zip(layers, layers[1:]):
+        nodes = layer.get('inbound_nodes') or []
+        if not nodes:
+            continue  # Sequential config
+        args = nodes[0].get('args') or []
+        history = args[0].get('config', {}).get('keras_history') if len(args) == 1 and isinstance(args[0], dict) else None
+        if len(nodes) != 1 or not history or history[0] != previous['config']['name']:
+            raise UnsupportedModelError(f"layer {layer['config']['name']} is not part of a linear stack")
+
+
+def _vars_by_layer_name(weights_file) -> Dict[str, Any]:
+    """Keras 3 stores weights under auto-generated paths; map them back via the 'name' attribute."""
+    groups = {}
+    for group in weights_file['layers'].values():
+        if 'vars' in group and 'name' in group['vars'].attrs:
+            groups[group['vars'].attrs['name']] = group
+    return groups
+
+
+def _read_vars(group) -> List[np.ndarray]:
+    variables = group['vars']
+    return [np.asarray(variables[key]) for key in sorted(variables, key=int)]
+
+
+def _layer_weights(spec: Dict[str, Any], group) -> List[np.ndarray]:
+    if spec['type'] in ('gru', 'lstm'):
+        return _read_vars(group['cell'])
+    if spec['type'] == 'bidirectional':
+        return _read_vars(group['forward_layer']['cell']) + _read_vars(group['backward_layer']['cell'])
+    return _read_vars(group)
+
+
+def read_keras_model(keras_path: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Runtime spec and named weights for a Keras 3 .keras archive."""
+    try:
+        import h5py
+    except ImportError as e:
+        raise ImportError("h5py is required to export .keras models") from e
+
+    stamp = source_stamp(keras_path)  # before reading, so a concurrent rewrite leaves the export stale
+    if os.path.getsize(keras_path) == 0:
+        raise UnsupportedModelError("empty model file (placeholder without trained weights)")
+    with zipfile.ZipFile(keras_path) as archive:
+        config = json.loads(archive.read('config.json'))
+        weights_blob = archive.read('model.weights.h5')
+    if config.get('class_name') not in ('Functional', 'Sequential', 'Model'):
+        raise UnsupportedModelError(f"model class {config.get('class_name')} is not supported")
+
+    layers = config['config']['layers']
+    _check_linear(layers)
+    specs = [_layer_spec(layer) for layer in layers]
+    input_shape = next((layer['config'].get('batch_shape') for layer in layers
+                        if layer['class_name'] == 'InputLayer'), None)
+
+    weights: Dict[str, np.ndarray] = {}
+    with h5py.File(io.BytesIO(weights_blob), 'r') as weights_file:
+        groups = _vars_by_layer_name(weights_file)
+        for index, spec in enumerate(specs):
+            if spec['type'] in ('input', 'dropout', 'global_average_pooling_1d'):
+                continue
+            if spec['name'] not in groups:
+                raise UnsupportedModelError(f"no weights found for layer {spec['name']}")
+            names = []
+            for position, value in enumerate(_layer_weights(spec, groups[spec['name']])):
+                name = f"{index:02d}_{spec['type']}_{position}"
+                weights[name] = value
+                names.append(name)
+            spec['weights'] = names
+
+    spec = {
+        'name': config['config'].get('name', os.path.basename(keras_path)),
+        # Source file identity: load_numpy_model ignores the export once the .keras changes
+        **stamp,
+        'input_shape': input_shape,
+        'layers': specs,
+    }
+    return spec, weights
+
+
+def export_keras_model(keras_path: str, output_path: Optional[str] = None) -> str:
+    """Export one .keras model; returns the .npmodel directory."""
+    spec, weights = read_keras_model(keras_path)
+    output_path = output_path or numpy_model_path(keras_path)
+    save_numpy_model(output_path, spec, weights)
+    return output_path
+
+
+def verify_export(keras_path: str, model: NumpyModel, samples: int = 256, seed: int = 0) -> float:
+    """Max absolute difference between Keras and NumPy outputs on random inputs (needs keras)."""
+    import keras
+
+    reference = keras.models.load_model(keras_path, compile=False)
+    shape = [samples] + [dim or 1 for dim in model.input_shape[1:]]
+    X = np.random.default_rng(seed).normal(size=shape).astype(np.float32)
+    expected = np.asarray(reference(X, training=False))
+    return float(np.max(np.abs(expected - model(X))))
+
+
+def shipped_models() -> List[str]:
+    return sorted(glob.glob(os.path.join(PREDICTION_MODULE_DIR, '*', '*.keras')))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export .keras trajectory models for the NumPy runtime")
+    parser.add_argument('models', nargs='*', help="model files (default: every .keras under prediction_module)")
+    parser.add_argument('--verify', action='store_true', help="compare against Keras on random inputs")
+    parser.add_argument('--tolerance', type=float, default=1e-4)
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for keras_path in args.models or shipped_models():
+        label = os.path.relpath(keras_path, PREDICTION_MODULE_DIR)
+        try:
+            output_path = export_keras_model(keras_path)
+        except (UnsupportedModelError, zipfile.BadZipFile, KeyError) as e:
+            print(f"skip   {label}: {e}")
+            continue
+        message = f"export {label} -> {os.path.basename(output_path)}"
+        if args.verify:
+            diff = verify_export(keras_path, load_numpy_model(output_path))
+            ok = diff <= args.tolerance
+            failures += not ok
+            message += f" (max abs diff {diff:.2e}{'' if ok else ' FAILED'})"
+        print(message)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
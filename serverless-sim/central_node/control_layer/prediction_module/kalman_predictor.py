@@ -0,0 +1,278 @@
+"""
+Vectorized Kalman-filter trajectory predictor.
+Keeps a constant-velocity ('cv') or constant-acceleration ('ca') filter per user,
+with the state of every user held in arrays, so a batch of location updates is
+one vectorized predict/update step and a scan predicts all users at once.
+The x and y axes use the same motion model and share one covariance matrix.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MOTION_MODELS = {'cv': 2, 'ca': 3}  # state size per axis: position, velocity[, acceleration]
+
+
+class KalmanTrajectoryPredictor:
+    """
+    Drop-in predictor backend (predict_next / predict_batch) for the PREDICTIVE strategy.
+    The scheduler feeds it observations through observe(); users without filter
+    state fall back to linear extrapolation from their history window.
+    """
+
+    def __init__(self, motion_model: str = 'cv', process_noise: float = 25.0, measurement_noise: float = 4.0,
+                 initial_velocity_variance: float = 400.0, max_dt: float = 10.0, capacity: int = 1024,
+                 step_seconds: float = 1.0):
+        if motion_model not in MOTION_MODELS:
+            raise ValueError(f"Unknown motion model: {motion_model}")
+        self.motion_model = motion_model
+        self.dim = MOTION_MODELS[motion_model]
+        self.process_noise = float(process_noise)  # q: white-noise intensity of the highest derivative
+        self.measurement_noise = float(measurement_noise)  # r: position variance (px^2)
+        self.initial_velocity_variance = float(initial_velocity_variance)
+        self.max_dt = float(max_dt)
+        self.step_seconds = float(step_seconds)  # horizon of one forecast step
+        self.sequence_length = 2
+        self.using_gnn = False
+        self.model_backend = 'kalman'
+        self.model = None
+        # Predictions only change with observations, which also advance the user's history
+        self.model_version = 0
+
+        self._lock = threading.Lock()
+        self._capacity = max(1, int(capacity))
+        self._count = 0
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._state = np.zeros((self._capacity, 2, self.dim))  # per axis: [pos, vel(, acc)]
+        self._cov = np.zeros((self._capacity, self.dim, self.dim))
+        self._last_ts = np.zeros(self._capacity)
+        self._interval = np.zeros(self._capacity)  # smoothed observation interval (one-step horizon)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, user_id) -> bool:
+        return user_id in self._index
+
+    # --- Motion model ---
+    def _transition(self, dt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-row transition F(dt) and process noise Q(dt), each (n, dim, dim)."""
+        n, q = len(dt), self.process_noise
+        F = np.zeros((n, self.dim, self.dim))
+        Q = np.empty((n, self.dim, self.dim))
+        idx = np.arange(self.dim)
+        F[:, idx, idx] = 1.0
+        F[:, 0, 1] = dt
+        dt2, dt3 = dt * dt, dt * dt * dt
+        if self.dim == 2:
+            Q[:, 0, 0] = dt3 / 3
+            Q[:, 0, 1] = Q[:, 1, 0] = dt2 / 2
+            Q[:, 1, 1] = dt
+        else:
+            F[:, 1, 2] = dt
+            F[:, 0, 2] = dt2 / 2
+            dt4, dt5 = dt3 * dt, dt3 * dt2
+            Q[:, 0, 0] = dt5 / 20
+            Q[:, 0, 1] = Q[:, 1, 0] = dt4 / 8
+            Q[:, 0, 2] = Q[:, 2, 0] = dt3 / 6
+            Q[:, 1, 1] = dt3 / 3
+            Q[:, 1, 2] = Q[:, 2, 1] = dt2 / 2
+            Q[:, 2, 2] = dt
+        return F, Q * q
+
+    def _propagate(self, rows: np.ndarray, dt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        F, Q = self._transition(dt)
+        F_T = F.transpose(0, 2, 1)
+        state = self._state[rows] @ F_T
+        cov = F @ self._cov[rows] @ F_T + Q
+        return state, cov
+
+    # --- Row management ---
+    def _grow(self, minimum: int):
+        capacity = self._capacity
+        while capacity < minimum:
+            capacity *= 2
+        for name in ('_state', '_cov', '_last_ts', '_interval'):
+            column = getattr(self, name)
+            grown = np.zeros((capacity,) + column.shape[1:])
+            grown[:self._count] = column[:self._count]
+            setattr(self, name, grown)
+        self._capacity = capacity
+
+    def _remove_row(self, user_id: str):
+        row = self._index.pop(user_id)
+        last = self._count - 1
+        if row != last:
+            moved_id = self._ids[last]
+            for column in (self._state, self._cov, self._last_ts, self._interval):
+                column[row] = column[last]
+            self._ids[row] = moved_id
+            self._index[moved_id] = row
+        self._ids.pop()
+        self._count = last
+
+    def forget(self, user_ids: Iterable[str]):
+        with self._lock:
+            for user_id in user_ids:
+                if user_id in self._index:
+                    self._remove_row(user_id)
+
+    def retain(self, user_ids: Iterable[str]):
+        """Drop filter state of users that are no longer registered."""
+        keep = set(user_ids)
+        with self._lock:
+            for user_id in [user_id for user_id in self._ids if user_id not in keep]:
+                self._remove_row(user_id)
+
+    # --- Filtering ---
+    def observe(self, user_ids: Sequence[str], positions, timestamps=None, reset: bool = False):
+        """
+        Assimilate one position per user in a single vectorized predict/update step.
+        positions: (n, 2); timestamps: scalar or (n,) seconds (default: now).
+        New users (or all given users with reset=True) start at rest at the observed position.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if not len(positions):
+            return
+        timestamps = np.broadcast_to(np.asarray(time.time() if timestamps is None else timestamps, dtype=float),
+                                     (len(positions),))
+        with self._lock:
+            # Keep the last observation of users repeated within the batch
+            latest: Dict[str, int] = dict(zip(user_ids, range(len(positions))))
+            count = len(latest)
+            index = self._index
+            rows = np.fromiter((index.get(user_id, -1) for user_id in latest), dtype=np.int64, count=count)
+            obs = np.fromiter(latest.values(), dtype=np.int64, count=count)
+            new = np.flatnonzero(rows < 0)
+            if new.size:
+                if self._count + new.size > self._capacity:
+                    self._grow(self._count + new.size)
+                rows[new] = np.arange(self._count, self._count + new.size)
+                new_ids = list(latest)
+                for k in new.tolist():
+                    index[new_ids[k]] = int(rows[k])
+                    self._ids.append(new_ids[k])
+                self._count += new.size
+            fresh = np.full(count, reset, dtype=bool)
+            fresh[new] = True
+
+            if fresh.any():
+                rows_fresh, obs_fresh = rows[fresh], obs[fresh]
+                self._state[rows_fresh] = 0.0
+                self._state[rows_fresh, :, 0] = positions[obs_fresh]
+                self._cov[rows_fresh] = 0.0
+                self._cov[rows_fresh, 0, 0] = self.measurement_noise
+                self._cov[rows_fresh, 1, 1] = self.initial_velocity_variance
+                if self.dim == 3:
+                    self._cov[rows_fresh, 2, 2] = self.initial_velocity_variance
+                self._last_ts[rows_fresh] = timestamps[obs_fresh]
+                self._interval[rows_fresh] = 0.0
+
+            if not fresh.all():
+                rows, obs = rows[~fresh], obs[~fresh]
+                dt = np.clip(timestamps[obs] - self._last_ts[rows], 1e-3, self.max_dt)
+                state, cov = self._propagate(rows, dt)
+                # H = [1, 0(, 0)]: only the position is measured
+                innovation = positions[obs] - state[:, :, 0]
+                gain = cov[:, :, 0] / (cov[:, 0, 0] + self.measurement_noise)[:, None]
+                state += innovation[:, :, None] * gain[:, None, :]
+                cov -= gain[:, :, None] * cov[:, 0, None, :]
+                self._state[rows] = state
+                self._cov[rows] = 0.5 * (cov + cov.transpose(0, 2, 1))
+                self._last_ts[rows] = timestamps[obs]
+                interval = self._interval[rows]
+                self._interval[rows] = np.where(interval > 0, 0.8 * interval + 0.2 * dt, dt)
+
+    def predict_with_covariance(self, user_ids: Sequence[str], horizon: Optional[float] = None):
+        """
+        Predicted positions `horizon` seconds after each user's last observation
+        (default: the user's typical observation interval, i.e. the next sample).
+        Returns (known mask (n,), mean (n, 2), position covariance (n, 2, 2));
+        rows of unknown users are NaN.
+        """
+        n = len(user_ids)
+        mean = np.full((n, 2), np.nan)
+        covariance = np.full((n, 2, 2), np.nan)
+        with self._lock:
+            index = self._index
+            rows = np.fromiter((index.get(user_id, -1) for user_id in user_ids), dtype=np.int64, count=n)
+            found = rows >= 0
+            rows = rows[found]
+            if rows.size:
+                dt = self._interval[rows] if horizon is None else np.full(rows.size, float(horizon))
+                state, cov = self._propagate(rows, np.clip(dt, 0.0, self.max_dt))
+        if rows.size:
+            mean[found] = state[:, :, 0]
+            # Axes are independent with a shared covariance
+            position_cov = np.zeros((rows.size, 2, 2))
+            position_cov[:, 0, 0] = position_cov[:, 1, 1] = cov[:, 0, 0]
+            covariance[found] = position_cov
+        return found, mean, covariance
+
+    # --- TrajectoryPredictor interface ---
+    def status(self) -> Dict[str, object]:
+        return {'state': 'ready', 'ready': True, 'backend': self.model_backend,
+                'motion_model': self.motion_model, 'tracked_users': self._count}
+
+    def predict_next(self, coords_seq) -> Tuple[float, float]:
+        """History-only fallback (no user id): linear extrapolation from the last two samples."""
+        if len(coords_seq) == 0:
+            return 0.0, 0.0
+        x2, y2 = coords_seq[-1]
+        if len(coords_seq) == 1:
+            return float(x2), float(y2)
+        x1, y1 = coords_seq[-2]
+        return float(2 * x2 - x1), float(2 * y2 - y1)
+
+    def predict_batch(self, user_ids: Sequence[str], windows: np.ndarray,
+                      counts: Optional[np.ndarray] = None) -> Dict[str, Tuple[float, float]]:
+        """Filter predictions for tracked users, extrapolated history windows for the rest."""
+        windows = np.asarray(windows, dtype=float)
+        if windows.ndim != 3 or not len(windows):
+            return {}
+        counts = np.full(len(windows), windows.shape[1]) if counts is None else np.asarray(counts)
+        predicted = 2 * windows[:, -1] - windows[:, -2] if windows.shape[1] >= 2 else windows[:, -1].copy()
+        found, mean, _ = self.predict_with_covariance(user_ids)
+        predicted[found] = mean[found]
+        keep = np.flatnonzero(found | (counts > 0))
+        return dict(zip([user_ids[i] for i in keep], map(tuple, predicted[keep].tolist())))
+
+    def forecast_batch(self, user_ids: Sequence[str], windows: np.ndarray, counts: Optional[np.ndarray] = None,
+                       steps: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k-step forecasts at step_seconds per step: tracked users propagate their
+        filter mean (not capped at max_dt), the rest extrapolate their history window.
+        Returns (positions (users, steps, 2), seconds per step (users,)); rows of
+        users without samples are NaN.
+        """
+        windows = np.asarray(windows, dtype=float)
+        n, steps = len(user_ids), max(0, int(steps))
+        forecasts = np.full((n, steps, 2), np.nan)
+        step_seconds = np.full(n, self.step_seconds)
+        if not n or not steps:
+            return forecasts, step_seconds
+        ahead = np.arange(1, steps + 1, dtype=float)
+
+        if windows.ndim == 3 and len(windows) == n:
+            counts = np.full(n, windows.shape[1]) if counts is None else np.asarray(counts)
+            last = windows[:, -1]
+            velocity = last - windows[:, -2] if windows.shape[1] >= 2 else np.zeros_like(last)
+            forecasts[:] = last[:, None, :] + ahead[None, :, None] * velocity[:, None, :]
+            forecasts[counts <= 0] = np.nan
+
+        with self._lock:
+            index = self._index
+            rows = np.fromiter((index.get(user_id, -1) for user_id in user_ids), dtype=np.int64, count=n)
+            found = np.flatnonzero(rows >= 0)
+            state = self._state[rows[found]]
+        if found.size:
+            # Mean-only propagation F(h) x for every step horizon h at once
+            horizon = (self.step_seconds * ahead)[None, :, None]
+            position = state[:, None, :, 0] + horizon * state[:, None, :, 1]
+            if self.dim == 3:
+                position += 0.5 * horizon * horizon * state[:, None, :, 2]
+            forecasts[found] = position
+        return forecasts, step_seconds
@@ -0,0 +1,322 @@
+"""
+NumPy inference runtime for the recurrent trajectory models.
+Runs exported GRU / LSTM / Bidirectional stacks (plus BatchNormalization, Dense,
+Dropout and pooling) with plain NumPy, so online prediction needs no TensorFlow
+import. Models are produced by export_numpy_models.py as a directory holding
+model.json and one .npy file per weight tensor; weights are memory-mapped.
+model.json records the size and mtime of the source .keras file, so an export
+left over from before a retrain is ignored instead of served.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+NUMPY_MODEL_SUFFIX = '.npmodel'
+NUMPY_MODEL_FORMAT = 'numpy-rnn-v1'
+
+logger = logging.getLogger(__name__)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # Same as 1 / (1 + exp(-x)) without overflow warnings for large |x|
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    None: lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+    'softmax': _softmax,
+    'elu': lambda x: np.where(x > 0, x, np.expm1(np.minimum(x, 0))),
+}
+
+
+def activation(name: Optional[str]):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {name}")
+    return ACTIVATIONS[name]
+
+
+class _Identity:
+    """InputLayer / Dropout at inference time."""
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        return x
+
+
+class _Dense:
+    def __init__(self, spec: Dict[str, Any], weights: List[np.ndarray]):
+        self.kernel = weights[0]
+        self.bias = weights[1] if spec.get('use_bias', True) else None
+        self.activation = activation(spec.get('activation'))
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        y = x @ self.kernel
+        if self.bias is not None:
+            y += self.bias
+        return self.activation(y)
+
+
+class _BatchNormalization:
+    """Inference-mode batch norm folded into one scale and shift."""
+
+    def __init__(self, spec: Dict[str, Any], weights: List[np.ndarray]):
+        weights = list(weights)
+        gamma = weights.pop(0) if spec.get('scale', True) else None
+        beta = weights.pop(0) if spec.get('center', True) else None
+        mean, variance = weights
+        scale = 1.0 / np.sqrt(np.asarray(variance, dtype=np.float32) + np.float32(spec.get('epsilon', 1e-3)))
+        if gamma is not None:
+            scale = scale * gamma
+        shift = -mean * scale
+        if beta is not None:
+            shift = shift + beta
+        self.scale = scale.astype(np.float32)
+        self.shift = shift.astype(np.float32)
+        if spec.get('axis', -1) not in (-1, [-1]):
+            raise ValueError("Only last-axis BatchNormalization is supported")
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        return x * self.scale + self.shift
+
+
+class _GlobalAveragePooling1D:
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        return x.mean(axis=1)
+
+
+class _Recurrent:
+    """Shared time loop; the input projection for all timesteps is one matmul."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.units = int(spec['units'])
+        self.return_sequences = bool(spec.get('return_sequences', False))
+        self.go_backwards = bool(spec.get('go_backwards', False))
+        self.activation = activation(spec.get('activation', 'tanh'))
+        self.recurrent_activation = activation(spec.get('recurrent_activation', 'sigmoid'))
+
+    def _project(self, x: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def _init_state(self, batch: int, dtype) -> Any:
+        raise NotImplementedError
+
+    def _step(self, projected: np.ndarray, state) -> Any:
+        """Returns (output, new_state)."""
+        raise NotImplementedError
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        batch, timesteps = x.shape[0], x.shape[1]
+        projected = self._project(x)
+        steps = range(timesteps - 1, -1, -1) if self.go_backwards else range(timesteps)
+        state = self._init_state(batch, projected.dtype)
+        outputs = np.empty((batch, timesteps, self.units), dtype=projected.dtype) if self.return_sequences else None
+        output = state if not isinstance(state, tuple) else state[0]
+        # With go_backwards, sequences come out in processing order (as in Keras)
+        for i, t in enumerate(steps):
+            output, state = self._step(projected[:, t], state)
+            if outputs is not None:
+                outputs[:, i] = output
+        return outputs if outputs is not None else output
+
+
+class _GRU(_Recurrent):
+    def __init__(self, spec: Dict[str, Any], weights: List[np.ndarray]):
+        super().__init__(spec)
+        self.reset_after = bool(spec.get('reset_after', True))
+        self.kernel, self.recurrent_kernel = weights[0], weights[1]
+        units = self.units
+        zeros = np.zeros(3 * units, dtype=np.float32)
+        if spec.get('use_bias', True):
+            bias = np.asarray(weights[2])
+            self.input_bias, self.recurrent_bias = (bias[0], bias[1]) if self.reset_after else (bias, zeros)
+        else:
+            self.input_bias, self.recurrent_bias = zeros, zeros
+        self.recurrent_zr = self.recurrent_kernel[:, :2 * units]
+        self.recurrent_h = self.recurrent_kernel[:, 2 * units:]
+
+    def _project(self, x: np.ndarray) -> np.ndarray:
+        return x @ self.kernel + self.input_bias
+
+    def _init_state(self, batch: int, dtype) -> np.ndarray:
+        return np.zeros((batch, self.units), dtype=dtype)
+
+    def _step(self, projected: np.ndarray, h: np.ndarray):
+        units = self.units
+        x_zr, x_h = projected[:, :2 * units], projected[:, 2 * units:]
+        if self.reset_after:
+            inner = h @ self.recurrent_kernel + self.recurrent_bias
+            zr = self.recurrent_activation(x_zr + inner[:, :2 * units])
+            z, r = zr[:, :units], zr[:, units:]
+            candidate = self.activation(x_h + r * inner[:, 2 * units:])
+        else:
+            zr = self.recurrent_activation(x_zr + h @ self.recurrent_zr)
+            z, r = zr[:, :units], zr[:, units:]
+            candidate = self.activation(x_h + (r * h) @ self.recurrent_h)
+        h = z * h + (1.0 - z) * candidate
+        return h, h
+
+
+class _LSTM(_Recurrent):
+    def __init__(self, spec: Dict[str, Any], weights: List[np.ndarray]):
+        super().__init__(spec)
+        self.kernel, self.recurrent_kernel = weights[0], weights[1]
+        self.bias = weights[2] if spec.get('use_bias', True) else np.zeros(4 * self.units, dtype=np.float32)
+
+    def _project(self, x: np.ndarray) -> np.ndarray:
+        return x @ self.kernel + self.bias
+
+    def _init_state(self, batch: int, dtype):
+        return (np.zeros((batch, self.units), dtype=dtype), np.zeros((batch, self.units), dtype=dtype))
+
+    def _step(self, projected: np.ndarray, state):
+        h, c = state
+        units = self.units
+        z = projected + h @ self.recurrent_kernel
+        gates = self.recurrent_activation(z[:, :2 * units])
+        i, f = gates[:, :units], gates[:, units:]
+        o = self.recurrent_activation(z[:, 3 * units:])
+        c = f * c + i * self.activation(z[:, 2 * units:3 * units])
+        h = o * self.activation(c)
+        return h, (h, c)
+
+
+_RECURRENT = {'gru': _GRU, 'lstm': _LSTM}
+
+
+class _Bidirectional:
+    def __init__(self, spec: Dict[str, Any], weights: List[np.ndarray]):
+        forward_spec, backward_spec = spec['forward'], spec['backward']
+        count = len(weights) // 2
+        self.forward = _RECURRENT[forward_spec['type']](forward_spec, weights[:count])
+        self.backward = _RECURRENT[backward_spec['type']](backward_spec, weights[count:])
+        self.merge_mode = spec.get('merge_mode', 'concat')
+        if self.merge_mode not in ('concat', 'sum', 'ave', 'mul'):
+            raise ValueError(f"Unsupported merge_mode: {self.merge_mode}")
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        y = self.forward(x)
+        y_rev = self.backward(x)
+        if self.backward.return_sequences:
+            y_rev = y_rev[:, ::-1]
+        if self.merge_mode == 'concat':
+            return np.concatenate([y, y_rev], axis=-1)
+        if self.merge_mode == 'sum':
+            return y + y_rev
+        if self.merge_mode == 'ave':
+            return (y + y_rev) / 2
+        return y * y_rev
+
+
+LAYERS = {
+    'input': lambda spec, weights: _Identity(),
+    'dropout': lambda spec, weights: _Identity(),
+    'dense': _Dense,
+    'batch_normalization': _BatchNormalization,
+    'global_average_pooling_1d': lambda spec, weights: _GlobalAveragePooling1D(),
+    'gru': _GRU,
+    'lstm': _LSTM,
+    'bidirectional': _Bidirectional,
+}
+
+
+class NumpyModel:
+    """
+    Sequential stack of exported layers. Callable like a Keras model
+    (model(X, training=False), model.predict(X, verbose=0)).
+    """
+
+    def __init__(self, spec: Dict[str, Any], weights: Dict[str, np.ndarray]):
+        if spec.get('format') != NUMPY_MODEL_FORMAT:
+            raise ValueError(f"Unknown model format: {spec.get('format')}")
+        self.spec = spec
+        self.name = spec.get('name', '')
+        self.input_shape = tuple(spec.get('input_shape') or ())
+        self.layers = []
+        for layer in spec['layers']:
+            kind = layer['type']
+            if kind not in LAYERS:
+                raise ValueError(f"Unsupported layer type: {kind}")
+            self.layers.append(LAYERS[kind](layer, [weights[name] for name in layer.get('weights', [])]))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'NumpyModel':
+        with open(os.path.join(path, 'model.json'), 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+        mode = 'r' if mmap else None
+        weights = {}
+        for layer in spec['layers']:
+            for name in layer.get('weights', []):
+                weights[name] = np.load(os.path.join(path, name + '.npy'), mmap_mode=mode)
+        return cls(spec, weights)
+
+    def __call__(self, X, training: bool = False) -> np.ndarray:
+        x = np.asarray(X, dtype=np.float32)
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+    def predict(self, X, verbose: int = 0, batch_size: Optional[int] = None) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if not batch_size or len(X) <= batch_size:
+            return self(X)
+        return np.concatenate([self(X[i:i + batch_size]) for i in range(0, len(X), batch_size)])
+
+
+def save_numpy_model(path: str, spec: Dict[str, Any], weights: Dict[str, np.ndarray]):
+    """Write model.json and one float32 .npy per weight tensor into `path`."""
+    os.makedirs(path, exist_ok=True)
+    for name, value in weights.items():
+        np.save(os.path.join(path, name + '.npy'), np.ascontiguousarray(value, dtype=np.float32))
+    with open(os.path.join(path, 'model.json'), 'w', encoding='utf-8') as f:
+        json.dump(dict(spec, format=NUMPY_MODEL_FORMAT), f, indent=2)
+
+
+def numpy_model_path(model_path: str) -> str:
+    """Exported directory for a .keras path (or the path itself if already exported)."""
+    if model_path.rstrip('/\\').endswith(NUMPY_MODEL_SUFFIX):
+        return model_path
+    return os.path.splitext(model_path)[0] + NUMPY_MODEL_SUFFIX
+
+
+def source_stamp(model_path: str) -> Dict[str, Any]:
+    """Identity of a source model file, recorded in model.json by the exporter."""
+    stat = os.stat(model_path)
+    return {'source': os.path.basename(model_path), 'source_size': stat.st_size, 'source_mtime_ns': stat.st_mtime_ns}
+
+
+def is_export_current(export_path: str, model_path: str) -> bool:
+    """True if the export at `export_path` was made from `model_path` as it is on disk now."""
+    try:
+        with open(os.path.join(export_path, 'model.json'), 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+        stamp = source_stamp(model_path)
+    except (OSError, ValueError):
+        return False
+    return all(spec.get(key) == value for key, value in stamp.items())
+
+
+def load_numpy_model(path: str, mmap: bool = True) -> Optional[NumpyModel]:
+    """
+    Load an exported model, or None if `path` (or its exported sibling) does not exist.
+    Given a source model path, an export made from a different version of that file
+    (e.g. before retraining) counts as missing.
+    """
+    export_path = numpy_model_path(path)
+    if not os.path.isfile(os.path.join(export_path, 'model.json')):
+        return None
+    if export_path != path and os.path.isfile(path) and not is_export_current(export_path, path):
+        logger.warning(f"Ignoring stale NumPy export {export_path}: {os.path.basename(path)} changed since it was exported")
+        return None
+    return NumpyModel.load(export_path, mmap=mmap)
@@ -5,7 +5,6 @@ Handles workload prediction and performance forecasting
 
 import logging
 import numpy as np
-import pandas as pd
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test the NumPy trajectory model runtime against a reference forward pass.
+Layers get fixed random weights in Keras layout; the reference below spells out
+the Keras GRU/LSTM equations gate by gate in float64, so no Keras is needed.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add serverless-sim/ to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+from central_node.control_layer.prediction_module.numpy_runtime import (
+    NumpyModel,
+    load_numpy_model,
+    numpy_model_path,
+    save_numpy_model,
+    source_stamp,
+)
+
+TOLERANCE = 1e-5
+BATCH, TIMESTEPS, FEATURES, UNITS = 16, 7, 3, 4
+
+
+def _weights(seed: int, *shapes):
+    rng = np.random.default_rng(seed)
+    return [rng.normal(scale=0.5, size=shape).astype(np.float32) for shape in shapes]
+
+
+def _inputs(seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(BATCH, TIMESTEPS, FEATURES)).astype(np.float32)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _gate(matrix, index, units):
+    return matrix[..., index * units:(index + 1) * units]
+
+
+def reference_gru(x, kernel, recurrent, bias, reset_after=True, return_sequences=False):
+    """Keras GRU, gate order [z, r, h]."""
+    x, kernel, recurrent, bias = (np.asarray(a, dtype=np.float64) for a in (x, kernel, recurrent, bias))
+    units = recurrent.shape[0]
+    input_bias, recurrent_bias = (bias[0], bias[1]) if reset_after else (bias, np.zeros_like(bias))
+    h = np.zeros((x.shape[0], units))
+    outputs = []
+    for t in range(x.shape[1]):
+        xt = x[:, t]
+        z = _sigmoid(xt @ _gate(kernel, 0, units) + _gate(input_bias, 0, units)
+                     + h @ _gate(recurrent, 0, units) + _gate(recurrent_bias, 0, units))
+        r = _sigmoid(xt @ _gate(kernel, 1, units) + _gate(input_bias, 1, units)
+                     + h @ _gate(recurrent, 1, units) + _gate(recurrent_bias, 1, units))
+        if reset_after:
+            candidate = np.tanh(xt @ _gate(kernel, 2, units) + _gate(input_bias, 2, units)
+                                + r * (h @ _gate(recurrent, 2, units) + _gate(recurrent_bias, 2, units)))
+        else:
+            candidate = np.tanh(xt @ _gate(kernel, 2, units) + _gate(input_bias, 2, units)
+                                + (r * h) @ _gate(recurrent, 2, units))
+        h = z * h + (1.0 - z) * candidate
+        outputs.append(h)
+    return np.stack(outputs, axis=1) if return_sequences else h
+
+
+def reference_lstm(x, kernel, recurrent, bias, return_sequences=False):
+    """Keras LSTM, gate order [i, f, c, o]."""
+    x, kernel, recurrent, bias = (np.asarray(a, dtype=np.float64) for a in (x, kernel, recurrent, bias))
+    units = recurrent.shape[0]
+    h = np.zeros((x.shape[0], units))
+    c = np.zeros((x.shape[0], units))
+    outputs = []
+    for t in range(x.shape[1]):
+        z = x[:, t] @ kernel + h @ recurrent + bias
+        i = _sigmoid(_gate(z, 0, units))
+        f = _sigmoid(_gate(z, 1, units))
+        o = _sigmoid(_gate(z, 3, units))
+        c = f * c + i * np.tanh(_gate(z, 2, units))
+        h = o * np.tanh(c)
+        outputs.append(h)
+    return np.stack(outputs, axis=1) if return_sequences else h
+
+
+def _model(layers, weights, input_shape=(None, TIMESTEPS, FEATURES)) -> NumpyModel:
+    spec = {'format': 'numpy-rnn-v1', 'name': 'test', 'input_shape': list(input_shape),
+            'layers': [{'type': 'input', 'name': 'input'}] + layers}
+    return NumpyModel(spec, weights)
+
+
+def _max_diff(actual, expected) -> float:
+    return float(np.max(np.abs(np.asarray(actual, dtype=np.float64) - expected)))
+
+
+def test_gru():
+    """GRU with reset_after on and off, last state and full sequence"""
+    x = _inputs()
+    for reset_after in (True, False):
+        for return_sequences in (False, True):
+            bias_shape = (2, 3 * UNITS) if reset_after else (3 * UNITS,)
+            kernel, recurrent, bias = _weights(1, (FEATURES, 3 * UNITS), (UNITS, 3 * UNITS), bias_shape)
+            model = _model(
+                [{'type': 'gru', 'name': 'gru', 'units': UNITS, 'reset_after': reset_after,
+                  'return_sequences': return_sequences, 'weights': ['k', 'r', 'b']}],
+                {'k': kernel, 'r': recurrent, 'b': bias},
+            )
+            expected = reference_gru(x, kernel, recurrent, bias, reset_after, return_sequences)
+            diff = _max_diff(model(x), expected)
+            print(f"   GRU reset_after={reset_after} sequences={return_sequences}: max abs diff {diff:.2e}")
+            assert diff <= TOLERANCE
+
+
+def test_lstm():
+    """LSTM, last state and full sequence"""
+    x = _inputs()
+    kernel, recurrent, bias = _weights(2, (FEATURES, 4 * UNITS), (UNITS, 4 * UNITS), (4 * UNITS,))
+    for return_sequences in (False, True):
+        model = _model(
+            [{'type': 'lstm', 'name': 'lstm', 'units': UNITS, 'return_sequences': return_sequences,
+              'weights': ['k', 'r', 'b']}],
+            {'k': kernel, 'r': recurrent, 'b': bias},
+        )
+        expected = reference_lstm(x, kernel, recurrent, bias, return_sequences)
+        diff = _max_diff(model(x), expected)
+        print(f"   LSTM sequences={return_sequences}: max abs diff {diff:.2e}")
+        assert diff <= TOLERANCE
+
+
+def test_bidirectional_stack():
+    """Bidirectional GRU -> BatchNormalization -> LSTM -> Dense, saved and memory-mapped back"""
+    x = _inputs(3)
+    fk, fr, fb, bk, br, bb = _weights(4, (FEATURES, 3 * UNITS), (UNITS, 3 * UNITS), (2, 3 * UNITS),
+                                      (FEATURES, 3 * UNITS), (UNITS, 3 * UNITS), (2, 3 * UNITS))
+    gamma, beta, mean = _weights(5, (2 * UNITS,), (2 * UNITS,), (2 * UNITS,))
+    variance = np.abs(_weights(6, (2 * UNITS,))[0]) + 0.1
+    lk, lr, lb = _weights(7, (2 * UNITS, 4 * UNITS), (UNITS, 4 * UNITS), (4 * UNITS,))
+    dk, db = _weights(8, (UNITS, 2), (2,))
+    cell = {'type': 'gru', 'units': UNITS, 'reset_after': True, 'return_sequences': True}
+    layers = [
+        {'type': 'bidirectional', 'name': 'bi', 'merge_mode': 'concat',
+         'forward': dict(cell, name='forward'), 'backward': dict(cell, name='backward', go_backwards=True),
+         'weights': ['fk', 'fr', 'fb', 'bk', 'br', 'bb']},
+        {'type': 'batch_normalization', 'name': 'bn', 'epsilon': 1e-3, 'weights': ['g', 'be', 'm', 'v']},
+        {'type': 'lstm', 'name': 'lstm', 'units': UNITS, 'weights': ['lk', 'lr', 'lb']},
+        {'type': 'dropout', 'name': 'dropout'},
+        {'type': 'dense', 'name': 'dense', 'units': 2, 'activation': 'linear', 'weights': ['dk', 'db']},
+    ]
+    weights = {'fk': fk, 'fr': fr, 'fb': fb, 'bk': bk, 'br': br, 'bb': bb,
+               'g': gamma, 'be': beta, 'm': mean, 'v': variance, 'lk': lk, 'lr': lr, 'lb': lb, 'dk': dk, 'db': db}
+
+    forward = reference_gru(x, fk, fr, fb, return_sequences=True)
+    backward = reference_gru(x[:, ::-1], bk, br, bb, return_sequences=True)[:, ::-1]
+    y = np.concatenate([forward, backward], axis=-1)
+    y = (y - mean) / np.sqrt(variance.astype(np.float64) + 1e-3) * gamma + beta
+    y = reference_lstm(y, lk, lr, lb)
+    expected = y @ dk.astype(np.float64) + db
+
+    with tempfile.TemporaryDirectory() as path:
+        spec = {'name': 'test', 'input_shape': [None, TIMESTEPS, FEATURES],
+                'layers': [{'type': 'input', 'name': 'input'}] + layers}
+        save_numpy_model(path, spec, weights)
+        loaded = NumpyModel.load(path)
+        diff = _max_diff(loaded.predict(x, batch_size=5), expected)
+        print(f"   Bidirectional stack (saved + mmap): max abs diff {diff:.2e}")
+        assert diff <= TOLERANCE
+        assert _max_diff(_model(layers, weights)(x), expected) <= TOLERANCE
+
+
+def test_stale_export():
+    """An export stops loading once the model file it came from changes (e.g. retrained)"""
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'model.keras')
+        with open(source, 'wb') as f:
+            f.write(b'weights v1')
+        kernel, bias = _weights(9, (FEATURES, 2), (2,))
+        spec = {'name': 'test', **source_stamp(source), 'input_shape': [None, TIMESTEPS, FEATURES],
+                'layers': [{'type': 'dense', 'name': 'dense', 'units': 2, 'weights': ['k', 'b']}]}
+        save_numpy_model(numpy_model_path(source), spec, {'k': kernel, 'b': bias})
+        assert load_numpy_model(source) is not None
+        with open(source, 'wb') as f:
+            f.write(b'weights v2 after retraining')
+        assert load_numpy_model(source) is None
+        print("   Stale export ignored after the source model changed")
+
+
+def main():
+    """Run all tests"""
+    print("Testing NumPy model runtime")
+    print("=" * 50)
+
+    test_gru()
+    test_lstm()
+    test_bidirectional_stack()
+    test_stale_export()
+
+    print("\n[OK] All tests completed!")
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,122 @@
 """
 Trajectory Predictor wrapper
-Tries to use Spatial-Temporal GNN if available; otherwise falls back to simple
-linear extrapolation from recent coordinates.
+Prefers a model exported for the NumPy runtime (<model>.npmodel, see
+export_numpy_models.py; with auto_export a missing export is created on load),
+then the Keras model itself; otherwise falls back to
+simple linear extrapolation from recent coordinates (also used while the model
+is still loading in the background).
 """
 
-from typing import List, Tuple, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import os
+import threading
+import time
+
+import numpy as np
+
+from central_node.control_layer.prediction_module.numpy_runtime import load_numpy_model
 
 
 class TrajectoryPredictor:
-    def __init__(self, model_path: Optional[str] = None, sequence_length: int = 5):
+    """
+    Next-position predictor. With background=True the model is loaded on a
+    daemon thread; until it is ready every prediction uses linear extrapolation.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, sequence_length: int = 5, background: bool = False,
+                 step_seconds: float = 1.0, auto_export: bool = False):
         self.model = None
+        self.auto_export = auto_export
         self.sequence_length = sequence_length
+        # Time between consecutive history samples, i.e. the horizon of one predicted step
+        self.step_seconds = float(step_seconds)
         self.using_gnn = False
+        self.model_backend: Optional[str] = None
+        # Bumped whenever the model behind predictions changes (keys cached predictions)
+        self.model_version = 0
+        self.model_path = model_path
+        self.load_state = 'loading' if model_path else 'unavailable'
+        self.load_error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        # Set once loading has finished, whether or not a model came out of it
+        self.ready = threading.Event()
+
+        if not model_path:
+            self.ready.set()
+        elif background:
+            threading.Thread(target=self._load_model, name='trajectory-model-loader', daemon=True).start()
+        else:
+            self._load_model()
+
+    def _load_model(self):
+        started = time.perf_counter()
+        model, backend = None, None
+        # The NumPy export runs the same forward pass without importing TensorFlow
+        try:
+            model = load_numpy_model(self.model_path)
+            if model is None and self.auto_export and os.path.isfile(self.model_path):
+                # Export needs h5py only; unsupported models fall through to Keras
+                from central_node.control_layer.prediction_module.export_numpy_models import export_keras_model
+                model = load_numpy_model(export_keras_model(self.model_path))
+            backend = 'numpy'
+        except Exception as e:
+            self.load_error = str(e)
 
         # Lazy import tensorflow to avoid heavy dependency if not needed
-        if model_path and os.path.exists(model_path):
+        if model is None and os.path.isfile(self.model_path):
             try:
                 import tensorflow as tf  # noqa: F401
                 from tensorflow import keras
-                self.model = keras.models.load_model(model_path, compile=False)
-                self.using_gnn = True
-            except Exception:
+                model = keras.models.load_model(self.model_path, compile=False)
+                backend = 'keras'
+            except Exception as e:
                 # Fallback gracefully
-                self.model = None
-                self.using_gnn = False
+                model = None
+                self.load_error = str(e)
+
+        if model is not None:
+            self._use_model_window(model)
+            self.model_backend = backend
+            self.using_gnn = True
+            self.load_error = None
+            # Published last, so predictions switch from extrapolation to the model in one step
+            self.model = model
+            self.model_version += 1
+            self.load_state = 'ready'
+        else:
+            self.load_state = 'failed' if self.load_error else 'unavailable'
+        self.load_seconds = time.perf_counter() - started
+        self.ready.set()
+
+    def _use_model_window(self, model):
+        """Trust the model's own input window over the constructor default."""
+        input_shape = getattr(model, 'input_shape', None)
+        if input_shape and len(input_shape) == 3 and input_shape[1]:
+            self.sequence_length = int(input_shape[1])
+
+    def status(self) -> Dict[str, Any]:
+        """Model readiness for health reporting."""
+        return {
+            'state': self.load_state,
+            'ready': self.ready.is_set(),
+            'backend': self.model_backend,
+            'model': os.path.basename(self.model_path) if self.model_path else None,
+            'sequence_length': self.sequence_length,
+            'load_seconds': self.load_seconds,
+            'error': self.load_error,
+        }
 
     def predict_next(self, coords_seq: List[Tuple[float, float]]) -> Tuple[float, float]:
         """
         Predict next (x,y) from recent sequence of coordinates.
-        coords_seq: list of (x,y) with oldest first.
+        coords_seq: list of (x,y) or (n, 2) array with oldest first.
         """
-        if not coords_seq:
+        if len(coords_seq) == 0:
             return 0.0, 0.0
 
         # If GNN is available and we have enough history, attempt to use it
         if self.model and len(coords_seq) >= self.sequence_length:
             try:
-                import numpy as np
                 seq = coords_seq[-self.sequence_length:]
                 # Simple feature: concatenate x,y per timestep; pad to fixed size
                 # Model expects (batch, timesteps, features). We'll pass 2 features (x,y).
@@ -45,6 +124,7 @@ class TrajectoryPredictor:
                 pred = self.model.predict(X, verbose=0)
                 if isinstance(pred, list):
                     pred = pred[0]
+                pred = np.asarray(pred, dtype=float).reshape(-1)
                 px, py = float(pred[0]), float(pred[1])
                 return px, py
             except Exception:
@@ -55,8 +135,70 @@ class TrajectoryPredictor:
             x1, y1 = coords_seq[-2]
             x2, y2 = coords_seq[-1]
             dx, dy = x2 - x1, y2 - y1
-            return x2 + dx, y2 + dy
+            return float(x2 + dx), float(y2 + dy)
 
         # Only one point available
-        return coords_seq[-1]
+        x, y = coords_seq[-1]
+        return float(x), float(y)
+
+    def predict_batch(self, user_ids: Sequence[str], windows: np.ndarray,
+                      counts: Optional[np.ndarray] = None) -> Dict[str, Tuple[float, float]]:
+        """
+        Predict next (x,y) for many users at once.
+        windows: (users, timesteps, 2) positions, oldest first, front-padded with the
+        oldest sample when a user has fewer (as returned by UserStore.history_windows);
+        counts: real samples per row (default: all timesteps).
+        Users with enough history go through the model in a single forward pass,
+        the rest use linear extrapolation. Users without samples are omitted.
+        """
+        windows = np.asarray(windows, dtype=float)
+        if windows.ndim != 3 or not len(windows):
+            return {}
+        counts = np.full(len(windows), windows.shape[1]) if counts is None else np.asarray(counts)
+        predicted = self._predict_windows(windows, counts)
+        keep = np.flatnonzero(counts > 0)
+        return dict(zip([user_ids[i] for i in keep], map(tuple, predicted[keep].tolist())))
+
+    def forecast_batch(self, user_ids: Sequence[str], windows: np.ndarray, counts: Optional[np.ndarray] = None,
+                       steps: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k-step forecasts for many users: each step's prediction is appended to the
+        window and fed back in, so a rollout costs `steps` batched forward passes.
+        Returns (positions (users, steps, 2), seconds per step (users,)); rows of
+        users without samples are NaN.
+        """
+        windows = np.array(windows, dtype=float)
+        n = len(windows)
+        forecasts = np.full((n, max(0, int(steps)), 2), np.nan)
+        step_seconds = np.full(n, self.step_seconds)
+        if windows.ndim != 3 or not n or not forecasts.shape[1]:
+            return forecasts, step_seconds
+        counts = np.full(n, windows.shape[1]) if counts is None else np.asarray(counts)
+        rolling = counts.copy()
+        for step in range(forecasts.shape[1]):
+            predicted = self._predict_windows(windows, rolling)
+            forecasts[:, step] = predicted
+            windows[:, :-1] = windows[:, 1:]
+            windows[:, -1] = predicted
+            rolling = np.minimum(rolling + 1, windows.shape[1])
+        forecasts[counts <= 0] = np.nan
+        return forecasts, step_seconds
+
+    def _predict_windows(self, windows: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Next position per window row, (users, 2)."""
+        # Linear extrapolation from the last two samples; a padded row with one
+        # sample has a zero step and stays put
+        predicted = 2 * windows[:, -1] - windows[:, -2] if windows.shape[1] >= 2 else windows[:, -1].copy()
 
+        if self.model is not None and windows.shape[1] >= self.sequence_length:
+            eligible = np.flatnonzero(counts >= self.sequence_length)
+            if eligible.size:
+                try:
+                    X = windows[eligible, -self.sequence_length:]
+                    pred = self.model(X, training=False)
+                    if isinstance(pred, (list, tuple)):
+                        pred = pred[0]
+                    predicted[eligible] = np.asarray(pred, dtype=float).reshape(len(eligible), -1)[:, :2]
+                except Exception:
+                    pass  # keep the extrapolated positions
+        return predicted
@@ -27,6 +27,8 @@ def register_central_route(app: Flask):
 @central_route.route('/health', methods=['GET'])
 @standard_response
 def health_check():
+    startup = central_core_controller.startup_report() if central_core_controller else {}
+    trajectory_model = startup.get('trajectory_model', {})
     return {
         "status": "healthy",
         "timestamp": time.time(),
@@ -35,7 +37,11 @@ def health_check():
             "predictor": "running",
             "migration_manager": "running",
             "metrics_collector": "running"
-        }
+        },
+        # False while the trajectory model is still loading (predictions use extrapolation meanwhile)
+        "trajectory_model_ready": bool(trajectory_model.get('ready')),
+        "trajectory_model": trajectory_model,
+        "startup_timings": startup.get('timings', {}),
     }
 
 @central_route.route('/nodes/register', methods=['POST'])
@@ -99,6 +105,20 @@ def update_user_node():
     result = central_core_controller.update_user_node(request_data)
     return result 
 
+@central_route.route("/users/bulk_upsert", methods=["POST"])
+@standard_response
+def bulk_upsert_users():
+    request_data = request.get_json() or {}
+    result = central_core_controller.bulk_upsert_users(request_data)
+    return result
+
+@central_route.route("/users/bulk_delete", methods=["POST"])
+@standard_response
+def bulk_delete_users():
+    request_data = request.get_json() or {}
+    result = central_core_controller.bulk_delete_users(request_data)
+    return result
+
 @central_route.route("/update_central_node", methods=["POST"])
 @standard_response
 def update_central_node():
@@ -163,3 +183,27 @@ def set_assignment_config():
 def assignment_status():
     result = central_core_controller.get_assignment_status()
     return result
+
+@central_route.route('/playback/config', methods=['POST'])
+@standard_response
+def set_playback_config():
+    request_data = request.get_json() or {}
+    result = central_core_controller.update_playback_config(request_data)
+    return result
+
+@central_route.route('/playback/status', methods=['GET'])
+@standard_response
+def playback_status():
+    result = central_core_controller.get_playback_status()
+    return result
+
+@central_route.route('/assignment/coverage_forecast', methods=['GET'])
+@standard_response
+def coverage_forecast():
+    # Optional query: ?horizon=<seconds>&steps=<k>&user_id=<id>&user_id=<id>...
+    result = central_core_controller.get_coverage_forecast(
+        user_ids=request.args.getlist('user_id') or None,
+        horizon=request.args.get('horizon', type=float),
+        steps=request.args.get('steps', type=int),
+    )
+    return result
@@ -0,0 +1,118 @@
+"""
+GAP solver benchmark.
+Times profit matrix construction and the solver variants on a synthetic instance.
+
+Usage (from serverless-sim/):
+    python -m central_node.control_layer.scheduler_module.gap_benchmark --users 10000 --nodes 200
+"""
+
+import argparse
+import logging
+import random
+import time
+from typing import Any, Dict, Tuple
+
+from central_node.control_layer.scheduler_module.gap_solver import GAPConfig, GAPSolver
+
+
+def make_instance(num_users: int, num_nodes: int, seed: int = 0,
+                  width: float = 3000.0, height: float = 2000.0) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Random users/edge nodes in scheduler GAP format; node memory covers roughly half the demand."""
+    rng = random.Random(seed)
+    users = {
+        f"user_{i}": {
+            'location': {'x': rng.uniform(0, width), 'y': rng.uniform(0, height)},
+            'memory_requirement': rng.choice([128, 256, 512]) * 1024 * 1024,
+        }
+        for i in range(num_users)
+    }
+    demand = sum(user['memory_requirement'] for user in users.values())
+    edge_nodes = {
+        f"edge_{j}": {
+            'node_id': f"edge_{j}",
+            'location': {'x': rng.uniform(0, width), 'y': rng.uniform(0, height)},
+            'metrics': {
+                'memory_total': int(demand * 0.5 / max(1, num_nodes) * rng.uniform(0.5, 1.5)),
+                'memory_usage': rng.uniform(0, 30),
+            },
+        }
+        for j in range(num_nodes)
+    }
+    central_node = {'node_id': 'central_node', 'location': {'x': width / 2, 'y': height / 2}, 'coverage': 0}
+    return users, edge_nodes, central_node
+
+
+def reference_profit_dict(solver: GAPSolver, users: Dict[str, Any], edge_nodes: Dict[str, Any],
+                          central_node: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Per-pair calculate_latency loop (the former dict-of-dicts build), for comparison."""
+    cloud_node = {'location': {'x': 0, 'y': 0}, 'node_id': 'cloud'}
+    profits = {}
+    for user_id, user_info in users.items():
+        location = user_info.get('location', {'x': 0, 'y': 0})
+        cloud_latency = solver.calculate_latency(location, cloud_node, 'cloud')
+        row = {node_id: max(0, cloud_latency - solver.calculate_latency(location, node_info, 'edge'))
+               for node_id, node_info in edge_nodes.items()}
+        row['central_node'] = max(0, cloud_latency - solver.calculate_latency(location, central_node, 'central'))
+        row['cloud'] = 0
+        profits[user_id] = row
+    return profits
+
+
+def _best_of(repeat: int, fn) -> Tuple[float, Any]:
+    best, result = float('inf'), None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(num_users: int, num_nodes: int, repeat: int = 3, reference: bool = True,
+        time_budget: float = 1.0, seed: int = 0) -> Dict[str, float]:
+    users, edge_nodes, central_node = make_instance(num_users, num_nodes, seed)
+    solver = GAPSolver(GAPConfig())
+    results = {}
+
+    results['profit_matrix_seconds'], matrix = _best_of(
+        repeat, lambda: solver.build_profit_matrix(users, edge_nodes, central_node))
+    if reference:
+        results['profit_dict_seconds'], profits = _best_of(
+            1, lambda: reference_profit_dict(solver, users, edge_nodes, central_node))
+        results['max_abs_diff'] = max(
+            abs(matrix.profit[i, j] - profits[user_id][node_id])
+            for i, user_id in enumerate(matrix.user_ids[:1000])
+            for j, node_id in enumerate(matrix.node_ids)
+        )
+
+    for label, config in (
+        ('greedy', GAPConfig(solver_method='greedy')),
+        ('capacity_greedy', GAPConfig(solver_method='greedy', enable_memory_constraints=True)),
+        ('ilp', GAPConfig(solver_method='ilp', enable_memory_constraints=True, time_budget_seconds=time_budget)),
+    ):
+        variant = GAPSolver(config)
+        seconds, assignments = _best_of(1, lambda: variant.solve_gap(users, edge_nodes, central_node))
+        results[f'{label}_seconds'] = seconds
+        results[f'{label}_utility'] = sum(a.utility_gain for a in assignments)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GAP profit matrix build and solvers")
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--nodes', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--time-budget', type=float, default=1.0)
+    parser.add_argument('--no-reference', action='store_true', help="skip the per-pair dict build")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = run(args.users, args.nodes, args.repeat, not args.no_reference, args.time_budget)
+    print(f"GAP benchmark: {args.users} users x {args.nodes} edge nodes")
+    for key, value in results.items():
+        print(f"  {key:<28} {value:.6g}")
+    if 'profit_dict_seconds' in results:
+        print(f"  {'profit_build_speedup':<28} {results['profit_dict_seconds'] / results['profit_matrix_seconds']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,11 @@ Implementation of the baseline algorithm from mobility-aware edge computing pape
 
 import logging
 import math
+import time
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import numpy as np
 
 @dataclass
 class GAPAssignment:
@@ -34,6 +37,60 @@ class GAPConfig:
     enable_memory_constraints: bool = False
     debug_logging: bool = False
 
+    # Capacity-constrained solver ('ilp')
+    time_budget_seconds: float = 1.0
+    max_iterations: int = 200
+    optimality_tolerance: float = 1e-3  # stop when (upper - lower) / upper falls below this
+    exact_max_variables: int = 20000  # users x nodes up to which scipy MILP is tried first
+    default_memory_requirement_mb: float = 256.0
+
+    # Incremental repair (solve_gap_incremental)
+    incremental_repair: bool = True
+    incremental_change_ratio: float = 0.1  # full re-solve when more users than this changed
+    max_consecutive_repairs: int = 20  # periodic full re-solve bounds drift from repeated repairs
+
+@dataclass
+class ProfitMatrix:
+    """
+    Dense profit matrix H (users x nodes) with the latency behind each entry.
+    Row i is user_ids[i], column j is node_ids[j] (edge nodes, central node, cloud).
+    """
+    user_ids: List[str]
+    node_ids: List[str]
+    node_types: List[str]
+    profit: np.ndarray
+    latency: np.ndarray
+    user_index: Dict[str, int] = field(default_factory=dict)
+    node_index: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.user_index:
+            self.user_index = {user_id: i for i, user_id in enumerate(self.user_ids)}
+        if not self.node_index:
+            self.node_index = {node_id: j for j, node_id in enumerate(self.node_ids)}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.profit.shape
+
+    def __getitem__(self, user_id: str) -> Dict[str, float]:
+        """H[u] as a node_id -> profit dict (the former dict-of-dicts layout)."""
+        return dict(zip(self.node_ids, self.profit[self.user_index[user_id]].tolist()))
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {user_id: dict(zip(self.node_ids, row)) for user_id, row in zip(self.user_ids, self.profit.tolist())}
+
+@dataclass
+class GAPSolveState:
+    """Everything solve_gap_incremental needs from the previous round."""
+    matrix: ProfitMatrix
+    choice: np.ndarray
+    ux: np.ndarray
+    uy: np.ndarray
+    weights: np.ndarray
+    nx: np.ndarray
+    ny: np.ndarray
+
 class GAPSolver:
     """
     GAP-based assignment solver for edge/central nodes.
@@ -43,6 +100,21 @@ class GAPSolver:
     def __init__(self, config: GAPConfig = None):
         self.config = config or GAPConfig()
         self.logger = logging.getLogger(__name__)
+        self.last_solve_stats: Dict[str, Any] = {}
+        # Lagrange multipliers of the last capacitated solve, reused as a warm start
+        self._multipliers: Dict[str, float] = {}
+        self._state: Optional[GAPSolveState] = None
+        self._consecutive_repairs = 0
+        self.timing_stats: Dict[str, Any] = {
+            'full_solves': 0,
+            'repairs': 0,
+            'last_mode': None,
+            'last_change_ratio': 0.0,
+            'last_full_ms': 0.0,
+            'last_repair_ms': 0.0,
+            'total_full_ms': 0.0,
+            'total_repair_ms': 0.0,
+        }
         
     def calculate_latency(self, user_location: Dict[str, float], 
                          node_info: Dict[str, Any], 
@@ -80,99 +152,411 @@ class GAPSolver:
     
     def build_profit_matrix(self, users: Dict[str, Any], 
                            edge_nodes: Dict[str, Any], 
-                           central_node: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+                           central_node: Dict[str, Any]) -> ProfitMatrix:
         """
         Build profit matrix H[u][v] = utility gain when assigning user u to node v.
         H[u][v] = D(u, cloud, t) - D(u, v, t)
+        Same latency model as calculate_latency, evaluated for all pairs at once.
         """
-        profits = {}
-        
-        # Virtual cloud node for comparison
-        cloud_node = {
-            'location': {'x': 0, 'y': 0},
-            'node_id': 'cloud'
-        }
-        
-        for user_id, user_info in users.items():
-            profits[user_id] = {}
-            user_location = user_info.get('location', {'x': 0, 'y': 0})
-            
-            # Calculate cloud latency (baseline)
-            cloud_latency = self.calculate_latency(user_location, cloud_node, 'cloud')
-            
-            # Calculate profit for each edge node
-            for node_id, node_info in edge_nodes.items():
-                edge_latency = self.calculate_latency(user_location, node_info, 'edge')
-                profits[user_id][node_id] = max(0, cloud_latency - edge_latency)
-            
-            # Calculate profit for central node
-            if central_node:
-                central_latency = self.calculate_latency(user_location, central_node, 'central')
-                profits[user_id]['central_node'] = max(0, cloud_latency - central_latency)
-            
-            # Cloud has 0 profit (baseline)
-            profits[user_id]['cloud'] = 0
-            
-        return profits
+        all_nodes = self._all_nodes(edge_nodes, central_node)
+        user_ids = list(users.keys())
+        node_ids = list(all_nodes.keys())
+        ux, uy = self._user_coordinates(users, user_ids)
+        nx, ny = self._node_coordinates(all_nodes, node_ids)
+        profit, latency = self._profit_rows(ux, uy, nx, ny, node_ids.index('cloud'))
+        return ProfitMatrix(user_ids=user_ids, node_ids=node_ids,
+                            node_types=[all_nodes[node_id]['type'] for node_id in node_ids],
+                            profit=profit, latency=latency)
+
+    @staticmethod
+    def _user_coordinates(users: Dict[str, Any], user_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        locations = [users[user_id].get('location') or {} for user_id in user_ids]
+        ux = np.fromiter((loc.get('x', 0) for loc in locations), dtype=float, count=len(user_ids))
+        uy = np.fromiter((loc.get('y', 0) for loc in locations), dtype=float, count=len(user_ids))
+        return ux, uy
+
+    @staticmethod
+    def _node_coordinates(all_nodes: Dict[str, Dict[str, Any]], node_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        node_locations = [all_nodes[node_id]['info'].get('location') or {} for node_id in node_ids]
+        nx = np.array([loc.get('x', 0) for loc in node_locations], dtype=float)
+        ny = np.array([loc.get('y', 0) for loc in node_locations], dtype=float)
+        return nx, ny
+
+    def _profit_rows(self, ux: np.ndarray, uy: np.ndarray, nx: np.ndarray, ny: np.ndarray,
+                     cloud_column: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(profit, latency) rows for the given users against all node columns."""
+        cfg = self.config
+        # Edge / central: distance-based communication + processing + cold start
+        latency = ux[:, None] - nx[None, :]
+        np.square(latency, out=latency)
+        latency += np.square(uy[:, None] - ny[None, :])
+        np.sqrt(latency, out=latency)
+        latency *= cfg.upload_size_mb * cfg.ap_to_ap_delay_per_mb / 100.0
+        latency += (cfg.upload_size_mb * cfg.ap_to_ap_delay_per_mb
+                    + cfg.upload_size_mb * cfg.edge_processing_rate + cfg.cold_start_penalty)
+        np.maximum(latency, 0.0, out=latency)
+
+        # Cloud (baseline): fixed delay, no cold start, 0 profit
+        cloud_latency = max(0.0, cfg.upload_size_mb * (cfg.ap_to_cloud_delay_per_mb + cfg.cloud_processing_rate))
+        latency[:, cloud_column] = cloud_latency
+
+        profit = np.subtract(cloud_latency, latency)
+        np.maximum(profit, 0.0, out=profit)
+        profit[:, cloud_column] = 0.0
+        return profit, latency
     
-    def solve_gap_greedy(self, users: Dict[str, Any], 
-                        edge_nodes: Dict[str, Any], 
-                        central_node: Dict[str, Any]) -> List[GAPAssignment]:
-        """
-        Greedy approximation for GAP.
-        For each user, assign to node with maximum utility gain.
-        """
-        profits = self.build_profit_matrix(users, edge_nodes, central_node)
-        assignments = []
-        
-        # All available nodes
+    def _all_nodes(self, edge_nodes: Dict[str, Any], central_node: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Candidate nodes in column order: edge nodes, central node, virtual cloud."""
         all_nodes = {}
         for node_id, node_info in edge_nodes.items():
             all_nodes[node_id] = {'info': node_info, 'type': 'edge'}
         if central_node:
             all_nodes['central_node'] = {'info': central_node, 'type': 'central'}
         all_nodes['cloud'] = {'info': {'location': {'x': 0, 'y': 0}}, 'type': 'cloud'}
-        
-        for user_id, user_info in users.items():
-            best_node_id = None
-            best_profit = -1
-            best_type = None
-            
-            # Find node with maximum profit
-            for node_id in all_nodes:
-                profit = profits[user_id].get(node_id, 0)
-                if profit > best_profit:
-                    best_profit = profit
-                    best_node_id = node_id
-                    best_type = all_nodes[node_id]['type']
-            
-            if best_node_id:
-                # Calculate final latency
-                user_location = user_info.get('location', {'x': 0, 'y': 0})
-                node_info = all_nodes[best_node_id]['info']
-                estimated_latency = self.calculate_latency(user_location, node_info, best_type)
-                
-                assignment = GAPAssignment(
-                    user_id=user_id,
-                    target_node_id=best_node_id,
-                    node_type=best_type,
-                    utility_gain=best_profit,
-                    estimated_latency=estimated_latency,
-                    reasoning=f"GAP greedy: max utility gain {best_profit:.2f}ms"
-                )
-                assignments.append(assignment)
-                
-                if self.config.debug_logging:
-                    self.logger.info(f"GAP assignment: {user_id} -> {best_node_id} "
-                                   f"(profit: {best_profit:.2f}, latency: {estimated_latency:.2f})")
-        
+        return all_nodes
+
+    def user_memory_mb(self, user_info: Dict[str, Any]) -> float:
+        """Memory a user occupies on its node (MB); 'memory_requirement' is in bytes like UserNodeInfo."""
+        requirement = user_info.get('memory_requirement')
+        if requirement is None:
+            return self.config.default_memory_requirement_mb
+        return max(0.0, float(requirement) / (1024 * 1024))
+
+    def node_capacity_mb(self, node_info: Dict[str, Any], node_type: str) -> float:
+        """
+        Free memory (MB) a node can hand out, from NodeMetrics memory_total (bytes) and
+        memory_usage (percent). Central node and cloud are treated as unbounded unless
+        the node dict carries an explicit 'memory_capacity_mb'.
+        """
+        if 'memory_capacity_mb' in node_info:
+            return float(node_info['memory_capacity_mb'])
+        if node_type != 'edge':
+            return math.inf
+        metrics = node_info.get('metrics') or {}
+        if not isinstance(metrics, dict):
+            metrics = getattr(metrics, '__dict__', {})
+        try:
+            total_bytes = float(metrics.get('memory_total', 0) or 0)
+            usage_percent = float(metrics.get('memory_usage', 0) or 0) / 100.0
+        except (TypeError, ValueError):
+            return math.inf
+        if total_bytes <= 0:
+            return math.inf
+        return total_bytes * max(0.0, 1.0 - usage_percent) / (1024 * 1024)
+
+    def _build_assignments(self, matrix: ProfitMatrix, choice: np.ndarray, reasoning: str) -> List[GAPAssignment]:
+        """GAPAssignment per user from a column choice; `reasoning` is formatted with the gain."""
+        rows = np.arange(len(matrix.user_ids))
+        gains = matrix.profit[rows, choice].tolist()
+        latencies = matrix.latency[rows, choice].tolist()
+        node_ids, node_types = matrix.node_ids, matrix.node_types
+        assignments = []
+        for user_id, column, gain, estimated_latency in zip(matrix.user_ids, choice.tolist(), gains, latencies):
+            node_id = node_ids[column]
+            assignments.append(GAPAssignment(
+                user_id=user_id,
+                target_node_id=node_id,
+                node_type=node_types[column],
+                utility_gain=gain,
+                estimated_latency=estimated_latency,
+                reasoning=reasoning.format(gain=gain)
+            ))
+            if self.config.debug_logging:
+                self.logger.debug(f"GAP assignment: {user_id} -> {node_id} "
+                                  f"(profit: {gain:.2f}, latency: {estimated_latency:.2f})")
         return assignments
+
+    def _capacity_problem(self, users: Dict[str, Any], edge_nodes: Dict[str, Any], central_node: Dict[str, Any]):
+        """(profit matrix, per-user weights, per-node capacities) for the capacity-constrained solvers."""
+        matrix = self.build_profit_matrix(users, edge_nodes, central_node)
+        weights = self._user_weights(users, matrix.user_ids)
+        capacities = self._node_capacities(self._all_nodes(edge_nodes, central_node), matrix.node_ids)
+        return matrix, weights, capacities
+
+    def _user_weights(self, users: Dict[str, Any], user_ids: List[str]) -> np.ndarray:
+        return np.fromiter((self.user_memory_mb(users[user_id]) for user_id in user_ids),
+                           dtype=float, count=len(user_ids))
+
+    def _node_capacities(self, all_nodes: Dict[str, Dict[str, Any]], node_ids: List[str]) -> np.ndarray:
+        if not self.config.enable_memory_constraints:
+            return np.full(len(node_ids), math.inf)
+        capacities = np.array([self.node_capacity_mb(all_nodes[node_id]['info'], all_nodes[node_id]['type'])
+                               for node_id in node_ids], dtype=float)
+        # The virtual cloud always absorbs whatever does not fit elsewhere
+        capacities[node_ids.index('cloud')] = math.inf
+        return capacities
+
+    @staticmethod
+    def _accept_prefix(targets: np.ndarray, weights: np.ndarray, capacities: np.ndarray) -> np.ndarray:
+        """
+        For users already sorted by priority within each target node, mask of those that
+        fit: the leading run per node whose cumulative weight stays within capacity.
+        `targets` must be grouped (sorted) by node.
+        """
+        cumulative = np.cumsum(weights)
+        group_start = np.searchsorted(targets, targets, side='left')
+        offset = np.concatenate(([0.0], cumulative))[group_start]
+        return cumulative - offset <= capacities[targets] + 1e-9
+
+    @classmethod
+    def _greedy_fill(cls, profit: np.ndarray, weights: np.ndarray, residual: np.ndarray,
+                     rows: np.ndarray, choice: np.ndarray):
+        """
+        Assign `rows` (highest priority first) to their best node that still has room;
+        updates `choice` and `residual` in place. Works in rounds: every pending user
+        targets its best node with room, each node accepts users in priority order
+        while they fit, and the rest retry against the reduced residuals.
+        """
+        pending = np.asarray(rows, dtype=np.int64)
+        while pending.size:
+            room = residual[None, :] >= weights[pending, None] - 1e-9
+            target = np.argmax(np.where(room, profit[pending], -np.inf), axis=1)
+            order = np.argsort(target, kind='stable')
+            sorted_targets = target[order]
+            sorted_weights = weights[pending[order]]
+            fits = cls._accept_prefix(sorted_targets, sorted_weights, residual)
+            choice[pending[order[fits]]] = sorted_targets[fits]
+            residual -= np.bincount(sorted_targets[fits], weights=sorted_weights[fits], minlength=residual.size)
+            pending = pending[np.sort(order[~fits])]
+
+    def solve_gap_capacity_greedy(self, users: Dict[str, Any],
+                                  edge_nodes: Dict[str, Any],
+                                  central_node: Dict[str, Any]) -> List[GAPAssignment]:
+        """
+        Greedy GAP with memory capacities: users with the largest attainable gain
+        pick first, each taking its best node that still has room.
+        """
+        matrix, weights, capacities = self._capacity_problem(users, edge_nodes, central_node)
+        choice = self._capacity_greedy_choice(matrix.profit, weights, capacities)
+        return self._build_assignments(matrix, choice, "GAP capacity greedy: utility gain {gain:.2f}ms")
+
+    def _capacity_greedy_choice(self, profit: np.ndarray, weights: np.ndarray, capacities: np.ndarray) -> np.ndarray:
+        choice = np.zeros(profit.shape[0], dtype=np.int64)
+        order = np.argsort(-profit.max(axis=1), kind='stable')
+        self._greedy_fill(profit, weights, capacities.copy(), order, choice)
+        return choice
+
+    def _solve_exact(self, profit: np.ndarray, weights: np.ndarray, capacities: np.ndarray,
+                     time_limit: float) -> Optional[np.ndarray]:
+        """Exact 0/1 GAP via scipy's MILP solver (HiGHS). None if unavailable or not solved."""
+        try:
+            from scipy.optimize import Bounds, LinearConstraint, milp
+            from scipy.sparse import coo_matrix
+        except ImportError:
+            return None
+
+        num_users, num_nodes = profit.shape
+        size = num_users * num_nodes
+        # Variable u * num_nodes + j is 1 when user u goes to node j
+        user_rows = np.repeat(np.arange(num_users), num_nodes)
+        one_each = LinearConstraint(
+            coo_matrix((np.ones(size), (user_rows, np.arange(size))), shape=(num_users, size)), 1, 1)
+        constraints = [one_each]
+        bounded = np.flatnonzero(np.isfinite(capacities))
+        if bounded.size:
+            cols = (np.arange(num_users)[:, None] * num_nodes + bounded[None, :]).ravel()
+            cap_rows = np.tile(np.arange(bounded.size), num_users)
+            data = np.repeat(weights, bounded.size)
+            constraints.append(LinearConstraint(
+                coo_matrix((data, (cap_rows, cols)), shape=(bounded.size, size)), -np.inf, capacities[bounded]))
+        result = milp(
+            c=-profit.ravel(),
+            constraints=constraints,
+            integrality=np.ones(size),
+            bounds=Bounds(0, 1),
+            options={'time_limit': max(0.01, time_limit)},
+        )
+        if result.x is None or result.status not in (0, 1):
+            return None
+        return np.argmax(result.x.reshape(num_users, num_nodes), axis=1)
+
+    def _solve_lagrangian(self, profit: np.ndarray, weights: np.ndarray, capacities: np.ndarray,
+                          deadline: float, initial_choice: Optional[np.ndarray] = None,
+                          initial_multipliers: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict[str, Any], np.ndarray]:
+        """
+        Lagrangian relaxation of the capacity constraints with subgradient updates.
+        Each iteration solves the relaxed problem (every user takes argmax of
+        profit - lambda_j * weight), repairs it into a feasible assignment and keeps
+        the best feasible solution seen. A previous assignment (-1 = unknown user)
+        and multipliers can be given as a warm start.
+        Returns (choice, info, multipliers).
+        """
+        num_users, num_nodes = profit.shape
+        finite = np.isfinite(capacities)
+        caps = np.where(finite, capacities, 0.0)
+        multipliers = np.zeros(num_nodes) if initial_multipliers is None else np.maximum(0.0, initial_multipliers)
+        rows = np.arange(num_users)
+
+        best_choice, best_value = None, -math.inf
+        if initial_choice is not None:
+            seeded = np.where(initial_choice >= 0, initial_choice, np.argmax(profit, axis=1))
+            best_choice, best_value = self._repair(profit, weights, capacities, seeded, profit)
+        upper_bound = math.inf
+        step_scale = 2.0
+        stalled = 0
+        iterations = 0
+        slowest_iteration = 0.0
+        while iterations < self.config.max_iterations:
+            iteration_started = time.time()
+            # Never start an iteration that would overrun the deadline if it ran as slow as the slowest so far
+            if best_choice is not None and iteration_started + slowest_iteration > deadline:
+                break
+            iterations += 1
+            reduced = profit - multipliers[None, :] * weights[:, None]
+            relaxed = np.argmax(reduced, axis=1)
+            relaxed_value = float(reduced[rows, relaxed].sum() + (multipliers * caps).sum())
+            if relaxed_value < upper_bound - 1e-9:
+                upper_bound, stalled = relaxed_value, 0
+            else:
+                stalled += 1
+                if stalled >= 5:
+                    step_scale, stalled = step_scale / 2.0, 0
+
+            choice, value = self._repair(profit, weights, capacities, relaxed, reduced)
+            if value > best_value:
+                best_choice, best_value = choice, value
+
+            gap = (upper_bound - best_value) / max(abs(upper_bound), 1e-9)
+            if gap <= self.config.optimality_tolerance:
+                break
+
+            loads = np.bincount(relaxed, weights=weights, minlength=num_nodes)
+            subgradient = np.where(finite, loads - caps, 0.0)
+            # Multipliers already at zero cannot decrease further
+            subgradient[(multipliers <= 0) & (subgradient < 0)] = 0.0
+            norm = float(np.dot(subgradient, subgradient))
+            if norm <= 0:
+                break  # relaxed solution is feasible and therefore optimal
+            step = step_scale * (upper_bound - best_value) / norm
+            multipliers = np.maximum(0.0, multipliers + step * subgradient)
+            slowest_iteration = max(slowest_iteration, time.time() - iteration_started)
+
+        info = {
+            'iterations': iterations,
+            'upper_bound': upper_bound,
+            'objective': best_value,
+            'gap': (upper_bound - best_value) / max(abs(upper_bound), 1e-9),
+            'warm_start': initial_choice is not None,
+        }
+        return best_choice, info, multipliers
+
+    def _repair(self, profit: np.ndarray, weights: np.ndarray, capacities: np.ndarray,
+                relaxed: np.ndarray, reduced: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Turn a relaxed choice into a capacity-feasible one: overloaded nodes keep the
+        users that lose most per MB by moving, the rest are re-inserted greedily into
+        residual capacity. Returns (choice, objective).
+        """
+        num_users, num_nodes = profit.shape
+        rows = np.arange(num_users)
+        if num_nodes > 1:
+            second = np.partition(reduced, num_nodes - 2, axis=1)[:, num_nodes - 2]
+        else:
+            second = reduced[:, 0]
+        regret = (reduced[rows, relaxed] - second) / np.maximum(weights, 1e-9)
+        order = np.lexsort((-regret, relaxed))
+        sorted_nodes = relaxed[order]
+        fits = self._accept_prefix(sorted_nodes, weights[order], capacities)
+
+        choice = relaxed.copy()
+        residual = capacities - np.bincount(sorted_nodes[fits], weights=weights[order][fits], minlength=num_nodes)
+        evicted = order[~fits]
+        if evicted.size:
+            evicted = evicted[np.argsort(-profit[evicted].max(axis=1), kind='stable')]
+            self._greedy_fill(profit, weights, residual, evicted, choice)
+
+        # One improvement pass: users off their unconstrained best try any node with room left
+        current_profit = profit[rows, choice]
+        room = residual[None, :] >= weights[:, None] - 1e-9
+        reachable = np.where(room, profit, -np.inf).max(axis=1)
+        unhappy = np.flatnonzero(reachable > current_profit + 1e-9)
+        for row in unhappy:
+            current = choice[row]
+            fits_now = residual >= weights[row] - 1e-9
+            candidate = int(np.argmax(np.where(fits_now, profit[row], -np.inf)))
+            if profit[row, candidate] > profit[row, current] + 1e-9:
+                residual[current] += weights[row]
+                residual[candidate] -= weights[row]
+                choice[row] = candidate
+        return choice, float(profit[rows, choice].sum())
+
+    def solve_gap_capacitated(self, users: Dict[str, Any],
+                              edge_nodes: Dict[str, Any],
+                              central_node: Dict[str, Any],
+                              warm_start: Optional[Dict[str, str]] = None) -> List[GAPAssignment]:
+        """
+        Capacity-constrained GAP ('ilp'). Node memory is only enforced when
+        `enable_memory_constraints` is set. Small instances are solved exactly with
+        scipy's MILP solver when it is installed; otherwise (or if it does not finish
+        in time) Lagrangian relaxation with repair runs until the optimality gap
+        closes or `time_budget_seconds` (covering the whole call) runs out. `warm_start` (user_id -> node_id,
+        e.g. the previous solution) seeds the Lagrangian search together with the
+        multipliers of the previous solve.
+        """
+        started = time.time()
+        matrix, weights, capacities = self._capacity_problem(users, edge_nodes, central_node)
+        choice, label = self._capacitated_choice(matrix, weights, capacities, warm_start, started)
+        return self._build_assignments(matrix, choice, f"GAP {label}: utility gain {{gain:.2f}}ms")
+
+    def _capacitated_choice(self, matrix: ProfitMatrix, weights: np.ndarray, capacities: np.ndarray,
+                            warm_start: Optional[Dict[str, str]], started: float) -> Tuple[np.ndarray, str]:
+        """Exact-or-Lagrangian column choice for solve_gap_capacitated. Returns (choice, method label)."""
+        # Building the assignments afterwards costs about as much as building the problem did,
+        # so reserve that much of the budget for it
+        deadline = started + self.config.time_budget_seconds - (time.time() - started)
+        profit, user_ids, node_ids = matrix.profit, matrix.user_ids, matrix.node_ids
+
+        choice, label, info = None, 'lagrangian', {}
+        if profit.size <= self.config.exact_max_variables:
+            choice = self._solve_exact(profit, weights, capacities, deadline - time.time())
+            if choice is not None:
+                label = 'exact'
+        if choice is None:
+            initial_choice = None
+            if warm_start:
+                column_of = matrix.node_index
+                initial_choice = np.array([column_of.get(warm_start.get(user_id), -1) for user_id in user_ids],
+                                          dtype=np.int64)
+            initial_multipliers = None
+            if self._multipliers:
+                initial_multipliers = np.array([self._multipliers.get(node_id, 0.0) for node_id in node_ids])
+            choice, info, multipliers = self._solve_lagrangian(
+                profit, weights, capacities, deadline, initial_choice, initial_multipliers)
+            self._multipliers = dict(zip(node_ids, multipliers.tolist()))
+
+        self.last_solve_stats = {
+            'method': label,
+            'users': len(user_ids),
+            'nodes': len(node_ids),
+            'elapsed_seconds': time.time() - started,
+            **info,
+        }
+        if self.config.debug_logging:
+            self.logger.info(f"GAP capacitated solve: {self.last_solve_stats}")
+        return choice, label
+
+    def solve_gap_greedy(self, users: Dict[str, Any], 
+                        edge_nodes: Dict[str, Any], 
+                        central_node: Dict[str, Any]) -> List[GAPAssignment]:
+        """
+        Greedy approximation for GAP.
+        For each user, assign to node with maximum utility gain.
+        """
+        if self.config.enable_memory_constraints:
+            return self.solve_gap_capacity_greedy(users, edge_nodes, central_node)
+
+        matrix = self.build_profit_matrix(users, edge_nodes, central_node)
+        # First node with the maximum profit wins, as in the original per-user loop
+        choice = np.argmax(matrix.profit, axis=1)
+        return self._build_assignments(matrix, choice, "GAP greedy: max utility gain {gain:.2f}ms")
     
     def solve_gap(self, users: Dict[str, Any], 
                   edge_nodes: Dict[str, Any], 
-                  central_node: Dict[str, Any] = None) -> List[GAPAssignment]:
+                  central_node: Dict[str, Any] = None,
+                  warm_start: Optional[Dict[str, str]] = None) -> List[GAPAssignment]:
         """
         Main GAP solver entry point.
+        `warm_start` maps user_id -> previously assigned node_id (used by 'ilp').
         """
         if not users:
             return []
@@ -183,9 +567,7 @@ class GAPSolver:
         
         try:
             if self.config.solver_method == 'ilp':
-                # TODO: Implement ILP solver (OR-Tools)
-                self.logger.info("ILP solver not implemented, using greedy")
-                return self.solve_gap_greedy(users, edge_nodes, central_node)
+                return self.solve_gap_capacitated(users, edge_nodes, central_node, warm_start)
             else:
                 return self.solve_gap_greedy(users, edge_nodes, central_node)
                 
@@ -193,6 +575,143 @@ class GAPSolver:
             self.logger.error(f"GAP solver error: {e}")
             return []
     
+    def _timing_summary(self) -> Dict[str, Any]:
+        """Repair vs full-solve timings of solve_gap_incremental."""
+        stats = dict(self.timing_stats)
+        stats['avg_full_ms'] = stats['total_full_ms'] / stats['full_solves'] if stats['full_solves'] else 0.0
+        stats['avg_repair_ms'] = stats['total_repair_ms'] / stats['repairs'] if stats['repairs'] else 0.0
+        return stats
+
+    def _full_choice(self, matrix: ProfitMatrix, weights: np.ndarray, capacities: np.ndarray,
+                     warm_start: Optional[Dict[str, str]], started: float) -> Tuple[np.ndarray, str]:
+        """Column choice of the configured solver method. Returns (choice, reasoning template)."""
+        if self.config.solver_method == 'ilp':
+            choice, label = self._capacitated_choice(matrix, weights, capacities, warm_start, started)
+            return choice, f"GAP {label}: utility gain {{gain:.2f}}ms"
+        if self.config.enable_memory_constraints:
+            return (self._capacity_greedy_choice(matrix.profit, weights, capacities),
+                    "GAP capacity greedy: utility gain {gain:.2f}ms")
+        return np.argmax(matrix.profit, axis=1), "GAP greedy: max utility gain {gain:.2f}ms"
+
+    def solve_gap_incremental(self, users: Dict[str, Any],
+                              edge_nodes: Dict[str, Any],
+                              central_node: Dict[str, Any] = None,
+                              warm_start: Optional[Dict[str, str]] = None) -> List[GAPAssignment]:
+        """
+        Stateful GAP entry point for repeated rounds over a slowly changing population.
+        If the node set and node locations are unchanged and at most
+        `incremental_change_ratio` of the users are new, moved, resized or gone, only
+        the changed rows of the profit matrix are recomputed: changed users are released,
+        users evicted by shrunken capacities are added to them, and all of them are
+        reinserted greedily into residual capacity. Otherwise this is a full solve.
+        """
+        if not users:
+            return []
+        if not edge_nodes and not central_node:
+            self.logger.warning("No nodes available for GAP assignment")
+            return []
+        try:
+            return self._solve_incremental(users, edge_nodes, central_node, warm_start)
+        except Exception as e:
+            self.logger.error(f"GAP incremental solver error: {e}")
+            self._state = None
+            return []
+
+    def _solve_incremental(self, users: Dict[str, Any], edge_nodes: Dict[str, Any],
+                           central_node: Dict[str, Any], warm_start: Optional[Dict[str, str]]) -> List[GAPAssignment]:
+        started = time.time()
+        all_nodes = self._all_nodes(edge_nodes, central_node)
+        user_ids = list(users.keys())
+        node_ids = list(all_nodes.keys())
+        ux, uy = self._user_coordinates(users, user_ids)
+        nx, ny = self._node_coordinates(all_nodes, node_ids)
+        weights = self._user_weights(users, user_ids)
+        capacities = self._node_capacities(all_nodes, node_ids)
+        state = self._state
+
+        mode, change_ratio = 'full', 1.0
+        if (self.config.incremental_repair and state is not None
+                and self._consecutive_repairs < self.config.max_consecutive_repairs
+                and state.matrix.node_ids == node_ids
+                and np.array_equal(state.nx, nx) and np.array_equal(state.ny, ny)):
+            previous_index = state.matrix.user_index
+            previous_rows = np.fromiter((previous_index.get(user_id, -1) for user_id in user_ids),
+                                        dtype=np.int64, count=len(user_ids))
+            known = previous_rows >= 0
+            changed = ~known
+            rows = previous_rows[known]
+            changed[known] = (state.ux[rows] != ux[known]) | (state.uy[rows] != uy[known]) | \
+                             (state.weights[rows] != weights[known])
+            removed = len(state.matrix.user_ids) - int(known.sum())
+            change_ratio = (int(changed.sum()) + removed) / max(1, len(user_ids))
+            if change_ratio <= self.config.incremental_change_ratio:
+                mode = 'repair'
+
+        if mode == 'repair':
+            matrix, choice = self._repair_round(state, user_ids, node_ids, ux, uy, nx, ny, weights,
+                                                capacities, previous_rows, changed)
+            reasoning = "GAP repair: utility gain {gain:.2f}ms"
+            self._consecutive_repairs += 1
+        else:
+            profit, latency = self._profit_rows(ux, uy, nx, ny, node_ids.index('cloud'))
+            matrix = ProfitMatrix(user_ids=user_ids, node_ids=node_ids,
+                                  node_types=[all_nodes[node_id]['type'] for node_id in node_ids],
+                                  profit=profit, latency=latency)
+            choice, reasoning = self._full_choice(matrix, weights, capacities, warm_start, started)
+            self._consecutive_repairs = 0
+
+        self._state = GAPSolveState(matrix=matrix, choice=choice, ux=ux, uy=uy, weights=weights, nx=nx, ny=ny)
+        elapsed_ms = (time.time() - started) * 1000.0
+        stats = self.timing_stats
+        key = 'repair' if mode == 'repair' else 'full'
+        stats['repairs' if mode == 'repair' else 'full_solves'] += 1
+        stats['last_mode'] = mode
+        stats['last_change_ratio'] = change_ratio
+        stats[f'last_{key}_ms'] = elapsed_ms
+        stats[f'total_{key}_ms'] += elapsed_ms
+        return self._build_assignments(matrix, choice, reasoning)
+
+    def _repair_round(self, state: GAPSolveState, user_ids: List[str], node_ids: List[str],
+                      ux: np.ndarray, uy: np.ndarray, nx: np.ndarray, ny: np.ndarray,
+                      weights: np.ndarray, capacities: np.ndarray,
+                      previous_rows: np.ndarray, changed: np.ndarray) -> Tuple[ProfitMatrix, np.ndarray]:
+        """Reuse unchanged rows and assignments; recompute and reinsert the changed users."""
+        num_users, num_nodes = len(user_ids), len(node_ids)
+        kept = np.flatnonzero(~changed)
+        moved = np.flatnonzero(changed)
+
+        profit = np.empty((num_users, num_nodes))
+        latency = np.empty((num_users, num_nodes))
+        profit[kept] = state.matrix.profit[previous_rows[kept]]
+        latency[kept] = state.matrix.latency[previous_rows[kept]]
+        if moved.size:
+            profit[moved], latency[moved] = self._profit_rows(ux[moved], uy[moved], nx, ny, node_ids.index('cloud'))
+        matrix = ProfitMatrix(user_ids=user_ids, node_ids=node_ids, node_types=state.matrix.node_types,
+                              profit=profit, latency=latency)
+
+        choice = np.full(num_users, -1, dtype=np.int64)
+        choice[kept] = state.choice[previous_rows[kept]]
+        residual = capacities - np.bincount(choice[kept], weights=weights[kept], minlength=num_nodes)
+
+        # Capacity may have shrunk (node memory usage moves every heartbeat): evict the
+        # least valuable users per MB from nodes that no longer fit what they hold
+        evicted = []
+        for column in np.flatnonzero(residual < -1e-9):
+            members = kept[choice[kept] == column]
+            members = members[np.argsort(profit[members, column] / np.maximum(weights[members], 1e-9), kind='stable')]
+            for row in members:
+                if residual[column] >= -1e-9:
+                    break
+                residual[column] += weights[row]
+                choice[row] = -1
+                evicted.append(row)
+
+        pending = np.concatenate((moved, np.array(evicted, dtype=np.int64)))
+        if pending.size:
+            pending = pending[np.argsort(-profit[pending].max(axis=1), kind='stable')]
+            self._greedy_fill(profit, weights, residual, pending, choice)
+        return matrix, choice
+
     def get_assignment_stats(self, assignments: List[GAPAssignment]) -> Dict[str, Any]:
         """Calculate statistics for GAP assignments"""
         if not assignments:
@@ -203,7 +722,8 @@ class GAPSolver:
                 'avg_latency': 0,
                 'edge_assignments': 0,
                 'central_assignments': 0,
-                'cloud_assignments': 0
+                'cloud_assignments': 0,
+                'solver_timings': self._timing_summary()
             }
         
         stats = {
@@ -213,7 +733,8 @@ class GAPSolver:
             'avg_latency': sum(a.estimated_latency for a in assignments) / len(assignments),
             'edge_assignments': sum(1 for a in assignments if a.node_type == 'edge'),
             'central_assignments': sum(1 for a in assignments if a.node_type == 'central'),
-            'cloud_assignments': sum(1 for a in assignments if a.node_type == 'cloud')
+            'cloud_assignments': sum(1 for a in assignments if a.node_type == 'cloud'),
+            'solver_timings': self._timing_summary()
         }
         
         return stats
@@ -0,0 +1,161 @@
+"""
+Fixed-capacity handoff event log.
+Events live in preallocated arrays used as a ring buffer, so recording a
+handoff is O(1) and never copies the log; analytics over a recent time window
+(rates per node, mean gain, ping-pong detection) are computed on demand.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class HandoffRingBuffer:
+    """
+    Ring buffer of (ts, user_id, from, to, improvement) handoff events.
+
+    Node ids are interned to small integer codes (the node set is small); user
+    ids are kept in a preallocated object array so long-running simulations do
+    not grow an interning table with every user ever seen.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = max(1, int(capacity))
+        self._ts = np.zeros(self.capacity, dtype=np.float64)
+        self._improvement = np.zeros(self.capacity, dtype=np.float64)
+        self._from = np.zeros(self.capacity, dtype=np.int32)
+        self._to = np.zeros(self.capacity, dtype=np.int32)
+        self._user = np.empty(self.capacity, dtype=object)
+        self._node_codes: Dict[str, int] = {}
+        self._node_names: List[str] = []
+        self._head = 0  # next slot to write
+        self._count = 0
+        self._total = 0  # events ever recorded
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def total_recorded(self) -> int:
+        return self._total
+
+    def _node_code(self, node_id: str) -> int:
+        code = self._node_codes.get(node_id)
+        if code is None:
+            code = len(self._node_names)
+            self._node_names.append(node_id)
+            self._node_codes[node_id] = code
+        return code
+
+    def append(self, ts: float, user_id: str, from_id: str, to_id: str, improvement: float):
+        with self._lock:
+            slot = self._head
+            self._ts[slot] = ts
+            self._user[slot] = user_id
+            self._from[slot] = self._node_code(from_id)
+            self._to[slot] = self._node_code(to_id)
+            self._improvement[slot] = improvement
+            self._head = (slot + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self._total += 1
+
+    def clear(self):
+        with self._lock:
+            self._head = 0
+            self._count = 0
+            self._user[:] = None
+
+    def _slots(self, last: Optional[int] = None) -> np.ndarray:
+        """Buffer slots of the stored (or last `last`) events, oldest first. Caller holds the lock."""
+        count = self._count if last is None else min(max(0, last), self._count)
+        return (self._head - count + np.arange(count)) % self.capacity
+
+    def tail(self, n: int = 20) -> List[Dict[str, Any]]:
+        """Most recent n events, oldest first, in the original handoff_log dict format."""
+        with self._lock:
+            slots = self._slots(n)
+            names = self._node_names
+            return [
+                {
+                    'ts': float(self._ts[slot]),
+                    'user_id': self._user[slot],
+                    'from': names[self._from[slot]],
+                    'to': names[self._to[slot]],
+                    'improvement': float(self._improvement[slot]),
+                }
+                for slot in slots
+            ]
+
+    def stats(self, window_seconds: float = 60.0, ping_pong_seconds: float = 10.0,
+              now: Optional[float] = None, top: int = 5) -> Dict[str, Any]:
+        """
+        Aggregates over events newer than `window_seconds`:
+        overall and per-node (in/out) handoff rates, mean/max improvement, and
+        ping-pongs, i.e. a user going A -> B and back B -> A within `ping_pong_seconds`.
+        """
+        now = time.time() if now is None else now
+        window_seconds = max(1e-6, float(window_seconds))
+        with self._lock:
+            slots = self._slots()
+            ts = self._ts[slots]
+            in_window = ts >= now - window_seconds
+            slots, ts = slots[in_window], ts[in_window]
+            users = self._user[slots]
+            from_codes = self._from[slots]
+            to_codes = self._to[slots]
+            improvement = self._improvement[slots]
+            names = list(self._node_names)
+
+        count = int(slots.size)
+        result: Dict[str, Any] = {
+            'window_seconds': window_seconds,
+            'ping_pong_seconds': ping_pong_seconds,
+            'events': count,
+            'buffered': len(self),
+            'capacity': self.capacity,
+            'total_recorded': self._total,
+            'handoffs_per_sec': count / window_seconds,
+            'mean_improvement': float(improvement.mean()) if count else 0.0,
+            'max_improvement': float(improvement.max()) if count else 0.0,
+            'per_node': {},
+            'ping_pong': {'count': 0, 'ratio': 0.0, 'users': 0, 'top_users': []},
+        }
+        if not count:
+            return result
+
+        outgoing = np.bincount(from_codes, minlength=len(names))
+        incoming = np.bincount(to_codes, minlength=len(names))
+        result['per_node'] = {
+            names[code]: {
+                'out': int(outgoing[code]),
+                'in': int(incoming[code]),
+                'out_per_sec': outgoing[code] / window_seconds,
+                'in_per_sec': incoming[code] / window_seconds,
+            }
+            for code in np.flatnonzero(outgoing + incoming)
+        }
+
+        # Ping-pong: consecutive events of the same user that undo each other quickly
+        user_keys, user_codes = np.unique(users.astype(str), return_inverse=True)
+        order = np.lexsort((ts, user_codes))
+        same_user = user_codes[order][1:] == user_codes[order][:-1]
+        reverses = (from_codes[order][1:] == to_codes[order][:-1]) & (to_codes[order][1:] == from_codes[order][:-1])
+        quick = ts[order][1:] - ts[order][:-1] <= ping_pong_seconds
+        ping_pongs = same_user & reverses & quick
+        pp_count = int(ping_pongs.sum())
+        if pp_count:
+            per_user = np.bincount(user_codes[order][1:][ping_pongs], minlength=len(user_keys))
+            ranked = np.argsort(-per_user, kind='stable')[:top]
+            result['ping_pong'] = {
+                'count': pp_count,
+                'ratio': pp_count / count,
+                'users': int(np.count_nonzero(per_user)),
+                'top_users': [
+                    {'user_id': str(user_keys[code]), 'count': int(per_user[code])}
+                    for code in ranked if per_user[code] > 0
+                ],
+            }
+        return result
@@ -3,17 +3,31 @@ Central Node Control Layer - Scheduler Module
 Handles scheduling decisions, load balancing, and request routing
 """
 
+import copy
+import dataclasses
 import logging
+import threading
 import time
-from typing import Dict, List, Optional, Any, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Any, Sequence, Tuple
 from dataclasses import dataclass, field
 import time
 from enum import Enum
 
+import numpy as np
+
 from config import Config
 
 from central_node.control_layer.metrics_module.global_metrics import NodeMetrics
 from central_node.control_layer.scheduler_module.gap_solver import GAPSolver, GAPConfig
+from central_node.control_layer.scheduler_module.handoff_log import HandoffRingBuffer
+from central_node.control_layer.scheduler_module.spatial_index import EdgeNodeSpatialIndex
+from central_node.control_layer.scheduler_module.user_store import (
+    DISTANCE_SCORE_INPUT_COLUMNS,
+    SCORE_INPUT_COLUMNS,
+    UserStore,
+    UserStoreSnapshot,
+)
 
 class SchedulingStrategy(Enum):
     ROUND_ROBIN = "round_robin"
@@ -58,6 +72,70 @@ class UserNodeInfo:
     last_handoff: float = 0.0
     predictive_debug: Optional[Dict[str, Any]] = None
 
+@dataclass
+class PredictiveDebugRecord:
+    """Compact PREDICTIVE decision record; expanded to the candidate dict only when read."""
+    node_id: str
+    node_type: str
+    score: float
+    utility: float
+    latency: float
+    memory_required_mb: float
+    memory_available_mb: float
+    cpu_penalty: float
+    handoff_penalty: float
+    propagation_delay: float
+    transmission_delay: float
+    processing_delay: float
+    warm_probability: float
+    distance_meters: float
+    cloud_latency: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'node_id': self.node_id,
+            'node_type': self.node_type,
+            'score': self.score,
+            'utility': self.utility,
+            'latency': self.latency,
+            'memory_required_mb': self.memory_required_mb,
+            'memory_available_mb': self.memory_available_mb,
+            'cpu_penalty': self.cpu_penalty,
+            'handoff_penalty': self.handoff_penalty,
+            'details': {
+                'total_latency': self.latency,
+                'communication_delay': self.propagation_delay + self.transmission_delay,
+                'processing_delay': self.processing_delay,
+                'warm_probability': self.warm_probability,
+                'distance_meters': self.distance_meters,
+                'transmission_delay': self.transmission_delay
+            },
+            'cloud_latency': self.cloud_latency
+        }
+
+@dataclass(frozen=True)
+class ClusterSnapshot:
+    """Consistent, immutable view of scheduler state for read-only endpoints."""
+    version: Tuple[int, int, int]  # (edge nodes, central node, users)
+    taken_at: float
+    edge_nodes: Mapping[str, EdgeNodeInfo]
+    central_node: Dict[str, Any]
+    users: UserStoreSnapshot
+
+class NodeArrays(NamedTuple):
+    """Edge node scoring inputs laid out as arrays (index j = node_ids[j])."""
+    node_ids: List[str]
+    x: np.ndarray
+    y: np.ndarray
+    coverage: np.ndarray
+    load: np.ndarray  # CPU usage 0..1
+    available_mb: np.ndarray
+    warm_probability: np.ndarray
+
+# User store columns read by the batched scans
+DISTANCE_SCAN_COLUMNS = ('x', 'y', 'last_handoff')
+PREDICTIVE_SCAN_COLUMNS = DISTANCE_SCAN_COLUMNS + ('data_size', 'bandwidth', 'computation_delay', 'memory_requirement')
+
 @dataclass
 class SchedulingDecision:
     target_node_id: str
@@ -67,20 +145,35 @@ class SchedulingDecision:
 
 class Scheduler:
     def __init__(self, strategy: SchedulingStrategy = SchedulingStrategy.ROUND_ROBIN):
-        self.strategy = strategy
+        # Copy-on-write: writers publish a new dict, readers may iterate the one they hold.
+        # EdgeNodeInfo objects in a published dict are never mutated in place.
         self.edge_nodes: Dict[str, EdgeNodeInfo] = {}
+        self._edge_nodes_lock = threading.Lock()
+        self._edge_nodes_version = 0
+        self._central_version = 0
+        self._snapshot: Optional[ClusterSnapshot] = None
+        # Coverage-aware grid over edge nodes, kept in sync by register/update/unregister
+        self.spatial_index = EdgeNodeSpatialIndex(cell_size=getattr(Config, 'SPATIAL_INDEX_CELL_SIZE', 150.0))
         self.central_node = {
             "node_id": "central_node",
             "endpoint": "localhost:8000",
             "location": {"x": 600, "y": 400}, # default location
             "coverage": 0 # default coverage
         }
-        self.user_nodes: Dict[str, UserNodeInfo] = {}
+        # Columnar registry; indexing returns UserNodeInfo-compatible views
+        self.user_nodes: UserStore = UserStore()
+        self.strategy = strategy
         self.round_robin_index = 0
         self.logger = logging.getLogger(__name__)
         
         # Initialize GAP solver
-        self.gap_solver = GAPSolver(GAPConfig(debug_logging=True))
+        self.gap_solver = GAPSolver(GAPConfig(
+            solver_method=getattr(Config, 'GAP_SOLVER_METHOD', 'greedy'),
+            enable_memory_constraints=getattr(Config, 'GAP_ENABLE_MEMORY_CONSTRAINTS', False),
+            time_budget_seconds=getattr(Config, 'GAP_TIME_BUDGET_SECONDS', 1.0),
+            default_memory_requirement_mb=Config.PREDICTIVE_DEFAULT_MEMORY_REQUIREMENT_MB,
+            debug_logging=True,
+        ))
         self.simulation = False
         self.current_dataset = None
         self.current_step_id = None
@@ -90,15 +183,53 @@ class Scheduler:
         self.handoff_improvement_threshold: float = getattr(Config, 'HANDOFF_IMPROVEMENT_THRESHOLD', 0.1)
         self.assignment_scan_interval: float = getattr(Config, 'ASSIGNMENT_SCAN_INTERVAL', 0.5)
         self.load_aware_alpha: float = getattr(Config, 'LOAD_AWARE_ALPHA', 1.0)
+        self.batch_assignment_scan: bool = getattr(Config, 'ASSIGNMENT_BATCH_SCAN', True)
+        self.batch_chunk_size: int = getattr(Config, 'ASSIGNMENT_BATCH_CHUNK_SIZE', 1024)
+        self.incremental_assignment_scan: bool = getattr(Config, 'ASSIGNMENT_INCREMENTAL_SCAN', True)
         self.handoff_penalty: float = getattr(Config, 'PREDICTIVE_HANDOFF_COST', 0.05)
+        self.gap_global_reoptimization: bool = getattr(Config, 'GAP_GLOBAL_REOPTIMIZATION', True)
+        self.gap_reoptimize_interval: float = getattr(Config, 'GAP_REOPTIMIZE_INTERVAL', 5.0)
+
+        # Global GAP re-optimization state (GAP_BASELINE online loop)
+        self._gap_last_solve_at = 0.0
+        self._gap_previous_assignment: Dict[str, str] = {}
+        self.gap_stats: Dict[str, Any] = {
+            'solves': 0,
+            'last_solve_at': None,
+            'last_duration_ms': 0.0,
+            'last_users': 0,
+            'last_proposed_moves': 0,
+            'last_handoffs': 0,
+            'solver': {},
+            'assignment': {},
+        }
+
+        # Nodes changed since the last incremental scan: node_id -> previous geometries / metrics flag
+        self._dirty_nodes: Dict[str, Dict[str, Any]] = {}
+        self._dirty_lock = threading.Lock()
+        self.scan_stats: Dict[str, Any] = {
+            'scans': 0,
+            'mode': None,
+            'last_evaluated': 0,
+            'last_skipped': 0,
+            'last_deferred': 0,
+            'last_handoffs': 0,
+            'last_duration_ms': 0.0,
+            'total_evaluated': 0,
+            'total_skipped': 0,
+        }
 
-        # Handoff event log (recent)
-        self.handoff_log: List[Dict[str, Any]] = []
-        self.max_handoff_log = 200
+        # Handoff event log (recent), fixed-capacity ring buffer
+        self.handoff_log = HandoffRingBuffer(getattr(Config, 'HANDOFF_LOG_CAPACITY', 4096))
+        self.handoff_stats_window_seconds: float = getattr(Config, 'HANDOFF_STATS_WINDOW_SECONDS', 60.0)
+        self.ping_pong_window_seconds: float = getattr(Config, 'HANDOFF_PING_PONG_SECONDS', 10.0)
 
-        # Optional trajectory predictor and per-user history (injected by controller)
+        # Optional trajectory predictor (injected by controller); per-user history lives in user_nodes
         self.trajectory_predictor = None
-        self._user_history: Dict[str, List[Tuple[float, float]]] = {}
+        # Next-location predictions are memoized in user_nodes per (history sample, model version)
+        self.prediction_cache_enabled: bool = getattr(Config, 'TRAJECTORY_PREDICTION_CACHE', True)
+        self.prediction_cache_stats: Dict[str, int] = {'hits': 0, 'misses': 0}
+        self._prediction_cache_owner = None
 
     def start_simulation(self):
         self.simulation = True
@@ -108,11 +239,55 @@ class Scheduler:
 
     def get_edge_node(self, node_id: str) -> Optional[EdgeNodeInfo]:
         return self.edge_nodes.get(node_id)
+
+    def _publish_edge_node(self, node_id: str, node: Optional[EdgeNodeInfo]):
+        """Swap in a copy of edge_nodes with node_id set (or removed if node is None). Caller holds the lock."""
+        nodes = dict(self.edge_nodes)
+        if node is None:
+            nodes.pop(node_id, None)
+        else:
+            nodes[node_id] = node
+        self.edge_nodes = nodes
+        self._edge_nodes_version += 1
+
+    def get_snapshot(self) -> ClusterSnapshot:
+        """
+        Versioned read-only view of edge nodes, central node and users.
+        Rebuilt only when something changed since the previous call.
+        """
+        users = self.user_nodes.snapshot()
+        with self._edge_nodes_lock:
+            edge_nodes = self.edge_nodes
+            version = (self._edge_nodes_version, self._central_version, users.version)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        snapshot = ClusterSnapshot(
+            version=version,
+            taken_at=time.time(),
+            edge_nodes=MappingProxyType(edge_nodes),
+            central_node=copy.deepcopy(self.central_node),
+            users=users,
+        )
+        self._snapshot = snapshot
+        return snapshot
     
     def update_edge_node(self, new_edge_node: EdgeNodeInfo):
-        if new_edge_node.node_id not in self.edge_nodes:
-            return
-        self.edge_nodes[new_edge_node.node_id] = new_edge_node
+        with self._edge_nodes_lock:
+            if new_edge_node.node_id not in self.edge_nodes:
+                return
+            self._publish_edge_node(new_edge_node.node_id, new_edge_node)
+        previous = self.spatial_index.geometry(new_edge_node.node_id)
+        if self.spatial_index.update(new_edge_node.node_id, new_edge_node.location, new_edge_node.coverage):
+            self._mark_node_dirty(new_edge_node.node_id, previous_geometry=previous)
+
+    def update_central_node(self, location: Dict[str, float], coverage: Optional[float] = None):
+        self.central_node['location'] = location
+        if coverage is not None:
+            self.central_node['coverage'] = coverage
+        self._central_version += 1
+        # Central distance enters every user's score
+        self.user_nodes.mark_dirty()
         
     def update_user_node(self, user_id: str, new_location: Dict[str, float]) -> bool:
         if user_id not in self.user_nodes:
@@ -148,21 +323,163 @@ class Scheduler:
                     else:
                         user.latency.distance = dist_px * Config.DEFAULT_PIXEL_TO_METERS
         user.last_updated = time.time()
-        # Append to trajectory history
-        try:
-            hist = self._user_history.get(user_id, [])
-            hist.append((new_location['x'], new_location['y']))
-            if len(hist) > 10:
-                hist = hist[-10:]
-            self._user_history[user_id] = hist
-        except Exception:
-            pass
-        
+        # Predictor state before the history sample (see create_user_node)
+        self._observe_trajectories([user_id], [(new_location['x'], new_location['y'])])
+        self.user_nodes.append_history(user_id, new_location['x'], new_location['y'])
+
         return True
-    
+
+    def upsert_users_bulk(self, user_ids: Sequence[str], xs, ys, speeds=None, sizes=None) -> Dict[str, int]:
+        """
+        Create or move many users in one vectorized pass. Moved users keep their
+        assignment unless it is unset, gone or out of coverage (as update_user_node);
+        new users go to the nearest covering node (as _node_assignment) with random
+        data size and bandwidth, like CreateUserNodeController. Speeds/sizes are
+        optional per-user arrays. A repeated id keeps its last entry.
+        Returns {'created', 'updated', 'reassigned'} counts.
+        """
+        xs, ys = np.asarray(xs, dtype=float).reshape(-1), np.asarray(ys, dtype=float).reshape(-1)
+        extra = {name: np.asarray(values, dtype=float).reshape(-1)
+                 for name, values in (('speed', speeds), ('size', sizes)) if values is not None}
+        latest = dict(zip(user_ids, range(len(xs))))
+        ids = list(latest)
+        if len(ids) < len(xs):
+            pick = np.fromiter(latest.values(), dtype=np.int64, count=len(ids))
+            xs, ys = xs[pick], ys[pick]
+            extra = {name: values[pick] for name, values in extra.items()}
+        if not ids:
+            return {'created': 0, 'updated': 0, 'reassigned': 0}
+
+        now = time.time()
+        nodes = self._edge_node_arrays()
+        column_ids = ['central_node'] + nodes.node_ids
+        store = self.user_nodes
+        with store.lock:
+            rows = store.rows_of(ids)
+            new = rows < 0
+            existing = np.flatnonzero(~new)
+            existing_rows = rows[existing]
+            # Current assignment as a column (0 = central, j + 1 = edge j); -1 unknown node, -2 unassigned/new
+            column_of = {node_id: j for j, node_id in enumerate(column_ids)}
+            code_columns = np.array([column_of.get(name, -1) if name else -2 for name in store.node_names()], dtype=np.int64)
+            current_col = np.full(len(ids), -2, dtype=np.int64)
+            current_col[existing] = code_columns[store.node_codes()[existing_rows]]
+
+            target_col, distance_px = self._bulk_covering_assignment(xs, ys, nodes, current_col)
+            distance = distance_px * Config.DEFAULT_PIXEL_TO_METERS
+            propagation_delay = distance / Config.DEFAULT_PROPAGATION_SPEED_IN_METERS * 1000  # Convert to ms
+            target_codes = np.array([store.node_code(node_id) for node_id in column_ids], dtype=np.int32)[target_col]
+
+            # Predictor state before the history samples (see create_user_node)
+            new_idx = np.flatnonzero(new)
+            new_ids = [ids[i] for i in new_idx.tolist()]
+            positions = np.column_stack([xs, ys])
+            if len(existing):
+                self._observe_trajectories([ids[i] for i in existing.tolist()], positions[existing])
+            if new_ids:
+                self._observe_trajectories(new_ids, positions[new_idx], reset=True)
+
+            if len(existing):
+                values = {
+                    'x': xs[existing],
+                    'y': ys[existing],
+                    'last_updated': now,
+                    'distance': distance[existing],
+                    'propagation_delay': propagation_delay[existing],
+                    'total_turnaround_time': propagation_delay[existing]
+                    + store.column('transmission_delay')[existing_rows]
+                    + store.column('computation_delay')[existing_rows],
+                }
+                values.update((name, column[existing]) for name, column in extra.items())
+                store.update_rows(existing_rows, values, target_codes[existing])
+
+            if new_ids:
+                count = len(new_ids)
+                data_size = np.random.randint(Config.DEFAULT_RANDOM_DATA_SIZE_RANGE_IN_BYTES[0],
+                                              Config.DEFAULT_RANDOM_DATA_SIZE_RANGE_IN_BYTES[1] + 1, size=count)
+                bandwidth = np.random.randint(Config.DEFAULT_RANDOM_BANDWIDTH_RANGE_IN_BYTES_PER_MILLISECOND[0],
+                                              Config.DEFAULT_RANDOM_BANDWIDTH_RANGE_IN_BYTES_PER_MILLISECOND[1] + 1, size=count)
+                transmission_delay = data_size / bandwidth
+                store.insert_rows(new_ids, {
+                    'x': xs[new_idx],
+                    'y': ys[new_idx],
+                    'size': extra['size'][new_idx] if 'size' in extra else 10,
+                    'speed': extra['speed'][new_idx] if 'speed' in extra else 5,
+                    'created_at': now,
+                    'last_updated': now,
+                    'last_handoff': now,
+                    'memory_requirement': Config.PREDICTIVE_DEFAULT_MEMORY_REQUIREMENT_MB * 1024 * 1024,
+                    'distance': distance[new_idx],
+                    'data_size': data_size,
+                    'bandwidth': bandwidth,
+                    'propagation_delay': propagation_delay[new_idx],
+                    'transmission_delay': transmission_delay,
+                    'total_turnaround_time': propagation_delay[new_idx] + transmission_delay,
+                }, target_codes[new_idx])
+
+        reassigned = int(np.count_nonzero(target_col[existing] != current_col[existing]))
+        return {'created': len(new_ids), 'updated': int(len(existing)), 'reassigned': reassigned}
+
+    def _bulk_covering_assignment(self, xs: np.ndarray, ys: np.ndarray, nodes: NodeArrays,
+                                  current_col: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized update_user_node rule: keep the central node or a still-covering
+        edge node, otherwise take the nearest covering node (central unless an edge
+        node is strictly closer). Returns (target column, distance in px).
+        """
+        central = self.central_node["location"]
+        central_dist = np.hypot(xs - central["x"], ys - central["y"])
+        target_col = np.zeros(len(xs), dtype=np.int64)
+        distance_px = central_dist.copy()
+        if not nodes.node_ids:
+            return target_col, distance_px
+        chunk_size = max(1, int(self.batch_chunk_size))
+        for start in range(0, len(xs), chunk_size):
+            stop = min(start + chunk_size, len(xs))
+            rows = np.arange(stop - start)
+            dist = np.hypot(xs[start:stop, None] - nodes.x[None, :], ys[start:stop, None] - nodes.y[None, :])
+            covering = np.where(dist <= nodes.coverage[None, :], dist, np.inf)
+            best = np.argmin(covering, axis=1)
+            best_dist = covering[rows, best]
+            use_edge = best_dist < central_dist[start:stop]
+            col = np.where(use_edge, best + 1, 0)
+            px = np.where(use_edge, best_dist, central_dist[start:stop])
+            # Current edge node still covering the user: stay, at the distance to it
+            current = current_col[start:stop]
+            on_edge = np.flatnonzero(current > 0)
+            current_px = covering[on_edge, current[on_edge] - 1]
+            stay = np.isfinite(current_px)
+            col[on_edge[stay]] = current[on_edge[stay]]
+            px[on_edge[stay]] = current_px[stay]
+            # Central stays central
+            on_central = current == 0
+            col[on_central] = 0
+            px[on_central] = central_dist[start:stop][on_central]
+            target_col[start:stop], distance_px[start:stop] = col, px
+        return target_col, distance_px
+
+    def delete_users_bulk(self, user_ids: Sequence[str]) -> int:
+        """Remove many users in one store pass. Returns how many existed."""
+        removed = self.user_nodes.delete_many(list(user_ids))
+        if removed:
+            self._prune_trajectory_state()
+        return removed
+
     def get_central_node_info(self) -> Dict[str, Any]:
         return self.central_node
     
+    @property
+    def strategy(self) -> SchedulingStrategy:
+        return self._strategy
+
+    @strategy.setter
+    def strategy(self, strategy: SchedulingStrategy):
+        # Only predictive scoring depends on latency/memory columns, so only it re-scans on their writes
+        self._strategy = strategy
+        self.user_nodes.set_score_inputs(
+            SCORE_INPUT_COLUMNS if strategy == SchedulingStrategy.PREDICTIVE else DISTANCE_SCORE_INPUT_COLUMNS
+        )
+
     def set_scheduling_strategy(self, strategy: SchedulingStrategy):
         """Change the scheduling strategy"""
         # Allow string input for convenience
@@ -173,6 +490,8 @@ class Scheduler:
                 self.logger.warning(f"Unknown strategy '{strategy}', fallback to round_robin")
                 strategy = SchedulingStrategy.ROUND_ROBIN
         self.strategy = strategy
+        self.user_nodes.mark_dirty()
+        self._gap_last_solve_at = 0.0
         self.logger.info(f"Scheduling strategy changed to: {self.strategy.value}")
         
     def get_scheduling_strategy(self) -> str:
@@ -189,10 +508,26 @@ class Scheduler:
             self.assignment_scan_interval = float(kwargs['assignment_scan_interval'])
         if 'load_aware_alpha' in kwargs:
             self.load_aware_alpha = float(kwargs['load_aware_alpha'])
+        if 'batch_assignment_scan' in kwargs:
+            self.batch_assignment_scan = bool(kwargs['batch_assignment_scan'])
+        if 'incremental_assignment_scan' in kwargs:
+            self.incremental_assignment_scan = bool(kwargs['incremental_assignment_scan'])
+        if 'gap_global_reoptimization' in kwargs:
+            self.gap_global_reoptimization = bool(kwargs['gap_global_reoptimization'])
+        if 'gap_reoptimize_interval' in kwargs:
+            self.gap_reoptimize_interval = float(kwargs['gap_reoptimize_interval'])
+        if 'handoff_stats_window_seconds' in kwargs:
+            self.handoff_stats_window_seconds = float(kwargs['handoff_stats_window_seconds'])
+        if 'ping_pong_window_seconds' in kwargs:
+            self.ping_pong_window_seconds = float(kwargs['ping_pong_window_seconds'])
+        if 'prediction_cache_enabled' in kwargs:
+            self.prediction_cache_enabled = bool(kwargs['prediction_cache_enabled'])
+        # Thresholds and weights change every decision
+        self.user_nodes.mark_dirty()
         self.logger.info(
             f"Assignment config updated: dwell={self.handoff_min_dwell_seconds}s, "
             f"threshold={self.handoff_improvement_threshold}, scan={self.assignment_scan_interval}s, "
-            f"alpha={self.load_aware_alpha}"
+            f"alpha={self.load_aware_alpha}, batch={self.batch_assignment_scan}"
         )
 
     def get_assignment_status(self) -> Dict[str, Any]:
@@ -203,41 +538,85 @@ class Scheduler:
                 'handoff_improvement_threshold': self.handoff_improvement_threshold,
                 'assignment_scan_interval': self.assignment_scan_interval,
                 'load_aware_alpha': self.load_aware_alpha,
+                'batch_assignment_scan': self.batch_assignment_scan,
+                'incremental_assignment_scan': self.incremental_assignment_scan,
+                'gap_global_reoptimization': self.gap_global_reoptimization,
+                'gap_reoptimize_interval': self.gap_reoptimize_interval,
+                'handoff_stats_window_seconds': self.handoff_stats_window_seconds,
+                'ping_pong_window_seconds': self.ping_pong_window_seconds,
+                'prediction_cache_enabled': self.prediction_cache_enabled,
             },
-            'handoff_log_tail': self.handoff_log[-20:],
+            'scan_stats': dict(self.scan_stats),
+            'gap_stats': dict(self.gap_stats),
+            'handoff_log_tail': self.handoff_log.tail(20),
+            'handoff_stats': self.handoff_log.stats(self.handoff_stats_window_seconds, self.ping_pong_window_seconds),
+            'prediction_cache': self._prediction_cache_status(),
             'users': len(self.user_nodes),
             'edge_nodes': len(self.edge_nodes),
         }
     
+    def _prediction_cache_status(self) -> Dict[str, Any]:
+        hits, misses = self.prediction_cache_stats['hits'], self.prediction_cache_stats['misses']
+        return {'hits': hits, 'misses': misses, 'hit_ratio': hits / (hits + misses) if hits + misses else None}
+
     def create_user_node(self, user_node: UserNodeInfo):
-        self.user_nodes[user_node.user_id] = user_node
         # initialize last_updated if missing
         if not getattr(user_node, 'last_updated', None):
             user_node.last_updated = time.time()
         if not getattr(user_node, 'last_handoff', None):
             user_node.last_handoff = user_node.created_at
-        # initialize history with current location
+        # Predictor state first: a new history sample invalidates the user's cached prediction,
+        # so it must not become visible before the state it is predicted from
+        location = user_node.location or {}
+        self._observe_trajectories([user_node.user_id], [(location.get('x', 0.0), location.get('y', 0.0))], reset=True)
+        # Storing the user also starts its trajectory history at the current location
+        self.user_nodes[user_node.user_id] = user_node
+
+    def _observe_trajectories(self, user_ids: List[str], positions, reset: bool = False):
+        """Feed location updates to stateful predictor backends (e.g. the Kalman filter)."""
+        observe = getattr(self.trajectory_predictor, 'observe', None)
+        if observe is None:
+            return
         try:
-            self._user_history[user_node.user_id] = [(user_node.location['x'], user_node.location['y'])]
-        except Exception:
-            self._user_history[user_node.user_id] = []
+            observe(user_ids, positions, time.time(), reset=reset)
+        except Exception as e:
+            self.logger.debug(f"Trajectory observe failed: {e}")
+
+    def _prune_trajectory_state(self):
+        """Drop predictor state of users removed from the store (deletes bypass the scheduler)."""
+        predictor = self.trajectory_predictor
+        retain = getattr(predictor, 'retain', None)
+        if retain is not None and len(predictor) > len(self.user_nodes):
+            retain(self.user_nodes.keys())
 
     def register_edge_node(self, node_info: EdgeNodeInfo):
-        if node_info.node_id in self.edge_nodes:
-            raise Exception(f"Node {node_info.node_id} is already registered")
-        self.edge_nodes[node_info.node_id] = node_info
+        with self._edge_nodes_lock:
+            if node_info.node_id in self.edge_nodes:
+                raise Exception(f"Node {node_info.node_id} is already registered")
+            self._publish_edge_node(node_info.node_id, node_info)
+        self.spatial_index.insert(node_info.node_id, node_info.location, node_info.coverage)
+        self._mark_node_dirty(node_info.node_id)
         self.logger.info(f"Registered edge node: {node_info.node_id}")
         
     def unregister_edge_node(self, node_id: str):
-        if node_id in self.edge_nodes:
-            del self.edge_nodes[node_id]
-            self.logger.info(f"Unregistered edge node: {node_id}")
+        with self._edge_nodes_lock:
+            if node_id not in self.edge_nodes:
+                return
+            self._publish_edge_node(node_id, None)
+        previous = self.spatial_index.geometry(node_id)
+        self.spatial_index.remove(node_id)
+        self._mark_node_dirty(node_id, previous_geometry=previous)
+        self.logger.info(f"Unregistered edge node: {node_id}")
 
     def update_node_metrics(self, node_id: str, new_metrics: NodeMetrics, system_info: Dict[str, Any], endpoint: str):
-        if node_id in self.edge_nodes:
-            self.edge_nodes[node_id].metrics_info = new_metrics
-            self.edge_nodes[node_id].system_info = system_info
-            self.edge_nodes[node_id].last_heartbeat = time.time()
+        with self._edge_nodes_lock:
+            node = self.edge_nodes.get(node_id)
+            if node is not None:
+                self._publish_edge_node(node_id, dataclasses.replace(
+                    node, metrics_info=new_metrics, system_info=system_info, last_heartbeat=time.time()
+                ))
+        if node is not None:
+            self._mark_node_dirty(node_id, metrics=True)
         else:
             self.register_edge_node(EdgeNodeInfo(
                 node_id=node_id,
@@ -308,14 +687,14 @@ class Scheduler:
         # TODO: Integrate with prediction module
         return self._schedule_least_loaded(nodes, request_data)
     
-    def _classify_nodes(self):
+    def _classify_nodes(self, edge_nodes: Optional[Mapping[str, EdgeNodeInfo]] = None):
         classified_nodes = {
             "healthy": set(),
             "warning": set(),
             "unhealthy": set()
         }
 
-        for node in self.edge_nodes.values():
+        for node in (edge_nodes if edge_nodes is not None else self.edge_nodes).values():
             if node.metrics_info.cpu_usage < Config.EDGE_NODE_WARNING_CPU_THRESHOLD and \
                node.metrics_info.memory_usage < Config.EDGE_NODE_WARNING_CPU_THRESHOLD:
                 classified_nodes["healthy"].add(node.node_id)
@@ -329,13 +708,14 @@ class Scheduler:
         
     def get_cluster_status(self) -> Dict[str, Any]:
         current_time = time.time()
-        total_load = sum(node.metrics_info.cpu_usage for node in self.edge_nodes.values())
-        average_load = total_load / len(self.edge_nodes) if self.edge_nodes else 0
+        edge_nodes = self.get_snapshot().edge_nodes
+        total_load = sum(node.metrics_info.cpu_usage for node in edge_nodes.values())
+        average_load = total_load / len(edge_nodes) if edge_nodes else 0
         all_nodes_info = []
         
-        classified_nodes = self._classify_nodes()
+        classified_nodes = self._classify_nodes(edge_nodes)
 
-        for node in self.edge_nodes.values():
+        for node in edge_nodes.values():
             last_seen = current_time - node.last_heartbeat
             node_status = "unidentified"
             if node.node_id in classified_nodes["healthy"]:
@@ -358,7 +738,7 @@ class Scheduler:
             all_nodes_info.append(node_info)
             
         return {
-            "total_nodes": len(self.edge_nodes),
+            "total_nodes": len(edge_nodes),
             "average_load": average_load,
             "edge_nodes_info": all_nodes_info,
             "healthy_node_count": len(classified_nodes["healthy"]),
@@ -373,12 +753,11 @@ class Scheduler:
         min_distance = self._calculate_distance(user_location, self.central_node["location"])
         nearest_node_id = "central_node"  # default to central node
         
-        # Check all edge nodes
-        for node_id, edge_node in self.edge_nodes.items():
-            distance = self._calculate_distance(user_location, edge_node.location)
-            if distance < min_distance and distance <= edge_node.coverage:
-                min_distance = distance
-                nearest_node_id = node_id
+        # Only edge nodes whose coverage contains the user are candidates
+        node_id, distance = self.spatial_index.nearest_covering(user_location)
+        if node_id is not None and distance < min_distance:
+            min_distance = distance
+            nearest_node_id = node_id
 
         return nearest_node_id, min_distance * Config.DEFAULT_PIXEL_TO_METERS
 
@@ -398,19 +777,14 @@ class Scheduler:
             users = {
                 user_id: {
                     'location': user_location,
-                    'data_size': request_data.get('data_size', 300)  # MB
+                    'data_size': request_data.get('data_size', 300),  # MB
+                    'memory_requirement': request_data.get(
+                        'memory_requirement', Config.PREDICTIVE_DEFAULT_MEMORY_REQUIREMENT_MB * 1024 * 1024
+                    )
                 }
             }
             
-            # Convert edge nodes to GAP format
-            edge_nodes = {}
-            for node in nodes:
-                edge_nodes[node.node_id] = {
-                    'node_id': node.node_id,
-                    'location': node.location,
-                    'endpoint': node.endpoint,
-                    'metrics': node.metrics_info.__dict__ if node.metrics_info else {}
-                }
+            edge_nodes = self._gap_node_dicts(nodes)
             
             # Run GAP solver
             assignments = self.gap_solver.solve_gap(users, edge_nodes, self.central_node)
@@ -438,6 +812,115 @@ class Scheduler:
             # Fallback to round robin
             return self._schedule_round_robin(nodes, request_data)
 
+    def _gap_node_dicts(self, nodes) -> Dict[str, Dict[str, Any]]:
+        """Convert edge nodes to GAP solver format"""
+        edge_nodes = {}
+        for node in nodes:
+            edge_nodes[node.node_id] = {
+                'node_id': node.node_id,
+                'location': node.location,
+                'endpoint': node.endpoint,
+                'metrics': node.metrics_info.__dict__ if node.metrics_info else {}
+            }
+        return edge_nodes
+
+    # --- Global GAP re-optimization (GAP_BASELINE online loop) ---
+    def uses_global_gap(self) -> bool:
+        return self.strategy == SchedulingStrategy.GAP_BASELINE and self.gap_global_reoptimization
+
+    def reoptimize_gap_if_due(self, now: Optional[float] = None) -> int:
+        """Run reoptimize_gap once per gap_reoptimize_interval. Returns the number of handoffs."""
+        now = now if now is not None else time.time()
+        if now - self._gap_last_solve_at < self.gap_reoptimize_interval:
+            return 0
+        return self.reoptimize_gap(now)
+
+    def reoptimize_gap(self, now: Optional[float] = None) -> int:
+        """
+        Solve one GAP instance over the whole user population (incrementally repaired or
+        warm-started from the previous solution) and apply only the handoffs that clear the dwell time and
+        handoff_improvement_threshold. Users whose node disappeared always move, and
+        users the solver evicts from a node over its memory capacity move regardless of
+        the threshold. The virtual 'cloud' target maps to the central node.
+        """
+        started = time.time()
+        now = now if now is not None else started
+        self._gap_last_solve_at = now
+        snapshot = self.get_snapshot()
+        users = {
+            user.user_id: {'location': user.location, 'memory_requirement': user.memory_requirement}
+            for user in snapshot.users
+        }
+        if not users:
+            return 0
+        edge_nodes = self._gap_node_dicts(snapshot.edge_nodes.values())
+        central_node = snapshot.central_node
+        # Repairs the previous solution when few users changed, otherwise re-solves
+        assignments = self.gap_solver.solve_gap_incremental(users, edge_nodes, central_node,
+                                                            warm_start=self._gap_previous_assignment)
+        self._gap_previous_assignment = {a.user_id: a.target_node_id for a in assignments}
+
+        current_by_user = dict(zip(snapshot.users.user_ids, snapshot.users.assigned_node_ids()))
+        overloaded = self._gap_overloaded_nodes(current_by_user, users, edge_nodes)
+        proposed = 0
+        handoffs = 0
+        for assignment in assignments:
+            user_id = assignment.user_id
+            target_id = 'central_node' if assignment.target_node_id == 'cloud' else assignment.target_node_id
+            current_id = current_by_user.get(user_id) or 'central_node'
+            if target_id == current_id:
+                continue
+            proposed += 1
+            if user_id not in self.user_nodes:
+                continue  # removed while solving
+            user = self.user_nodes[user_id]
+            location = users[user_id]['location']
+
+            if current_id == 'central_node' or current_id in edge_nodes:
+                if now - user.last_handoff < self.handoff_min_dwell_seconds:
+                    continue
+                current_type = 'central' if current_id == 'central_node' else 'edge'
+                current_info = central_node if current_id == 'central_node' else edge_nodes[current_id]
+                current_latency = self.gap_solver.calculate_latency(location, current_info, current_type)
+                improvement = (current_latency - assignment.estimated_latency) / max(current_latency, 1e-6)
+                if improvement <= self.handoff_improvement_threshold and current_id not in overloaded:
+                    continue
+            else:
+                improvement = 1.0  # current node is gone
+
+            target_location = central_node['location'] if target_id == 'central_node' else edge_nodes[target_id]['location']
+            user.assigned_node_id = target_id
+            user.latency.distance = self._calculate_distance(location, target_location) * Config.DEFAULT_PIXEL_TO_METERS
+            user.last_handoff = now
+            self._record_handoff(now, user_id, current_id, target_id, float(improvement))
+            self.logger.info(f"User {user_id} GAP handoff: {current_id} -> {target_id} (improvement={improvement:.2f})")
+            handoffs += 1
+
+        stats = self.gap_stats
+        stats['solves'] += 1
+        stats['last_solve_at'] = now
+        stats['last_duration_ms'] = (time.time() - started) * 1000.0
+        stats['last_users'] = len(users)
+        stats['last_proposed_moves'] = proposed
+        stats['last_handoffs'] = handoffs
+        stats['solver'] = dict(self.gap_solver.last_solve_stats)
+        stats['assignment'] = self.gap_solver.get_assignment_stats(assignments)
+        return handoffs
+
+    def _gap_overloaded_nodes(self, current_by_user: Dict[str, str], users: Dict[str, Any],
+                              edge_nodes: Dict[str, Dict[str, Any]]) -> set:
+        """Edge nodes whose currently assigned users exceed their free memory."""
+        if not self.gap_solver.config.enable_memory_constraints:
+            return set()
+        loads: Dict[str, float] = {}
+        for user_id, node_id in current_by_user.items():
+            if node_id in edge_nodes:
+                loads[node_id] = loads.get(node_id, 0.0) + self.gap_solver.user_memory_mb(users[user_id])
+        return {
+            node_id for node_id, load in loads.items()
+            if load > self.gap_solver.node_capacity_mb(edge_nodes[node_id], 'edge') + 1e-6
+        }
+
     # --- Online assignment / handoff helpers ---
     def _score_node_distance(self, user_location: Dict[str, float], node: Optional[EdgeNodeInfo]) -> float:
         # Lower is better
@@ -603,9 +1086,10 @@ class Scheduler:
             else:
                 best_score = self._score_node_distance(user_location, None)
 
-            for node_id, node in self.edge_nodes.items():
-                # Only consider nodes within coverage
-                if self._calculate_distance(user_location, node.location) > node.coverage:
+            for node_id, _ in self.spatial_index.covering(user_location):
+                # Only nodes within coverage are returned by the index
+                node = self.edge_nodes.get(node_id)
+                if node is None:
                     continue
                 score = self._score_node_load_aware(user_location, node) if strategy == SchedulingStrategy.LEAST_LOADED else self._score_node_distance(user_location, node)
                 if score < best_score:
@@ -629,13 +1113,10 @@ class Scheduler:
             # Use predicted next location for PREDICTIVE strategy
             loc_for_assignment = user.location
             if self.strategy == SchedulingStrategy.PREDICTIVE and self.trajectory_predictor is not None:
-                hist = self._user_history.get(user.user_id, [])
-                if hist:
-                    try:
-                        px, py = self.trajectory_predictor.predict_next(hist)
-                        loc_for_assignment = {'x': px, 'y': py}
-                    except Exception:
-                        loc_for_assignment = user.location
+                # Same prediction path as the batched scan
+                location = user.location
+                px, py = self._predicted_locations([user.user_id], np.array([location['x']]), np.array([location['y']]))
+                loc_for_assignment = {'x': float(px[0]), 'y': float(py[0])}
 
             current_id = user.assigned_node_id or 'central_node'
 
@@ -679,15 +1160,7 @@ class Scheduler:
                     user.latency.container_status = 'warm' if best_candidate['details']['warm_probability'] > 0.5 else 'cold'
                     user.predictive_debug = best_candidate
                     user.last_handoff = now
-                    self.handoff_log.append({
-                        'ts': now,
-                        'user_id': user.user_id,
-                        'from': current_id,
-                        'to': target_id,
-                        'improvement': relative,
-                    })
-                    if len(self.handoff_log) > self.max_handoff_log:
-                        self.handoff_log = self.handoff_log[-self.max_handoff_log:]
+                    self._record_handoff(now, user.user_id, current_id, target_id, relative)
                     self.logger.info(
                         f"User {user.user_id} predictive handoff: {current_id} -> {target_id} (relative_gain={relative:.2f})"
                     )
@@ -711,18 +1184,474 @@ class Scheduler:
                     dist_px = self._calculate_distance(user.location, self.edge_nodes[target_id].location)
                 user.latency.distance = dist_px * Config.DEFAULT_PIXEL_TO_METERS
                 user.last_handoff = now
-                self.handoff_log.append({
-                    'ts': now,
-                    'user_id': user.user_id,
-                    'from': current_id,
-                    'to': target_id,
-                    'improvement': improved,
-                })
-                if len(self.handoff_log) > self.max_handoff_log:
-                    self.handoff_log = self.handoff_log[-self.max_handoff_log:]
+                self._record_handoff(now, user.user_id, current_id, target_id, improved)
                 self.logger.info(f"User {user.user_id} handoff: {current_id} -> {target_id} (improvement={improved:.2f})")
                 return True
             return False
         except Exception as e:
             self.logger.error(f"maybe_reassign_user error: {e}")
             return False
+
+    def _record_handoff(self, ts: float, user_id: str, from_id: str, to_id: str, improvement: float):
+        self.handoff_log.append(ts, user_id, from_id, to_id, improvement)
+
+    # --- Dirty tracking / incremental scan ---
+    def _mark_node_dirty(self, node_id: str, previous_geometry: Optional[Tuple[float, float, float]] = None,
+                         metrics: bool = False):
+        with self._dirty_lock:
+            entry = self._dirty_nodes.setdefault(node_id, {'geometries': [], 'metrics': False})
+            if previous_geometry is not None:
+                entry['geometries'].append(previous_geometry)
+            entry['metrics'] = entry['metrics'] or metrics
+
+    def _take_dirty_nodes(self) -> Dict[str, Dict[str, Any]]:
+        with self._dirty_lock:
+            dirty_nodes, self._dirty_nodes = self._dirty_nodes, {}
+        return dirty_nodes
+
+    def _users_affected_by_nodes(self, dirty_nodes: Dict[str, Dict[str, Any]], columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Users whose candidate set or current score may change because of the given node changes."""
+        count = len(columns['x'])
+        affected = np.zeros(count, dtype=bool)
+        if not dirty_nodes:
+            return affected
+        if self.strategy == SchedulingStrategy.PREDICTIVE:
+            # Every node is a candidate regardless of coverage
+            affected[:] = True
+            return affected
+        load_aware = self.strategy == SchedulingStrategy.LEAST_LOADED
+        for node_id, entry in dirty_nodes.items():
+            if not entry['geometries'] and entry['metrics'] and not load_aware:
+                continue  # metrics do not enter distance-only scores
+            discs = list(entry['geometries'])
+            current = self.spatial_index.geometry(node_id)
+            if current is not None:
+                discs.append(current)
+            for node_x, node_y, coverage in discs:
+                affected |= np.square(columns['x'] - node_x) + np.square(columns['y'] - node_y) <= coverage * coverage
+            code = self.user_nodes.known_node_code(node_id)
+            if code is not None:
+                affected |= columns['node_code'] == code
+        return affected
+
+    def run_assignment_scan(self) -> int:
+        """
+        One pass of the online assignment loop. In incremental mode only users marked dirty
+        (moved / created) or affected by changed nodes are re-evaluated; users still inside
+        their dwell time stay dirty for the next pass. Returns the number of handoffs.
+        """
+        started = time.time()
+        total_users = len(self.user_nodes)
+        if self.strategy == SchedulingStrategy.PREDICTIVE:
+            self._prune_trajectory_state()
+        if self.incremental_assignment_scan:
+            dirty_nodes = self._take_dirty_nodes()
+            dwell = self.handoff_min_dwell_seconds
+            user_ids, deferred = self.user_nodes.take_dirty(
+                lambda columns: self._users_affected_by_nodes(dirty_nodes, columns),
+                lambda columns: started - columns['last_handoff'] < dwell,
+            )
+            handoffs = self.reassign_users_batch(user_ids) if user_ids else 0
+            evaluated = len(user_ids)
+            mode = 'incremental'
+        else:
+            self._take_dirty_nodes()
+            handoffs = self.reassign_users_batch()
+            evaluated, deferred = total_users, 0
+            mode = 'full'
+
+        stats = self.scan_stats
+        stats['scans'] += 1
+        stats['mode'] = mode
+        stats['last_evaluated'] = evaluated
+        stats['last_skipped'] = max(0, total_users - evaluated)
+        stats['last_deferred'] = deferred
+        stats['last_handoffs'] = handoffs
+        stats['last_duration_ms'] = (time.time() - started) * 1000.0
+        stats['total_evaluated'] += evaluated
+        stats['total_skipped'] += stats['last_skipped']
+        return handoffs
+
+    # --- Batched assignment scan ---
+    def supports_batch_scan(self) -> bool:
+        """Every online strategy has a vectorized scan; the flag keeps the per-user path available."""
+        return self.batch_assignment_scan
+
+    def _edge_node_arrays(self) -> NodeArrays:
+        """Per-node scoring inputs for the batched scans."""
+        nodes = list(self.edge_nodes.values())
+        count = len(nodes)
+        loads = np.empty(count, dtype=float)
+        for i, node in enumerate(nodes):
+            try:
+                loads[i] = float(node.metrics_info.cpu_usage or 0) / 100.0
+            except Exception:
+                loads[i] = 0.0
+        return NodeArrays(
+            node_ids=[node.node_id for node in nodes],
+            x=np.fromiter((node.location['x'] for node in nodes), dtype=float, count=count),
+            y=np.fromiter((node.location['y'] for node in nodes), dtype=float, count=count),
+            coverage=np.fromiter((node.coverage for node in nodes), dtype=float, count=count),
+            load=loads,
+            available_mb=np.fromiter((self._estimate_available_memory_mb(node) for node in nodes), dtype=float, count=count),
+            warm_probability=np.fromiter((self._estimate_warm_probability(node) for node in nodes), dtype=float, count=count),
+        )
+
+    def reassign_users_batch(self, user_ids: Optional[List[str]] = None) -> int:
+        """
+        Vectorized equivalent of maybe_reassign_user for all online strategies.
+        Builds users x nodes score matrices per chunk from the user store columns, applies
+        coverage/memory, dwell-time and improvement-threshold rules as masks, and only
+        touches the users that hand off. Returns the number of handoffs.
+        """
+        predictive = self.strategy == SchedulingStrategy.PREDICTIVE
+        names = PREDICTIVE_SCAN_COLUMNS if predictive else DISTANCE_SCAN_COLUMNS
+        ids, columns, node_codes = self.user_nodes.gather(names, user_ids)
+        if not ids:
+            return 0
+
+        now = time.time()
+        nodes = self._edge_node_arrays()
+        code_names = [name or 'central_node' for name in self.user_nodes.node_names()]
+        scan_chunk = self._scan_predictive_chunk if predictive else self._scan_distance_chunk
+        if predictive:
+            # Predict every user's next location in one batch rather than per chunk/user
+            columns['px'], columns['py'] = self._predicted_locations(ids, columns['x'], columns['y'])
+
+        handoffs = 0
+        chunk_size = max(1, int(self.batch_chunk_size))
+        for start in range(0, len(ids), chunk_size):
+            stop = min(start + chunk_size, len(ids))
+            chunk = {name: column[start:stop] for name, column in columns.items()}
+            handoffs += scan_chunk(ids[start:stop], chunk, node_codes[start:stop], code_names, nodes, now)
+        return handoffs
+
+    def _scan_distance_chunk(self, ids: List[str], columns: Dict[str, np.ndarray], codes: np.ndarray,
+                             code_names: List[str], nodes: NodeArrays, now: float) -> int:
+        """Distance / load-aware rule (GEOGRAPHIC, LEAST_LOADED, ROUND_ROBIN, GAP_BASELINE)."""
+        count = len(ids)
+        load_aware = self.strategy == SchedulingStrategy.LEAST_LOADED
+        node_factor_sq = np.square(1.0 + self.load_aware_alpha * nodes.load)
+        node_cov_sq = np.square(nodes.coverage)
+        central_factor = 1.0 + self.load_aware_alpha * 0.5 if load_aware else 1.0
+        # Column 0 is the central node, edge node j lives in column j + 1
+        column_ids = ['central_node'] + nodes.node_ids
+        column_of = {node_id: j for j, node_id in enumerate(column_ids)}
+        current_col = np.array([column_of.get(name, -1) for name in code_names], dtype=np.int64)[codes]
+
+        ux, uy = columns['x'], columns['y']
+        central_dist = np.hypot(ux - self.central_node["location"]["x"], uy - self.central_node["location"]["y"])
+        central_score = central_dist * central_factor
+
+        # Work on squared distances/scores: same argmin, no sqrt over the full matrix
+        dist_sq = ux[:, None] - nodes.x[None, :]
+        np.square(dist_sq, out=dist_sq)
+        dist_sq += np.square(uy[:, None] - nodes.y[None, :])
+        score_sq = dist_sq * node_factor_sq[None, :] if load_aware else dist_sq.copy()
+
+        # Current node is scored without the coverage check; unknown ids score as central
+        rows = np.arange(count)
+        on_edge = current_col > 0
+        current_score = central_score.copy()
+        current_score[on_edge] = np.sqrt(score_sq[rows[on_edge], current_col[on_edge] - 1])
+
+        score_sq[dist_sq > node_cov_sq[None, :]] = np.inf
+        if nodes.node_ids:
+            best_edge = np.argmin(score_sq, axis=1)
+            best_edge_score = np.sqrt(score_sq[rows, best_edge])
+            # Central wins ties, as in the per-user scan
+            use_edge = best_edge_score < central_score
+            best_col = np.where(use_edge, best_edge + 1, 0)
+            best_score = np.where(use_edge, best_edge_score, central_score)
+        else:
+            best_col = np.zeros(count, dtype=np.int64)
+            best_score = central_score
+
+        improved = (current_score - best_score) / np.maximum(current_score, 1e-6)
+        movable = (now - columns['last_handoff'] >= self.handoff_min_dwell_seconds) & (central_dist <= 1e9)
+        moves = movable & (best_col != current_col) & (improved > self.handoff_improvement_threshold)
+
+        handoffs = 0
+        for i in np.flatnonzero(moves):
+            user_id = ids[i]
+            if user_id not in self.user_nodes:
+                continue  # removed while scanning
+            user = self.user_nodes[user_id]
+            col = int(best_col[i])
+            current_id = code_names[codes[i]]
+            target_id = column_ids[col]
+            dist_px = central_dist[i] if col == 0 else np.sqrt(dist_sq[i, col - 1])
+            user.assigned_node_id = target_id
+            user.latency.distance = float(dist_px) * Config.DEFAULT_PIXEL_TO_METERS
+            user.last_handoff = now
+            self._record_handoff(now, user_id, current_id, target_id, float(improved[i]))
+            self.logger.info(f"User {user_id} handoff: {current_id} -> {target_id} (improvement={improved[i]:.2f})")
+            handoffs += 1
+        return handoffs
+
+    def _predicted_locations(self, ids: List[str], ux: np.ndarray, uy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Next-location estimate per user for the PREDICTIVE strategy (current location if unavailable).
+        Predictions are cached per user and only recomputed after a new location sample
+        or a model change, so the cost follows the update rate rather than the scan rate.
+        """
+        predictor = self.trajectory_predictor
+        if predictor is None:
+            return ux, uy
+        px, py = ux.copy(), uy.copy()
+        position = {user_id: i for i, user_id in enumerate(ids)}
+        version = self._prediction_cache_version(predictor)
+        if version is None:
+            miss_ids, seqs = ids, None
+        else:
+            cached_ids, seqs, hit, cached = self.user_nodes.cached_predictions(ids, version)
+            rows = np.fromiter((position[user_id] for user_id in cached_ids), dtype=np.int64, count=len(cached_ids))
+            px[rows[hit]], py[rows[hit]] = cached[hit, 0], cached[hit, 1]
+            miss_ids = [cached_ids[k] for k in np.flatnonzero(~hit)]
+            seqs = seqs[~hit]
+            self.prediction_cache_stats['hits'] += int(hit.sum())
+            self.prediction_cache_stats['misses'] += len(miss_ids)
+        if not miss_ids:
+            return px, py
+
+        # One history gather and one forward pass for the users without a valid prediction
+        history_ids, windows, counts = self.user_nodes.history_windows(user_ids=miss_ids)
+        try:
+            if hasattr(predictor, 'predict_batch'):
+                predicted = predictor.predict_batch(history_ids, windows, counts)
+            else:
+                predicted = {
+                    history_ids[k]: predictor.predict_next(windows[k, -counts[k]:])
+                    for k in np.flatnonzero(counts)
+                }
+        except Exception:
+            return px, py
+        for user_id, location in predicted.items():
+            i = position.get(user_id)
+            if i is not None:
+                px[i], py[i] = location
+        if version is not None and predicted:
+            seq_of = dict(zip(miss_ids, seqs.tolist()))
+            predicted_ids = [user_id for user_id in predicted if user_id in seq_of]
+            self.user_nodes.store_predictions(
+                predicted_ids,
+                np.fromiter((seq_of[user_id] for user_id in predicted_ids), dtype=np.int64, count=len(predicted_ids)),
+                np.array([predicted[user_id] for user_id in predicted_ids], dtype=float).reshape(-1, 2),
+                version,
+            )
+        return px, py
+
+    def _prediction_cache_version(self, predictor) -> Optional[int]:
+        """Cache key part for the current predictor's model, or None when caching is off."""
+        if not self.prediction_cache_enabled:
+            return None
+        version = getattr(predictor, 'model_version', None)
+        if version is None:
+            return None  # injected predictor without a version: always recompute
+        if predictor is not self._prediction_cache_owner:
+            # Predictions of a replaced predictor must not be served
+            self.user_nodes.invalidate_predictions()
+            self._prediction_cache_owner = predictor
+        return int(version)
+
+    def _forecast_trajectories(self, ids: List[str], ux: np.ndarray, uy: np.ndarray,
+                               steps: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k-step forecasts (users, steps, 2) and seconds per step (users,) in one batch.
+        Users the predictor cannot forecast are assumed to stay where they are.
+        """
+        default_step = float(getattr(Config, 'TRAJECTORY_STEP_SECONDS', 1.0))
+        forecasts = np.repeat(np.stack([ux, uy], axis=1)[:, None, :], steps, axis=1)
+        step_seconds = np.full(len(ids), default_step)
+        forecast_batch = getattr(self.trajectory_predictor, 'forecast_batch', None)
+        if forecast_batch is None or not len(ids) or not steps:
+            return forecasts, step_seconds
+        history_ids, windows, counts = self.user_nodes.history_windows(user_ids=ids)
+        try:
+            predicted, predicted_step = forecast_batch(history_ids, windows, counts, steps)
+        except Exception as e:
+            self.logger.debug(f"Trajectory forecast failed: {e}")
+            return forecasts, step_seconds
+        # Users removed since the gather are missing from history_ids
+        position = {user_id: i for i, user_id in enumerate(ids)}
+        rows = np.fromiter((position[user_id] for user_id in history_ids), dtype=np.int64, count=len(history_ids))
+        valid = ~np.isnan(predicted).any(axis=(1, 2))
+        forecasts[rows[valid]] = predicted[valid]
+        step_seconds[rows[valid]] = predicted_step[valid]
+        return forecasts, step_seconds
+
+    def forecast_coverage_entry(self, user_ids: Optional[List[str]] = None, horizon_seconds: Optional[float] = None,
+                                steps: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Expected time until each user enters each edge node's coverage, from batched
+        k-step trajectory forecasts (resolution: one forecast step). Per user: entry
+        seconds per node reached within the horizon (0.0 = already covered) and when
+        the user leaves its current edge node's coverage (None if it stays covered).
+        """
+        horizon = float(getattr(Config, 'TRAJECTORY_FORECAST_HORIZON_SECONDS', 30.0) if horizon_seconds is None
+                        else horizon_seconds)
+        steps = max(1, int(getattr(Config, 'TRAJECTORY_FORECAST_STEPS', 30) if steps is None else steps))
+        ids, columns, codes = self.user_nodes.gather(('x', 'y'), user_ids)
+        result: Dict[str, Any] = {'horizon_seconds': horizon, 'steps': steps, 'users': {}}
+        if not ids:
+            return result
+
+        ux, uy = columns['x'], columns['y']
+        forecasts, step_seconds = self._forecast_trajectories(ids, ux, uy, steps)
+        nodes = self._edge_node_arrays()
+        code_names = [name or 'central_node' for name in self.user_nodes.node_names()]
+        column_of = {node_id: j for j, node_id in enumerate(nodes.node_ids)}
+        current_col = np.array([column_of.get(name, -1) for name in code_names], dtype=np.int64)[codes]
+        cov_sq = np.square(nodes.coverage)
+        ahead = np.arange(steps + 1, dtype=float)
+
+        users = result['users']
+        chunk_size = max(1, int(self.batch_chunk_size))
+        for start in range(0, len(ids), chunk_size):
+            stop = min(start + chunk_size, len(ids))
+            # Step 0 is the current position
+            px = np.concatenate([ux[start:stop, None], forecasts[start:stop, :, 0]], axis=1)
+            py = np.concatenate([uy[start:stop, None], forecasts[start:stop, :, 1]], axis=1)
+            times = step_seconds[start:stop, None] * ahead[None, :]
+            within = times <= horizon
+            # Only (user, node) pairs whose coverage reaches the trajectory's bounding box
+            # are checked step by step
+            gap_x = np.maximum(np.maximum(nodes.x - px.max(axis=1)[:, None], px.min(axis=1)[:, None] - nodes.x), 0.0)
+            gap_y = np.maximum(np.maximum(nodes.y - py.max(axis=1)[:, None], py.min(axis=1)[:, None] - nodes.y), 0.0)
+            pair_rows, pair_cols = np.nonzero(np.square(gap_x) + np.square(gap_y) <= cov_sq)
+            inside = (np.square(px[pair_rows] - nodes.x[pair_cols, None]) + np.square(py[pair_rows] - nodes.y[pair_cols, None])
+                      <= cov_sq[pair_cols, None]) & within[pair_rows]  # (pairs, steps + 1)
+            entered = inside.any(axis=1)
+            user_rows, entered_cols = pair_rows[entered], pair_cols[entered]
+            entry_times = times[user_rows, inside[entered].argmax(axis=1)].tolist()
+
+            current = current_col[start:stop]
+            on_edge = np.flatnonzero(current >= 0)
+            node_cols = current[on_edge]
+            leaving = (np.square(px[on_edge] - nodes.x[node_cols, None]) + np.square(py[on_edge] - nodes.y[node_cols, None])
+                       > cov_sq[node_cols, None]) & within[on_edge]
+            left = leaving.any(axis=1)
+            exit_seconds = dict(zip(on_edge[left].tolist(), times[on_edge[left], leaving[left].argmax(axis=1)].tolist()))
+
+            entries: List[Dict[str, float]] = [{} for _ in range(stop - start)]
+            for i, j, seconds in zip(user_rows.tolist(), entered_cols.tolist(), entry_times):
+                entries[i][nodes.node_ids[j]] = seconds
+            for i, user_entries in enumerate(entries):
+                users[ids[start + i]] = {
+                    'assigned_node_id': code_names[codes[start + i]],
+                    'step_seconds': float(step_seconds[start + i]),
+                    'entries': user_entries,
+                    'exit_seconds': exit_seconds.get(i),
+                }
+        return result
+
+    def _scan_predictive_chunk(self, ids: List[str], columns: Dict[str, np.ndarray], codes: np.ndarray,
+                               code_names: List[str], nodes: NodeArrays, now: float) -> int:
+        """
+        PREDICTIVE rule: expected latency, utility, CPU penalty, memory feasibility and
+        handoff penalty for every (user, node) pair in one pass.
+        Mirrors _predictive_candidate_scores / maybe_reassign_user.
+        """
+        count = len(ids)
+        node_count = len(nodes.node_ids)
+        # Edge node j lives in column j, the central node in the last column
+        # (same tie order as the stable sort in the per-user path)
+        column_ids = nodes.node_ids + ['central_node']
+        column_of = {node_id: j for j, node_id in enumerate(column_ids)}
+        current_col = np.array([column_of.get(name, -1) for name in code_names], dtype=np.int64)[codes]
+
+        default_data_size = getattr(Config, 'PREDICTIVE_DEFAULT_DATA_SIZE_BYTES', 512 * 1024)
+        data_size = np.where(columns['data_size'] == 0, default_data_size, columns['data_size'])
+        bandwidth = np.where(columns['bandwidth'] == 0, 500.0, columns['bandwidth'])
+        base_proc = np.where(columns['computation_delay'] <= 0, data_size / 1024.0, columns['computation_delay'])
+        required_mb = columns['memory_requirement'] / (1024 * 1024)
+
+        col_x = np.append(nodes.x, self.central_node["location"]["x"])
+        col_y = np.append(nodes.y, self.central_node["location"]["y"])
+        col_cpu = np.append(nodes.load, 0.0)
+        col_bw_factor = np.append(np.maximum(0.1, 1.0 - 0.5 * nodes.load), 1.0)
+        col_warm = np.append(nodes.warm_probability, getattr(Config, 'PREDICTIVE_WARM_BASE_PROB', 0.2))
+        col_available = np.append(nodes.available_mb, np.inf)
+        cold_penalty = getattr(Config, 'PREDICTIVE_COLD_START_MS', 300)
+        propagation_speed = max(getattr(Config, 'DEFAULT_PROPAGATION_SPEED_IN_METERS', 3 * 10**8), 1)
+
+        px, py = columns['px'], columns['py']
+        rows = np.arange(count)
+        has_current = current_col >= 0
+
+        # Matrices are built in place to keep the number of users x nodes temporaries low
+        propagation = px[:, None] - col_x[None, :]
+        np.square(propagation, out=propagation)
+        propagation += np.square(py[:, None] - col_y[None, :])
+        np.sqrt(propagation, out=propagation)
+        propagation *= Config.DEFAULT_PIXEL_TO_METERS * 1000.0 / propagation_speed
+        transmission = bandwidth[:, None] * col_bw_factor[None, :]
+        np.maximum(transmission, 1.0, out=transmission)
+        np.divide(data_size[:, None], transmission, out=transmission)
+        # warm * base + (1 - warm) * (cold + base) == base + (1 - warm) * cold
+        processing_node = (1.0 - col_warm) * cold_penalty
+        total = propagation + transmission
+        total += base_proc[:, None]
+        total += processing_node[None, :]
+
+        cloud_latency = total[:, node_count].copy()
+        utility = cloud_latency[:, None] - total
+        cpu_penalty = self.load_aware_alpha * col_cpu
+        cpu_penalty[node_count] = 0.0
+        scores = utility / np.maximum(required_mb, 1.0)[:, None]
+        scores -= cpu_penalty[None, :] + self.handoff_penalty
+        scores[rows[has_current], current_col[has_current]] += self.handoff_penalty
+        if np.any(col_available < required_mb.max() - 1e-6):
+            infeasible = col_available[None, :] < required_mb[:, None] - 1e-6
+            infeasible[rows[has_current], current_col[has_current]] = False
+            scores[infeasible] = -np.inf
+
+        best_col = np.argmax(scores, axis=1)
+        best_score = scores[rows, best_col]
+        # Unknown current node is scored like the central node without handoff penalty (utility 0)
+        current_score = np.where(has_current, scores[rows, np.maximum(current_col, 0)], 0.0)
+        relative = (best_score - current_score) / np.maximum(np.abs(current_score), 1e-6)
+        movable = now - columns['last_handoff'] >= self.handoff_min_dwell_seconds
+        moves = movable & (best_col != current_col) & (relative > self.handoff_improvement_threshold)
+
+        handoffs = 0
+        for i in np.flatnonzero(moves):
+            user_id = ids[i]
+            if user_id not in self.user_nodes:
+                continue  # removed while scanning
+            user = self.user_nodes[user_id]
+            col = int(best_col[i])
+            current_id = code_names[codes[i]]
+            target_id = column_ids[col]
+            warm = float(col_warm[col])
+            dist_px = np.hypot(columns['x'][i] - col_x[col], columns['y'][i] - col_y[col])
+            user.assigned_node_id = target_id
+            user.latency.distance = float(dist_px) * Config.DEFAULT_PIXEL_TO_METERS
+            user.latency.total_turnaround_time = float(total[i, col])
+            user.latency.computation_delay = float(base_proc[i] + processing_node[col])
+            user.latency.transmission_delay = float(transmission[i, col])
+            user.latency.container_status = 'warm' if warm > 0.5 else 'cold'
+            user.predictive_debug = PredictiveDebugRecord(
+                node_id=target_id,
+                node_type='central' if col == node_count else 'edge',
+                score=float(best_score[i]),
+                utility=float(utility[i, col]),
+                latency=float(total[i, col]),
+                memory_required_mb=float(required_mb[i]),
+                memory_available_mb=float(col_available[col]),
+                cpu_penalty=float(cpu_penalty[col]),
+                handoff_penalty=float(self.handoff_penalty),
+                propagation_delay=float(propagation[i, col]),
+                transmission_delay=float(transmission[i, col]),
+                processing_delay=float(base_proc[i] + processing_node[col]),
+                warm_probability=warm,
+                distance_meters=float(propagation[i, col] * propagation_speed / 1000.0),
+                cloud_latency=float(cloud_latency[i]),
+            )
+            user.last_handoff = now
+            self._record_handoff(now, user_id, current_id, target_id, float(relative[i]))
+            self.logger.info(
+                f"User {user_id} predictive handoff: {current_id} -> {target_id} (relative_gain={relative[i]:.2f})"
+            )
+            handoffs += 1
+        return handoffs
@@ -0,0 +1,153 @@
+"""
+Spatial index for edge node coverage lookups.
+Uniform grid over the simulation plane where every edge node is registered in
+each cell its coverage disc overlaps, so "which nodes cover this point" only
+touches the nodes listed in a single cell instead of the whole cluster.
+"""
+
+import logging
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+
+class EdgeNodeSpatialIndex:
+    """
+    Coverage-aware uniform grid index.
+
+    A node with location (x, y) and coverage radius r is stored in every grid
+    cell intersecting its coverage disc. Any node able to serve a point is
+    therefore listed in that point's cell; the exact distance check is then
+    done against that short candidate list only.
+
+    Nodes whose disc spans more than `max_cells_per_node` cells are kept in an
+    overflow list that is checked on every query, which bounds memory for
+    pathological coverage values without losing correctness.
+    """
+
+    def __init__(self, cell_size: float = 150.0, max_cells_per_node: int = 4096):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = float(cell_size)
+        self.max_cells_per_node = max_cells_per_node
+        self.logger = logging.getLogger(__name__)
+
+        self._cells: Dict[Cell, Dict[str, None]] = {}
+        self._node_cells: Dict[str, List[Cell]] = {}
+        self._node_geometry: Dict[str, Tuple[float, float, float]] = {}
+        self._oversized: Dict[str, None] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._node_geometry)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._node_geometry
+
+    def geometry(self, node_id: str) -> Optional[Tuple[float, float, float]]:
+        """Indexed (x, y, coverage) of a node, or None if it is not indexed."""
+        return self._node_geometry.get(node_id)
+
+    def _cell_of(self, x: float, y: float) -> Cell:
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def _cells_for_disc(self, x: float, y: float, radius: float) -> Optional[List[Cell]]:
+        """Cells intersecting the disc, or None if the disc is too large to grid."""
+        radius = max(0.0, radius)
+        cx_min, cy_min = self._cell_of(x - radius, y - radius)
+        cx_max, cy_max = self._cell_of(x + radius, y + radius)
+        if (cx_max - cx_min + 1) * (cy_max - cy_min + 1) > self.max_cells_per_node:
+            return None
+
+        size = self.cell_size
+        r2 = radius * radius
+        cells = []
+        for cx in range(cx_min, cx_max + 1):
+            # Closest point of the cell column to the disc centre
+            left, right = cx * size, (cx + 1) * size
+            dx = left - x if x < left else (x - right if x > right else 0.0)
+            for cy in range(cy_min, cy_max + 1):
+                bottom, top = cy * size, (cy + 1) * size
+                dy = bottom - y if y < bottom else (y - top if y > top else 0.0)
+                if dx * dx + dy * dy <= r2:
+                    cells.append((cx, cy))
+        return cells
+
+    def _remove_unlocked(self, node_id: str):
+        for cell in self._node_cells.pop(node_id, []):
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                continue
+            bucket.pop(node_id, None)
+            if not bucket:
+                del self._cells[cell]
+        self._oversized.pop(node_id, None)
+        self._node_geometry.pop(node_id, None)
+
+    def _insert_unlocked(self, node_id: str, x: float, y: float, coverage: float):
+        cells = self._cells_for_disc(x, y, coverage)
+        self._node_geometry[node_id] = (x, y, coverage)
+        if cells is None:
+            self._oversized[node_id] = None
+            self._node_cells[node_id] = []
+            self.logger.debug(f"Edge node {node_id} coverage {coverage} kept in overflow list")
+            return
+        for cell in cells:
+            self._cells.setdefault(cell, {})[node_id] = None
+        self._node_cells[node_id] = cells
+
+    def insert(self, node_id: str, location: Dict[str, float], coverage: float):
+        """Add or replace a node in the index."""
+        x, y = float(location["x"]), float(location["y"])
+        with self._lock:
+            self._remove_unlocked(node_id)
+            self._insert_unlocked(node_id, x, y, float(coverage))
+
+    def update(self, node_id: str, location: Dict[str, float], coverage: float) -> bool:
+        """Re-index a node if its location or coverage changed. Returns True if it moved."""
+        geometry = (float(location["x"]), float(location["y"]), float(coverage))
+        with self._lock:
+            if self._node_geometry.get(node_id) == geometry:
+                return False
+            self._remove_unlocked(node_id)
+            self._insert_unlocked(node_id, *geometry)
+        return True
+
+    def remove(self, node_id: str):
+        with self._lock:
+            self._remove_unlocked(node_id)
+
+    def clear(self):
+        with self._lock:
+            self._cells.clear()
+            self._node_cells.clear()
+            self._node_geometry.clear()
+            self._oversized.clear()
+
+    def covering(self, location: Dict[str, float]) -> List[Tuple[str, float]]:
+        """
+        Return (node_id, distance) for every node whose coverage contains the point.
+        Distances are in pixels, same unit as node coverage.
+        """
+        x, y = location["x"], location["y"]
+        result = []
+        with self._lock:
+            candidates = list(self._cells.get(self._cell_of(x, y), ()))
+            candidates.extend(self._oversized)
+            geometry = self._node_geometry
+            for node_id in candidates:
+                nx, ny, coverage = geometry[node_id]
+                distance = ((x - nx) ** 2 + (y - ny) ** 2) ** 0.5
+                if distance <= coverage:
+                    result.append((node_id, distance))
+        return result
+
+    def nearest_covering(self, location: Dict[str, float]) -> Tuple[Optional[str], float]:
+        """Nearest node whose coverage contains the point, or (None, inf)."""
+        best_id, best_distance = None, float('inf')
+        for node_id, distance in self.covering(location):
+            if distance < best_distance:
+                best_id, best_distance = node_id, distance
+        return best_id, best_distance
@@ -0,0 +1,848 @@
+"""
+Columnar user registry for the scheduler.
+Per-user state lives in contiguous NumPy columns (struct-of-arrays) indexed by a
+user_id -> row map, so scans can work on whole arrays. Controllers keep using
+the dict-like API and get lightweight UserNodeInfo-compatible views back.
+Readers that need a consistent picture of every user take a versioned,
+immutable UserStoreSnapshot instead of iterating the live store.
+Recent positions per user are kept in fixed-length ring buffers inside one
+(users x window x 2) array, so trajectory predictors can read every user's
+window without building per-user lists. Each user's last prediction is cached
+next to its history and reused until a new sample arrives.
+"""
+
+import threading
+import time
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+
+# Latency fields stored as float columns (in Latency dataclass order)
+LATENCY_COLUMNS = (
+    'distance',
+    'data_size',
+    'bandwidth',
+    'propagation_delay',
+    'transmission_delay',
+    'computation_delay',
+    'total_turnaround_time',
+)
+
+# User fields stored as float columns
+USER_COLUMNS = (
+    'x',
+    'y',
+    'size',
+    'speed',
+    'last_executed',
+    'created_at',
+    'last_updated',
+    'last_handoff',
+    'memory_requirement',
+)
+
+FLOAT_COLUMNS = USER_COLUMNS + LATENCY_COLUMNS
+
+# Non-float bookkeeping columns: interned node/status codes and the scan dirty flag
+CODE_COLUMNS = {
+    'node_code': np.int32,
+    'status_code': np.int16,
+    'dirty': np.bool_,
+}
+
+# Per-user trajectory ring buffers. 'history' is (rows, 2 * window, 2): every sample
+# is written twice (slot head and head + window), so the last `window` samples are
+# always the contiguous slice [head, head + window), oldest first.
+HISTORY_COLUMNS = {
+    'history_head': np.int32,
+    'history_len': np.int32,
+    'history_seq': np.int64,  # store-wide sample counter at the user's latest sample
+}
+
+# Memoized next-location prediction per user: valid while 'prediction_seq' equals
+# 'history_seq' and 'prediction_version' equals the predictor's model version
+PREDICTION_COLUMNS = {
+    'prediction_seq': np.int64,
+    'prediction_version': np.int64,
+}
+
+# Columns copied into snapshots
+SNAPSHOT_COLUMNS = FLOAT_COLUMNS + ('node_code', 'status_code')
+
+# Writes to these columns change a user's assignment score and mark the user dirty.
+# Predictive scoring reads them all; the distance strategies only read the position.
+SCORE_INPUT_COLUMNS = frozenset({
+    'x', 'y', 'data_size', 'bandwidth', 'computation_delay', 'memory_requirement',
+})
+DISTANCE_SCORE_INPUT_COLUMNS = frozenset({'x', 'y'})
+
+
+def _column_property(name: str, doc: Optional[str] = None):
+    def getter(self):
+        return self._store._read(self._user_id, name)
+
+    def setter(self, value):
+        self._store._write(self._user_id, name, value)
+
+    return property(getter, setter, doc=doc)
+
+
+class LatencyView:
+    """Latency-compatible view over one user's latency columns."""
+
+    __slots__ = ('_store', '_user_id')
+
+    def __init__(self, store: 'UserStore', user_id: str):
+        self._store = store
+        self._user_id = user_id
+
+    distance = _column_property('distance')
+    data_size = _column_property('data_size')
+    bandwidth = _column_property('bandwidth')
+    propagation_delay = _column_property('propagation_delay')
+    transmission_delay = _column_property('transmission_delay')
+    computation_delay = _column_property('computation_delay')
+    total_turnaround_time = _column_property('total_turnaround_time')
+
+    @property
+    def container_status(self) -> str:
+        return self._store._read_status(self._user_id)
+
+    @container_status.setter
+    def container_status(self, value: str):
+        self._store._write_status(self._user_id, value)
+
+    def snapshot(self):
+        """Detached Latency dataclass copy (JSON serializable)."""
+        from central_node.control_layer.scheduler_module.scheduler import Latency
+        return Latency(**self._store._latency_fields(self._user_id))
+
+
+class UserNodeView:
+    """UserNodeInfo-compatible view over one row of the user store."""
+
+    __slots__ = ('_store', '_user_id')
+
+    def __init__(self, store: 'UserStore', user_id: str):
+        self._store = store
+        self._user_id = user_id
+
+    @property
+    def user_id(self) -> str:
+        return self._user_id
+
+    @property
+    def assigned_node_id(self) -> str:
+        return self._store._read_assigned(self._user_id)
+
+    @assigned_node_id.setter
+    def assigned_node_id(self, value: str):
+        self._store._write_assigned(self._user_id, value)
+
+    @property
+    def location(self) -> Dict[str, float]:
+        return self._store._read_location(self._user_id)
+
+    @location.setter
+    def location(self, value: Dict[str, float]):
+        self._store._write_location(self._user_id, value)
+
+    @property
+    def latency(self) -> LatencyView:
+        return LatencyView(self._store, self._user_id)
+
+    @latency.setter
+    def latency(self, value):
+        self._store._write_latency(self._user_id, value)
+
+    @property
+    def predictive_debug(self) -> Optional[Dict[str, Any]]:
+        debug = self._store._debug.get(self._user_id)
+        if debug is not None and not isinstance(debug, dict):
+            # Compact record from the batched scan: expand on first read
+            debug = debug.to_dict()
+            self._store._debug[self._user_id] = debug
+        return debug
+
+    @predictive_debug.setter
+    def predictive_debug(self, value: Optional[Dict[str, Any]]):
+        self._store._debug[self._user_id] = value
+
+    size = _column_property('size')
+    speed = _column_property('speed')
+    last_executed = _column_property('last_executed')
+    created_at = _column_property('created_at')
+    last_updated = _column_property('last_updated')
+    last_handoff = _column_property('last_handoff')
+    memory_requirement = _column_property('memory_requirement')
+
+    def snapshot(self):
+        """Detached UserNodeInfo dataclass copy."""
+        from central_node.control_layer.scheduler_module.scheduler import UserNodeInfo
+        return self._store._snapshot_user(self._user_id, UserNodeInfo)
+
+    def __repr__(self) -> str:
+        return f"UserNodeView(user_id={self._user_id!r})"
+
+
+class UserStoreSnapshot:
+    """
+    Immutable point-in-time copy of the user store.
+
+    Holds read-only column copies plus the id and interning tables as they were
+    at `version`, so it can be iterated freely while writers keep going.
+    """
+
+    __slots__ = ('version', 'user_ids', 'columns', '_node_names', '_status_names', '_index')
+
+    def __init__(self, version: int, user_ids: Tuple[str, ...], columns: Dict[str, np.ndarray],
+                 node_names: Tuple[str, ...], status_names: Tuple[str, ...]):
+        self.version = version
+        self.user_ids = user_ids
+        self.columns = columns
+        self._node_names = node_names
+        self._status_names = status_names
+        self._index: Optional[Dict[str, int]] = None
+        for column in columns.values():
+            column.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def __contains__(self, user_id) -> bool:
+        return user_id in self._row_index()
+
+    def _row_index(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {user_id: row for row, user_id in enumerate(self.user_ids)}
+        return self._index
+
+    def assigned_node_ids(self) -> List[str]:
+        """Assigned node id per row ('' if unassigned)."""
+        names = self._node_names
+        return [names[code] for code in self.columns['node_code'].tolist()]
+
+    def get(self, user_id: str):
+        """Detached UserNodeInfo for one user, or None."""
+        row = self._row_index().get(user_id)
+        return None if row is None else self._user_at(row)
+
+    def __iter__(self):
+        """Detached UserNodeInfo per user, in row order."""
+        from central_node.control_layer.scheduler_module.scheduler import Latency, UserNodeInfo
+        # Convert columns once instead of boxing scalars per field
+        values = {name: column.tolist() for name, column in self.columns.items()}
+        node_names, status_names = self._node_names, self._status_names
+        for row, user_id in enumerate(self.user_ids):
+            latency = {name: values[name][row] for name in LATENCY_COLUMNS}
+            latency['container_status'] = status_names[values['status_code'][row]]
+            yield UserNodeInfo(
+                user_id=user_id,
+                assigned_node_id=node_names[values['node_code'][row]],
+                location={'x': values['x'][row], 'y': values['y'][row]},
+                size=values['size'][row],
+                speed=values['speed'][row],
+                last_executed=values['last_executed'][row],
+                latency=Latency(**latency),
+                created_at=values['created_at'][row],
+                last_updated=values['last_updated'][row],
+                memory_requirement=values['memory_requirement'][row],
+                last_handoff=values['last_handoff'][row],
+            )
+
+    def _user_at(self, row: int):
+        from central_node.control_layer.scheduler_module.scheduler import Latency, UserNodeInfo
+        columns = self.columns
+        latency = {name: float(columns[name][row]) for name in LATENCY_COLUMNS}
+        latency['container_status'] = self._status_names[columns['status_code'][row]]
+        return UserNodeInfo(
+            user_id=self.user_ids[row],
+            assigned_node_id=self._node_names[columns['node_code'][row]],
+            location={'x': float(columns['x'][row]), 'y': float(columns['y'][row])},
+            size=float(columns['size'][row]),
+            speed=float(columns['speed'][row]),
+            last_executed=float(columns['last_executed'][row]),
+            latency=Latency(**latency),
+            created_at=float(columns['created_at'][row]),
+            last_updated=float(columns['last_updated'][row]),
+            memory_requirement=float(columns['memory_requirement'][row]),
+            last_handoff=float(columns['last_handoff'][row]),
+        )
+
+
+class UserStore(MutableMapping):
+    """
+    Array-backed user registry behind Scheduler.user_nodes.
+
+    Rows [0, len) are always dense: deleting a user moves the last row into the
+    hole, so hot loops can slice columns without masking. Views resolve their
+    row by user_id on every access, which keeps them valid across deletions.
+    Assigned node ids and container statuses are interned to small integer codes.
+
+    Every data write bumps `version`; snapshot() copies the columns at most once
+    per version and hands the same immutable copy to all readers.
+    """
+
+    def __init__(self, capacity: int = 1024, history_window: Optional[int] = None):
+        self._lock = threading.RLock()
+        self._capacity = max(1, int(capacity))
+        if history_window is None:
+            history_window = getattr(Config, 'USER_HISTORY_WINDOW', 10)
+        self._history_window = max(2, int(history_window))
+        self._count = 0
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.zeros(self._capacity, dtype=np.float64) for name in FLOAT_COLUMNS
+        }
+        for name, dtype in CODE_COLUMNS.items():
+            self._columns[name] = np.zeros(self._capacity, dtype=dtype)
+        for name, dtype in HISTORY_COLUMNS.items():
+            self._columns[name] = np.zeros(self._capacity, dtype=dtype)
+        self._columns['history'] = np.zeros((self._capacity, 2 * self._history_window, 2), dtype=np.float64)
+        self._history_seq = 0
+        for name, dtype in PREDICTION_COLUMNS.items():
+            self._columns[name] = np.zeros(self._capacity, dtype=dtype)
+        self._columns['prediction'] = np.zeros((self._capacity, 2), dtype=np.float64)
+        self._node_table: Dict[str, int] = {}
+        self._node_names: List[str] = []
+        self._status_table: Dict[str, int] = {}
+        self._status_names: List[str] = []
+        self._debug: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._version = 0
+        self._snapshot: Optional[UserStoreSnapshot] = None
+        # Columns whose writes mark a user dirty, narrowed by the scheduler per strategy
+        self._score_inputs = SCORE_INPUT_COLUMNS
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    # --- Mapping protocol ---
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, user_id) -> bool:
+        return user_id in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(self._ids[:self._count])
+
+    def __getitem__(self, user_id: str) -> UserNodeView:
+        if user_id not in self._index:
+            raise KeyError(user_id)
+        return UserNodeView(self, user_id)
+
+    def __setitem__(self, user_id: str, user_node):
+        with self._lock:
+            row = self._index.get(user_id)
+            if row is None:
+                row = self._append_row(user_id)
+            self._fill_row(row, user_node)
+            self._version += 1
+
+    def __delitem__(self, user_id: str):
+        with self._lock:
+            row = self._index.pop(user_id)
+            last = self._count - 1
+            if row != last:
+                moved_id = self._ids[last]
+                for column in self._columns.values():
+                    column[row] = column[last]
+                self._ids[row] = moved_id
+                self._index[moved_id] = row
+            self._ids.pop()
+            self._count = last
+            self._debug.pop(user_id, None)
+            self._version += 1
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return self._ids[:self._count]
+
+    def values(self) -> List[UserNodeView]:
+        return [UserNodeView(self, user_id) for user_id in self.keys()]
+
+    def items(self) -> List:
+        return [(user_id, UserNodeView(self, user_id)) for user_id in self.keys()]
+
+    def clear(self):
+        with self._lock:
+            self._count = 0
+            self._index.clear()
+            self._ids.clear()
+            self._debug.clear()
+            self._version += 1
+
+    # --- Row management ---
+    def _grow(self, minimum: int):
+        capacity = self._capacity
+        while capacity < minimum:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[:self._count] = column[:self._count]
+            self._columns[name] = grown
+        self._capacity = capacity
+
+    def _append_row(self, user_id: str) -> int:
+        if self._count >= self._capacity:
+            self._grow(self._count + 1)
+        row = self._count
+        self._count += 1
+        self._index[user_id] = row
+        self._ids.append(user_id)
+        return row
+
+    def _fill_row(self, row: int, user_node):
+        columns = self._columns
+        location = user_node.location or {}
+        columns['x'][row] = location.get('x', 0.0)
+        columns['y'][row] = location.get('y', 0.0)
+        now = time.time()
+        for name in ('size', 'speed', 'last_executed', 'last_handoff'):
+            columns[name][row] = getattr(user_node, name, 0) or 0
+        columns['created_at'][row] = getattr(user_node, 'created_at', None) or now
+        columns['last_updated'][row] = getattr(user_node, 'last_updated', None) or now
+        columns['memory_requirement'][row] = getattr(
+            user_node, 'memory_requirement',
+            Config.PREDICTIVE_DEFAULT_MEMORY_REQUIREMENT_MB * 1024 * 1024
+        )
+        self._columns['node_code'][row] = self.node_code(user_node.assigned_node_id)
+        self._columns['dirty'][row] = True
+        self._fill_latency(row, user_node.latency)
+        # (Re)registering a user starts its trajectory at the current location
+        self._columns['history_head'][row] = 0
+        self._columns['history_len'][row] = 0
+        self._push_history(row, columns['x'][row], columns['y'][row])
+        self._debug[self._ids[row]] = getattr(user_node, 'predictive_debug', None)
+
+    def _fill_latency(self, row: int, latency):
+        for name in LATENCY_COLUMNS:
+            self._columns[name][row] = getattr(latency, name, 0.0) or 0.0
+        self._columns['status_code'][row] = self.status_code(getattr(latency, 'container_status', 'unknown'))
+
+    # --- Interning ---
+    def node_code(self, node_id: Optional[str]) -> int:
+        node_id = node_id or ''
+        code = self._node_table.get(node_id)
+        if code is None:
+            with self._lock:
+                code = self._node_table.get(node_id)
+                if code is None:
+                    code = len(self._node_names)
+                    self._node_names.append(node_id)
+                    self._node_table[node_id] = code
+        return code
+
+    def known_node_code(self, node_id: str) -> Optional[int]:
+        """Code of a node id if any user was ever assigned to it."""
+        return self._node_table.get(node_id)
+
+    def node_name(self, code: int) -> str:
+        return self._node_names[code] if code >= 0 else ''
+
+    def node_names(self) -> List[str]:
+        """Assigned node id for every node code (index = code)."""
+        return list(self._node_names)
+
+    def status_code(self, status: Optional[str]) -> int:
+        status = status or 'unknown'
+        code = self._status_table.get(status)
+        if code is None:
+            with self._lock:
+                code = self._status_table.get(status)
+                if code is None:
+                    code = len(self._status_names)
+                    self._status_names.append(status)
+                    self._status_table[status] = code
+        return code
+
+    # --- Single-user accessors used by the views ---
+    def _row(self, user_id: str) -> int:
+        return self._index[user_id]
+
+    def _read(self, user_id: str, name: str) -> float:
+        with self._lock:
+            return float(self._columns[name][self._index[user_id]])
+
+    def _write(self, user_id: str, name: str, value):
+        with self._lock:
+            row = self._index[user_id]
+            self._columns[name][row] = value
+            self._version += 1
+            if name in self._score_inputs:
+                self._columns['dirty'][row] = True
+
+    def _read_location(self, user_id: str) -> Dict[str, float]:
+        with self._lock:
+            row = self._index[user_id]
+            return {'x': float(self._columns['x'][row]), 'y': float(self._columns['y'][row])}
+
+    def _write_location(self, user_id: str, location: Dict[str, float]):
+        with self._lock:
+            row = self._index[user_id]
+            self._columns['x'][row] = location['x']
+            self._columns['y'][row] = location['y']
+            self._columns['dirty'][row] = True
+            self._version += 1
+
+    def _read_assigned(self, user_id: str) -> str:
+        with self._lock:
+            return self.node_name(int(self._columns['node_code'][self._index[user_id]]))
+
+    def _write_assigned(self, user_id: str, node_id: str):
+        code = self.node_code(node_id)
+        with self._lock:
+            self._columns['node_code'][self._index[user_id]] = code
+            self._version += 1
+
+    def _read_status(self, user_id: str) -> str:
+        with self._lock:
+            return self._status_names[self._columns['status_code'][self._index[user_id]]]
+
+    def _write_status(self, user_id: str, status: str):
+        code = self.status_code(status)
+        with self._lock:
+            self._columns['status_code'][self._index[user_id]] = code
+            self._version += 1
+
+    def _write_latency(self, user_id: str, latency):
+        with self._lock:
+            row = self._index[user_id]
+            self._fill_latency(row, latency)
+            if not self._score_inputs.isdisjoint(LATENCY_COLUMNS):
+                self._columns['dirty'][row] = True
+            self._version += 1
+
+    def _latency_fields(self, user_id: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._index[user_id]
+            fields = {name: float(self._columns[name][row]) for name in LATENCY_COLUMNS}
+            fields['container_status'] = self._status_names[self._columns['status_code'][row]]
+            return fields
+
+    def _snapshot_user(self, user_id: str, user_cls):
+        from central_node.control_layer.scheduler_module.scheduler import Latency
+        with self._lock:
+            row = self._index[user_id]
+            columns = self._columns
+            return user_cls(
+                user_id=user_id,
+                assigned_node_id=self.node_name(int(self._columns['node_code'][row])),
+                location={'x': float(columns['x'][row]), 'y': float(columns['y'][row])},
+                size=float(columns['size'][row]),
+                speed=float(columns['speed'][row]),
+                last_executed=float(columns['last_executed'][row]),
+                latency=Latency(**self._latency_fields(user_id)),
+                created_at=float(columns['created_at'][row]),
+                last_updated=float(columns['last_updated'][row]),
+                memory_requirement=float(columns['memory_requirement'][row]),
+                last_handoff=float(columns['last_handoff'][row]),
+                predictive_debug=UserNodeView(self, user_id).predictive_debug,
+            )
+
+    # --- Bulk access for vectorized scans ---
+    @property
+    def lock(self) -> threading.RLock:
+        """Hold while reading columns and writing back rows so rows do not move underneath."""
+        return self._lock
+
+    def column(self, name: str) -> np.ndarray:
+        """Live view of a float column over the active rows (invalidated by inserts/deletes)."""
+        return self._columns[name][:self._count]
+
+    def node_codes(self) -> np.ndarray:
+        """Live view of the assigned node code per active row."""
+        return self._columns['node_code'][:self._count]
+
+    def gather(self, names, user_ids: Optional[List[str]] = None):
+        """
+        Consistent copy of the requested columns for all users (or the given ids).
+        Returns (user_ids, {name: array}, node_codes).
+        """
+        with self._lock:
+            if user_ids is None:
+                ids = self._ids[:self._count]
+                data = {name: self._columns[name][:self._count].copy() for name in names}
+                codes = self._columns['node_code'][:self._count].copy()
+            else:
+                ids = [user_id for user_id in user_ids if user_id in self._index]
+                rows = np.fromiter((self._index[user_id] for user_id in ids), dtype=np.int64, count=len(ids))
+                data = {name: self._columns[name][rows] for name in names}
+                codes = self._columns['node_code'][rows]
+        return ids, data, codes
+
+    def row_of(self, user_id: str) -> Optional[int]:
+        return self._index.get(user_id)
+
+    def user_id_at(self, row: int) -> str:
+        return self._ids[row]
+
+    def set_assigned_row(self, row: int, node_id: str):
+        code = self.node_code(node_id)
+        with self._lock:
+            self._columns['node_code'][row] = code
+            self._version += 1
+
+    def record_execution(self, user_id: str, computation_delay: float, container_status: str,
+                         executed_at: float) -> bool:
+        """Store a function execution result; False if the user was removed meanwhile."""
+        code = self.status_code(container_status)
+        with self._lock:
+            row = self._index.get(user_id)
+            if row is None:
+                return False
+            self._columns['computation_delay'][row] = computation_delay
+            self._columns['status_code'][row] = code
+            self._columns['last_executed'][row] = executed_at
+            if 'computation_delay' in self._score_inputs:
+                self._columns['dirty'][row] = True
+            self._version += 1
+            return True
+
+    # --- Bulk writes ---
+    def rows_of(self, user_ids: List[str]) -> np.ndarray:
+        """Row of every user id, -1 for ids not in the store."""
+        index = self._index
+        return np.fromiter((index.get(user_id, -1) for user_id in user_ids), dtype=np.int64, count=len(user_ids))
+
+    def insert_rows(self, user_ids: List[str], values: Dict[str, Any], node_codes: np.ndarray) -> np.ndarray:
+        """
+        Register many new users in one pass (ids unique and not yet stored).
+        `values` maps columns to per-user arrays or scalars; other columns start
+        at zero, container status at 'unknown', and each trajectory at (x, y).
+        Returns the new rows.
+        """
+        with self._lock:
+            start, stop = self._count, self._count + len(user_ids)
+            if stop > self._capacity:
+                self._grow(stop)
+            for column in self._columns.values():
+                column[start:stop] = 0
+            for name, value in values.items():
+                self._columns[name][start:stop] = value
+            self._columns['node_code'][start:stop] = node_codes
+            self._columns['status_code'][start:stop] = self.status_code('unknown')
+            self._columns['dirty'][start:stop] = True
+            self._ids.extend(user_ids)
+            self._index.update(zip(user_ids, range(start, stop)))
+            self._count = stop
+            for user_id in user_ids:
+                self._debug.pop(user_id, None)
+            rows = np.arange(start, stop)
+            self._push_history_rows(rows, self._columns['x'][start:stop], self._columns['y'][start:stop])
+            self._version += 1
+            return rows
+
+    def update_rows(self, rows: np.ndarray, values: Dict[str, Any], node_codes: Optional[np.ndarray] = None):
+        """
+        Write columns of many existing rows (unique) in one pass; a new x/y is also
+        recorded as a trajectory sample. Callers hold `lock` so rows stay valid.
+        """
+        with self._lock:
+            for name, value in values.items():
+                self._columns[name][rows] = value
+            if node_codes is not None:
+                self._columns['node_code'][rows] = node_codes
+            if not self._score_inputs.isdisjoint(values):
+                self._columns['dirty'][rows] = True
+            if 'x' in values or 'y' in values:
+                self._push_history_rows(rows, self._columns['x'][rows], self._columns['y'][rows])
+            self._version += 1
+
+    def delete_many(self, user_ids: List[str]) -> int:
+        """Remove many users with one compaction pass instead of a swap per user. Returns the count removed."""
+        with self._lock:
+            rows = self.rows_of(list(dict.fromkeys(user_ids)))
+            rows = rows[rows >= 0]
+            if not len(rows):
+                return 0
+            keep = np.ones(self._count, dtype=bool)
+            keep[rows] = False
+            remaining = self._count - len(rows)
+            for column in self._columns.values():
+                column[:remaining] = column[:self._count][keep]
+            removed = [self._ids[row] for row in rows.tolist()]
+            self._ids = [user_id for user_id, kept in zip(self._ids, keep.tolist()) if kept]
+            self._index = {user_id: row for row, user_id in enumerate(self._ids)}
+            self._count = remaining
+            for user_id in removed:
+                self._debug.pop(user_id, None)
+            self._version += 1
+            return len(removed)
+
+    # --- Trajectory history ---
+    @property
+    def history_window(self) -> int:
+        return self._history_window
+
+    def _push_history(self, row: int, x: float, y: float):
+        window = self._history_window
+        head = int(self._columns['history_head'][row])
+        samples = self._columns['history'][row]
+        samples[head] = samples[head + window] = (x, y)
+        self._columns['history_head'][row] = (head + 1) % window
+        if self._columns['history_len'][row] < window:
+            self._columns['history_len'][row] += 1
+        # Never reused, so a recycled row cannot match a prediction cached for its previous user
+        self._history_seq += 1
+        self._columns['history_seq'][row] = self._history_seq
+
+    def _push_history_rows(self, rows: np.ndarray, xs: np.ndarray, ys: np.ndarray):
+        """Vectorized _push_history for unique rows."""
+        window = self._history_window
+        columns = self._columns
+        head = columns['history_head'][rows].astype(np.int64)
+        samples = np.stack([xs, ys], axis=1)
+        columns['history'][rows, head] = samples
+        columns['history'][rows, head + window] = samples
+        columns['history_head'][rows] = (head + 1) % window
+        columns['history_len'][rows] = np.minimum(columns['history_len'][rows] + 1, window)
+        columns['history_seq'][rows] = self._history_seq + np.arange(1, len(rows) + 1)
+        self._history_seq += len(rows)
+
+    def append_history(self, user_id: str, x: float, y: float):
+        """Record a position sample in the user's ring buffer (O(1), no allocation)."""
+        with self._lock:
+            row = self._index.get(user_id)
+            if row is not None:
+                self._push_history(row, x, y)
+
+    def history(self, user_id: str, copy: bool = True) -> np.ndarray:
+        """
+        Recent (x, y) samples of one user, oldest first, shape (n, 2).
+        With copy=False a read-only view into the ring is returned; it is only
+        valid until the next append for this user.
+        """
+        with self._lock:
+            row = self._index.get(user_id)
+            if row is None:
+                return np.empty((0, 2), dtype=np.float64)
+            end = int(self._columns['history_head'][row]) + self._history_window
+            window = self._columns['history'][row, end - int(self._columns['history_len'][row]):end]
+            if copy:
+                return window.copy()
+            window = window.view()
+            window.flags.writeable = False
+            return window
+
+    def history_windows(self, length: Optional[int] = None, user_ids: Optional[List[str]] = None):
+        """
+        Last `length` samples of every user (or the given ids) as one
+        (users, length, 2) array, oldest first, in a single gather.
+        Users with fewer samples are front-padded with their oldest sample.
+        Returns (user_ids, windows, sample counts).
+        """
+        window = self._history_window
+        length = window if length is None else min(max(1, int(length)), window)
+        with self._lock:
+            if user_ids is None:
+                ids = self._ids[:self._count]
+                rows = np.arange(self._count)
+            else:
+                ids = [user_id for user_id in user_ids if user_id in self._index]
+                rows = np.fromiter((self._index[user_id] for user_id in ids), dtype=np.int64, count=len(ids))
+            end = self._columns['history_head'][rows].astype(np.int64) + window
+            counts = self._columns['history_len'][rows].copy()
+            slots = np.maximum(end[:, None] - length + np.arange(length), (end - counts)[:, None])
+            windows = self._columns['history'][rows[:, None], np.minimum(slots, end[:, None] - 1)]
+        return ids, windows, counts
+
+    # --- Prediction cache ---
+    def cached_predictions(self, user_ids: List[str], version: int):
+        """
+        Cached next-location predictions of the given users.
+        Returns (user_ids, history seq per user, hit mask, predictions (n, 2)); a hit
+        was predicted from the user's current history by model `version`.
+        """
+        with self._lock:
+            ids = [user_id for user_id in user_ids if user_id in self._index]
+            rows = np.fromiter((self._index[user_id] for user_id in ids), dtype=np.int64, count=len(ids))
+            seqs = self._columns['history_seq'][rows]
+            hit = (self._columns['prediction_seq'][rows] == seqs) & (self._columns['prediction_version'][rows] == version)
+            predictions = self._columns['prediction'][rows]
+        return ids, seqs, hit, predictions
+
+    def store_predictions(self, user_ids: List[str], seqs: np.ndarray, predictions: np.ndarray, version: int):
+        """Cache predictions made from history `seqs`; users with newer samples since are skipped."""
+        with self._lock:
+            index = self._index
+            rows = np.fromiter((index.get(user_id, -1) for user_id in user_ids), dtype=np.int64, count=len(user_ids))
+            current = rows >= 0
+            current[current] = self._columns['history_seq'][rows[current]] == np.asarray(seqs)[current]
+            rows = rows[current]
+            self._columns['prediction'][rows] = np.asarray(predictions, dtype=np.float64)[current]
+            self._columns['prediction_seq'][rows] = self._columns['history_seq'][rows]
+            self._columns['prediction_version'][rows] = version
+
+    def invalidate_predictions(self):
+        with self._lock:
+            self._columns['prediction_seq'][:self._count] = 0
+
+    # --- Snapshots ---
+    def snapshot(self) -> UserStoreSnapshot:
+        """
+        Consistent read-only copy of all users. Cached per version, so concurrent
+        readers share one copy and writers only wait for a single memcpy per change.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != self._version:
+                count = self._count
+                snapshot = UserStoreSnapshot(
+                    version=self._version,
+                    user_ids=tuple(self._ids[:count]),
+                    columns={name: self._columns[name][:count].copy() for name in SNAPSHOT_COLUMNS},
+                    node_names=tuple(self._node_names),
+                    status_names=tuple(self._status_names),
+                )
+                self._snapshot = snapshot
+            return snapshot
+
+    # --- Dirty tracking for incremental scans ---
+    def set_score_inputs(self, columns):
+        """Columns the active strategy scores on; writes to other columns no longer mark users dirty."""
+        with self._lock:
+            self._score_inputs = frozenset(columns)
+
+    def mark_dirty(self, user_ids: Optional[List[str]] = None):
+        """Flag the given users (default: everyone) for re-evaluation by the next scan."""
+        with self._lock:
+            dirty = self._columns['dirty']
+            if user_ids is None:
+                dirty[:self._count] = True
+                return
+            for user_id in user_ids:
+                row = self._index.get(user_id)
+                if row is not None:
+                    dirty[row] = True
+
+    def take_dirty(self, extra_mask_fn=None, keep_mask_fn=None) -> Tuple[List[str], int]:
+        """
+        Atomically collect and clear dirty users.
+        extra_mask_fn(columns) -> bool array adds users affected by node changes;
+        keep_mask_fn(columns) -> bool array marks users that stay dirty without being
+        returned (e.g. still inside their dwell time).
+        Returns (user_ids to evaluate, number of dirty users deferred).
+        """
+        with self._lock:
+            count = self._count
+            active = {name: column[:count] for name, column in self._columns.items()}
+            dirty = active['dirty'].copy()
+            if extra_mask_fn is not None:
+                dirty |= extra_mask_fn(active)
+            deferred = np.zeros(count, dtype=bool)
+            if keep_mask_fn is not None:
+                deferred = dirty & keep_mask_fn(active)
+            evaluate = dirty & ~deferred
+            active['dirty'][:] = deferred
+            ids = self._ids
+            return [ids[row] for row in np.flatnonzero(evaluate)], int(deferred.sum())
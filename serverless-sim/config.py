@@ -72,6 +72,14 @@ class Config:
     HANDOFF_IMPROVEMENT_THRESHOLD = 0.1  # 10% better score required to switch
     ASSIGNMENT_SCAN_INTERVAL = 0.5  # seconds between reassignment scans
     LOAD_AWARE_ALPHA = 1.0  # weight for CPU load in load-aware score
+    ASSIGNMENT_BATCH_SCAN = True  # vectorized reassignment scan for non-predictive strategies
+    ASSIGNMENT_INCREMENTAL_SCAN = True  # only re-evaluate users/nodes that changed since the last scan
+    ASSIGNMENT_BATCH_CHUNK_SIZE = 1024  # users per score-matrix chunk (sized to stay cache-resident)
+    SPATIAL_INDEX_CELL_SIZE = 150.0  # pixels per grid cell of the edge node coverage index
+    USER_HISTORY_WINDOW = 10  # recent positions kept per user for trajectory prediction
+    HANDOFF_LOG_CAPACITY = 4096  # handoff events kept in the ring buffer
+    HANDOFF_STATS_WINDOW_SECONDS = 60.0  # window for handoff rate / gain analytics
+    HANDOFF_PING_PONG_SECONDS = 10.0  # A -> B -> A within this counts as ping-pong
 
     # Predictive scheduling parameters
     PREDICTIVE_DEFAULT_MEMORY_REQUIREMENT_MB = 256  # default per-user memory footprint
@@ -80,6 +88,34 @@ class Config:
     PREDICTIVE_HANDOFF_COST = 0.05  # score penalty for handoff
     PREDICTIVE_WARM_BASE_PROB = 0.2  # base warm probability when metrics are missing
 
-    # Dataset playback speed (Scenario 2 / vehicles)
-    # Multiply timestep advancement per poll to make movements appear faster on canvas
-    DATASET_STEP_MULTIPLIER = 8
\ No newline at end of file
+    # Trajectory prediction
+    TRAJECTORY_PREDICTOR_BACKEND = 'model'  # 'model' (neural, extrapolation fallback) or 'kalman'
+    TRAJECTORY_MODEL_BACKGROUND_LOAD = True  # load the model off the startup path; extrapolate until ready
+    TRAJECTORY_MODEL_AUTO_EXPORT = True  # export the .keras model for the NumPy runtime on load if missing
+    KALMAN_MOTION_MODEL = 'cv'  # 'cv' constant velocity or 'ca' constant acceleration
+    KALMAN_PROCESS_NOISE = 25.0  # white-noise intensity of the highest modelled derivative
+    KALMAN_MEASUREMENT_NOISE = 4.0  # position measurement variance (px^2)
+    TRAJECTORY_PREDICTION_CACHE = True  # reuse a user's prediction until a new sample or model arrives
+    TRAJECTORY_STEP_SECONDS = 1.0  # time between location samples (one predicted step)
+    TRAJECTORY_FORECAST_STEPS = 30  # k-step rollout length for coverage forecasts
+    TRAJECTORY_FORECAST_HORIZON_SECONDS = 30.0  # report coverage entries up to this far ahead
+
+    # GAP solver parameters
+    GAP_SOLVER_METHOD = 'greedy'  # 'greedy' (default) or opt-in 'ilp' (capacity-constrained)
+    GAP_ENABLE_MEMORY_CONSTRAINTS = False  # opt-in: respect per-node free memory
+    GAP_TIME_BUDGET_SECONDS = 1.0  # wall-clock budget for one capacitated solve
+    GAP_GLOBAL_REOPTIMIZATION = True  # GAP_BASELINE online loop solves all users at once
+    GAP_REOPTIMIZE_INTERVAL = 5.0  # seconds between global GAP solves
+
+    # Dataset playback clock (Scenario 2 / vehicles), independent of UI polling
+    PLAYBACK_STEPS_PER_SECOND = 8.0  # virtual-time rate: dataset steps advanced per second
+    PLAYBACK_TICK_SECONDS = 1.0  # one batch of user updates per tick (one history sample)
+
+    # Binary columnar cache of parsed mobility traces (memory-mapped on later boots)
+    TRACE_CACHE_ENABLED = True
+    TRACE_CACHE_DIR = None  # default: .trace_cache/ next to each trace file
+    # Streaming playback: replay time-ordered traces in chunks at constant memory
+    TRACE_STREAMING = False
+    TRACE_STREAM_CHUNK_ROWS = 50000  # rows parsed per chunk
+    TRACE_STREAM_BUFFER_CHUNKS = 4  # chunks prefetched ahead of playback
+    TRACE_STREAM_READY_TIMEOUT = 0.25  # seconds a step request waits for the prepass before reporting not ready
@@ -39,6 +39,12 @@ else
     fi
 fi
 
+# Export the trajectory models for the NumPy runtime (needs h5py, not TensorFlow)
+echo "📦 Exporting trajectory models for the NumPy runtime..."
+if ! python3 -m central_node.control_layer.prediction_module.export_numpy_models; then
+    echo "⚠️  Model export failed. Trajectory prediction will use Keras or linear extrapolation."
+fi
+
 echo "🚀 Starting Central Node..."
 echo "🛑 Press Ctrl+C to stop"
 echo ""